@@ -12,11 +12,14 @@ from organize_it.tests._fixtures.directory_structure_fixtures import (
 
 from organize_it.settings import (
     DIR,
-    CONFIG,
     WORKING_DIR,
     GENERATED_DESTINATION_TREE,
     GENERATED_SOURCE_TREE,
+    GENERATED_SOURCE_JSON,
+    GENERATED_RULE_STATS,
+    GENERATED_OPERATION_PLAN,
     TEST_FIXTURES_DIR,
+    CONFIG_DIR,
     SCHEMA,
 )
 
@@ -25,8 +28,13 @@ from organize_it.schema_validation.validator import JSONSchemaValidator
 from organize_it.bin.subroutines import (
     process_source_and_generate_tree,
     categorize_and_generate_dest_tree,
+    categorize_and_sort_streaming,
+    watch_and_organize,
     generate_with_ai,
+    plan_file_operations,
+    execute_operation_plan,
 )
+from organize_it.bin.compiled_config import CompiledConfig
 
 logger = logging.getLogger(__name__)
 
@@ -55,12 +63,22 @@ def main():
         generate_with_ai,
     )
 
+    if cli_parser.execute_plan:
+        # The plan holds the source and destination, nothing is scanned or categorized.
+        execute_operation_plan(
+            cli_parser.execute_plan, io_workers=cli_parser.io_workers
+        )
+        return
+
     if cli_parser.ai:
         config = generate_with_ai()
-    elif cli_parser.config:
+    elif cli_parser.config_path:
+        # Parsed, validated and compiled once, later runs load the compiled artifact from TMP_DIR.
+        config = CompiledConfig.load(cli_parser.config_path)
+    elif cli_parser.interactive and cli_parser.config:
         config = cli_parser.config
     else:
-        config = CONFIG
+        config = CompiledConfig.load(CONFIG_DIR)
 
     if cli_parser.move:
         move_files = cli_parser.move
@@ -68,20 +86,23 @@ def main():
         move_files = False
 
     # Validate the YAML config first with the corresponding json-schema
-    schema_validator = JSONSchemaValidator(config_data=config, schema=SCHEMA)
-    schema_validator.validate_config()
+    # A compiled config was validated when it was compiled.
+    if not getattr(config, "validated", False):
+        schema_validator = JSONSchemaValidator(config_data=config, schema=SCHEMA)
+        schema_validator.validate_config()
 
+    # The directories of the loaded config, an empty value falls back to the current directory.
     if cli_parser.src:
         source_directory = cli_parser.src
-    elif "source" in CONFIG:
-        source_directory = CONFIG.source
+    elif isinstance(config, dict) and config.get("source"):
+        source_directory = config["source"]
     else:
         source_directory = WORKING_DIR
 
     if cli_parser.dest:
         destination_directory = cli_parser.dest
-    elif "destination" in CONFIG:
-        destination_directory = CONFIG.destination
+    elif isinstance(config, dict) and config.get("destination"):
+        destination_directory = config["destination"]
     else:
         destination_directory = WORKING_DIR
 
@@ -94,22 +115,72 @@ def main():
     )
     ##########################DUMMY###################################################
 
+    if cli_parser.watch:
+        # Organize new files as they arrive until the process is interrupted.
+        watch_and_organize(
+            source_directory=source_directory,
+            destination_directory=destination_directory,
+            config=config,
+            move_files=move_files,
+            debounce=cli_parser.debounce,
+        )
+        return
+
+    if cli_parser.stream:
+        # Stream the source tree in batches without generating the tree structures.
+        categorize_and_sort_streaming(
+            source_directory=source_directory,
+            destination_directory=destination_directory,
+            config=config,
+            move_files=move_files,
+            sniff_content=cli_parser.sniff_content,
+            io_workers=cli_parser.io_workers,
+            link_mode=cli_parser.link_mode,
+        )
+        return
+
     file_manager, tree_structure, source_tree_dict = process_source_and_generate_tree(
         source_directory=source_directory,
         destination_directory=destination_directory,
         generated_source_tree_path=GENERATED_SOURCE_TREE,
+        generated_source_json=GENERATED_SOURCE_JSON if cli_parser.export_json else None,
+        walk_workers=cli_parser.walk_workers,
+        use_scan_index=not cli_parser.no_index,
+        config=config,
+        # The plan validates the files and takes their devices from the stats.
+        record_stats=cli_parser.plan_only,
     )
     categorized_tree_dict = categorize_and_generate_dest_tree(
         config=config,
         source_tree_dict=source_tree_dict,
         tree_structure=tree_structure,
         dest_tree_path=GENERATED_DESTINATION_TREE,
+        categorize_workers=cli_parser.categorize_workers,
+        partition_depth=cli_parser.partition_depth,
+        sniff_source_directory=(source_directory if cli_parser.sniff_content else None),
+        rule_stats_path=GENERATED_RULE_STATS if cli_parser.rule_stats else None,
     )
 
+    if cli_parser.plan_only:
+        # Review the plan, then perform it with --execute-plan.
+        plan_file_operations(
+            file_manager=file_manager,
+            config=config,
+            categorized_tree_dict=categorized_tree_dict[DIR],
+            plan_path=GENERATED_OPERATION_PLAN,
+            move_files=move_files,
+            source_tree=source_tree_dict,
+            link_mode=cli_parser.link_mode,
+        )
+        return
+
     file_manager.categorize_and_sort_file(
         config=config,
         sorted_tree_dict=categorized_tree_dict[DIR],
         move_files=move_files,  # To delete the source files.
+        source_tree=source_tree_dict,
+        io_workers=cli_parser.io_workers,
+        link_mode=cli_parser.link_mode,
     )
     # Explore SYMLINKS(unix), Junction(Windows)
 
@@ -1,37 +1,179 @@
 """ Categorizer Module"""
 
 import logging
+import os
 import re
+import copy
+from time import perf_counter, time_ns
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 
-from organize_it.settings import FILES, DIR, SKIP, RULES, NAMES, FORMAT
+from organize_it.settings import FILES, DIR, SKIP, RULES, NAMES, FORMAT, SIZE, AGE
+from organize_it.bin.compact_tree import CompactTree, CompactNodeView
+from organize_it.bin.rule_engine import (
+    NameRuleMatcher,
+    ExtensionTrie,
+    ThresholdRuleMatcher,
+    parse_size,
+    NANOSECONDS_PER_DAY,
+)
+from organize_it.bin.rule_stats import RuleStats
 
 LOGGER = logging.getLogger(__name__)
 
+# Category id of files which are not matched by any rule.
+UNCATEGORIZED = -1
+
+# Depth below the source root at which the tree is split into subtrees for the parallel categorization.
+DEFAULT_PARTITION_DEPTH = 1
+
+# The categorizer of a worker process, set once by _init_worker.
+_WORKER_CATEGORIZER = None
+
+
+def _init_worker(categorizer):
+    global _WORKER_CATEGORIZER  # pylint: disable=global-statement
+    _WORKER_CATEGORIZER = categorizer
+
+
+def _categorize_subtree(subtree: dict, stamps_by_path: dict) -> tuple:
+    categorizer = _WORKER_CATEGORIZER
+    categorizer.stamps_by_path = stamps_by_path
+    if categorizer.rule_stats is not None:
+        categorizer.rule_stats = RuleStats()
+    return categorizer.categorize_tree(subtree, True), categorizer.rule_stats
+
+
+def _collect_stamps(view) -> dict:
+    stamps_by_path = {}
+    stack = [view]
+    while stack:
+        node = stack.pop()
+        stamps_by_path.update(zip(node[FILES], node.file_stamps()))
+        stack.extend(node[DIR].values())
+    return stamps_by_path
+
 
 class Categorizer:
     """Categorizer class that handles categorization logic based on file extensions"""
 
-    def __init__(self, config):
+    def __init__(
+        self,
+        config,
+        ignore_case: bool = False,
+        content_sniffer=None,
+        collect_stats: bool = False,
+    ):
+        """
+        Constructor
+
+        Args:
+            config (dict): The config dict with the format, names and skip rules.
+            ignore_case (bool): Match the format rule extensions case insensitively, e.g. "IMG.JPG" as "jpg".
+            content_sniffer (ContentSniffer): Optional sniffer that classifies the files which no rule matched
+                by their leading bytes. Files classified by name or extension are never read.
+            collect_stats (bool): Collect per rule counters and timings and per category file counts in
+                `rule_stats`. The name rules are then evaluated one by one to time each of them.
+        """
+
+        self.content_sniffer = content_sniffer
+        self.rule_stats = RuleStats() if collect_stats else None
+        # Optional {file path: (size, mtime_ns)} for trees without recorded stats, e.g. in worker processes.
+        self.stamps_by_path = None
 
+        # A CompiledConfig carries the rules compiled by a previous run, only the mutable tables are copied.
+        compiled = getattr(config, "compiled_categorizer", None)
+        if compiled is not None and compiled.ignore_case == ignore_case:
+            for name, value in vars(compiled).items():
+                if name not in (
+                    "content_sniffer",
+                    "rule_stats",
+                    "stamps_by_path",
+                ):
+                    setattr(self, name, value)
+            self.categories = list(compiled.categories)
+            self._category_ids = dict(compiled._category_ids)
+        else:
+            self._compile_rules(config, ignore_case)
+
+    def _compile_rules(self, config, ignore_case: bool):
+        self.ignore_case = ignore_case
         name_rules = [rules[NAMES] for rules in config[RULES] if NAMES in rules]
         skip_rules = [rules[SKIP] for rules in config[RULES] if SKIP in rules]
         format_rules = [rules[FORMAT] for rules in config[RULES] if FORMAT in rules]
+        size_rules = [rules[SIZE] for rules in config[RULES] if SIZE in rules]
+        age_rules = [rules[AGE] for rules in config[RULES] if AGE in rules]
 
+        # Category directory names indexed by their integer category id.
+        self.categories = []
+        self._category_ids = {}
+
+        # Name pattern rules compiled once into a single matcher.
+        self.name_matcher = None
+        self.name_rule_category_ids = []
         if len(name_rules):
             self.name_rules_dict = name_rules[0]
+            self.name_matcher = NameRuleMatcher(self.name_rules_dict)
+            self.name_rule_category_ids = [
+                self.category_id(dir_name) for dir_name in self.name_matcher.dir_names
+            ]
 
-        # create a cache of types mapped to format to quickly access them later.
-        self.types_to_format_dict = {}
+        # create a trie of types mapped to the format category ids to quickly access them later.
+        # The longest configured type wins, e.g. "tar.gz" over "gz".
+        self.extension_trie = ExtensionTrie(ignore_case)
         if len(format_rules):
             for cat, types in format_rules[0].items():
                 format_types = types["types"]
                 for format_type in format_types:
-                    self.types_to_format_dict[format_type] = cat
+                    self.extension_trie.add(format_type, self.category_id(cat))
+
+        # Size and age rules match the stat metadata recorded during the walk.
+        self.size_matcher = ThresholdRuleMatcher()
+        self.age_matcher = ThresholdRuleMatcher()
+        if len(size_rules):
+            for dir_name, rule in size_rules[0].items():
+                self.size_matcher.add(
+                    parse_size(rule["min_size"]), self.category_id(dir_name)
+                )
+        if len(age_rules):
+            for dir_name, rule in age_rules[0].items():
+                self.age_matcher.add(
+                    int(rule["min_days"] * NANOSECONDS_PER_DAY),
+                    self.category_id(dir_name),
+                )
+        self.uses_stats = bool(len(self.size_matcher) or len(self.age_matcher))
 
-        # Regex of dirs and file names to skip.
+        # Regex of dirs and file names to skip, compiled once.
+        self.skip_dir_pattern = None
+        self.skip_file_pattern = None
         if len(skip_rules):
             self.skip_dir_regex = skip_rules[0].get(DIR)
             self.skip_file_regex = skip_rules[0].get(FILES)
+            if self.skip_dir_regex:
+                self.skip_dir_pattern = re.compile(self.skip_dir_regex)
+            if self.skip_file_regex:
+                self.skip_file_pattern = re.compile(self.skip_file_regex)
+
+    def category_id(self, dir_name: str) -> int:
+        """Returns the integer id of a category directory name, adding it to `categories` if needed."""
+        category_id = self._category_ids.get(dir_name)
+        if category_id is None:
+            category_id = len(self.categories)
+            self._category_ids[dir_name] = category_id
+            self.categories.append(dir_name)
+        return category_id
+
+    def is_excluded(self, name: str, is_dir: bool) -> bool:
+        """
+        Returns True if a file/dir name is excluded by the skip rules of the config.
+
+        Args:
+            name (str): The file or directory name to check
+            is_dir (bool): If the string is question is a file or diretory name
+        """
+        skip_pattern = self.skip_dir_pattern if is_dir else self.skip_file_pattern
+        return skip_pattern is not None and skip_pattern.search(name) is not None
 
     def filter_excluded_names(self, name_list, is_dir) -> list:
         """
@@ -41,15 +183,9 @@ class Categorizer:
             name_list (list): list of fie/dir names to be processed
             is_dir (bool): If the string is question is a file or diretory name
         """
-        if hasattr(self, "skip_dir_regex") or hasattr(self, "skip_file_regex"):
-            skip_regex = self.skip_dir_regex if is_dir else self.skip_file_regex
-            return (
-                [name for name in name_list if not re.search(skip_regex, name)]
-                if skip_regex
-                else name_list
-            )
-        else:
+        if (self.skip_dir_pattern if is_dir else self.skip_file_pattern) is None:
             return name_list
+        return [name for name in name_list if not self.is_excluded(name, is_dir)]
 
     def check_name_pattern(self, file_name):
         """Method to take in the file name and check if it matches any of the name pattern rules.
@@ -57,25 +193,226 @@ class Categorizer:
         Returns:
             The Directory name to create to last rule that matched.
         """
-        if hasattr(self, "name_rules_dict"):
-            matched_tupple_list = [
-                dir_name
-                for dir_name in self.name_rules_dict
-                if re.search(self.name_rules_dict[dir_name]["name_pattern"], file_name)
-            ]
-            LOGGER.debug("Found some file name matched here: %s", matched_tupple_list)
-            return (
-                matched_tupple_list[-1] if len(matched_tupple_list) else None
-            )  # The latest match is returned
-        else:
+        if self.name_matcher is None:
             return None
+        # The latest match is returned
+        return self.name_matcher.match(file_name)
+
+    def is_excluded_dir_path(self, rel_dir: str) -> bool:
+        """Returns True if any directory on the relative path `rel_dir` is excluded by the skip rules."""
+        if self.skip_dir_pattern is None:
+            return False
+        return any(
+            self.is_excluded(name, True)
+            for name in rel_dir.split(os.sep)
+            if name != os.curdir
+        )
+
+    def categorize_file(self, file_name: str):
+        """Method to take in a file name and return the category directory it belongs to.
+        Name pattern rules take precedence over the format rules.
 
-    def categorize_dict(self, source_tree_dict: dict, recursive: bool) -> dict:
+        Returns:
+            The Directory name to create for the file or None if no rule matched.
+        """
+        category_id = self.classify_batch([file_name])[0]
+        return None if category_id == UNCATEGORIZED else self.categories[category_id]
+
+    def classify_batch(self, names: list, stamps: list = None) -> array:
+        """
+        Classifies a batch of file names at once, e.g. all files of a directory. Name pattern rules take
+        precedence over the format rules, just like in :meth:`categorize_file`. Size and age rules take
+        precedence over both, and a size rule over an age rule.
+
+        The extensions of the whole batch are mapped to integer category codes with the :class:`ExtensionTrie`,
+        then the name rules are applied with the compiled :class:`NameRuleMatcher`. With a content sniffer,
+        the files that are still uncategorized are classified by the format rule of the extension detected
+        from their content.
+        The size and age rules are only evaluated with `stamps`, they never stat a file. The content sniffer
+        caches the files with `stamps` for the run.
+
+        Args:
+            names (list): The file names or relative file paths to classify.
+            stamps (list): Optional (size, mtime_ns) tuple per name as recorded during the walk, None for
+                files without stats.
+
+        Returns:
+            array: One category id per name, `UNCATEGORIZED` (-1) if no rule matched. Use `categories` to map
+            an id to its directory name.
+        """
+        category_ids = self._evaluate_rules(names)
+
+        if stamps is not None and self.uses_stats:
+            self._apply_stat_rules(stamps, category_ids)
+
+        if self.content_sniffer is not None:
+            self._sniff_unmatched(names, category_ids, stamps)
+
+        if self.rule_stats is not None:
+            categories = self.categories
+            self.rule_stats.count_categories(
+                None if category_id == UNCATEGORIZED else categories[category_id]
+                for category_id in category_ids
+            )
+        return category_ids
+
+    def _sniff_unmatched(self, names: list, category_ids: array, stamps: list):
+        unmatched = [
+            index
+            for index, category_id in enumerate(category_ids)
+            if category_id == UNCATEGORIZED
+        ]
+        if not unmatched:
+            return
+
+        start = perf_counter()
+        extensions = self.content_sniffer.sniff_batch(
+            [names[index] for index in unmatched],
+            None if stamps is None else [stamps[index] for index in unmatched],
+        )
+        matches = 0
+        for index, extension in zip(unmatched, extensions):
+            if extension is not None:
+                category_ids[index] = self.extension_trie.match(
+                    f".{extension}", UNCATEGORIZED
+                )
+                matches += category_ids[index] != UNCATEGORIZED
+        if self.rule_stats is not None:
+            self.rule_stats.record(
+                "content",
+                "magic bytes",
+                len(unmatched),
+                matches,
+                perf_counter() - start,
+            )
+
+    def _apply_stat_rules(self, stamps: list, category_ids: array):
+        start = perf_counter()
+        now_ns = time_ns()
+        size_match = self.size_matcher.match
+        age_match = self.age_matcher.match
+        matches = 0
+        for index, stamp in enumerate(stamps):
+            if stamp is None:
+                continue
+            size, mtime_ns = stamp
+            # One binary search per matcher, however many rules there are.
+            category_id = size_match(size, UNCATEGORIZED)
+            if category_id == UNCATEGORIZED:
+                category_id = age_match(now_ns - mtime_ns, UNCATEGORIZED)
+            if category_id != UNCATEGORIZED:
+                category_ids[index] = category_id
+                matches += 1
+        if self.rule_stats is not None:
+            self.rule_stats.record(
+                "stat", "size and age", len(stamps), matches, perf_counter() - start
+            )
+
+    def _evaluate_rules(self, names: list) -> array:
+        if self.rule_stats is not None:
+            return self._evaluate_rules_instrumented(names)
+
+        # File format check: the longest configured extension of each name.
+        category_ids = array("i", self.extension_trie.match_batch(names, UNCATEGORIZED))
+
+        if self.name_matcher is not None:
+            rule_category_ids = self.name_rule_category_ids
+            for index, rule_index in enumerate(
+                map(self.name_matcher.match_index, names)
+            ):
+                if rule_index != -1:
+                    category_ids[index] = rule_category_ids[rule_index]
+
+        return category_ids
+
+    def _evaluate_rules_instrumented(self, names: list) -> array:
+        """
+        Same result as :meth:`_evaluate_rules`, but every name rule is searched on its own in config order,
+        so the later matches win and the time of each rule can be measured.
+        """
+        stats = self.rule_stats
+        start = perf_counter()
+        category_ids = array("i", self.extension_trie.match_batch(names, UNCATEGORIZED))
+        stats.record(
+            FORMAT,
+            "extension trie",
+            len(names),
+            len(names) - category_ids.count(UNCATEGORIZED),
+            perf_counter() - start,
+        )
+
+        if self.name_matcher is not None:
+            for dir_name, pattern, category_id in zip(
+                self.name_matcher.dir_names,
+                self.name_matcher.patterns,
+                self.name_rule_category_ids,
+            ):
+                start = perf_counter()
+                search = pattern.search
+                matched = [index for index, name in enumerate(names) if search(name)]
+                stats.record(
+                    NAMES, dir_name, len(names), len(matched), perf_counter() - start
+                )
+                for index in matched:
+                    category_ids[index] = category_id
+
+        return category_ids
+
+    def group_by_category(self, names: list, stamps: list = None) -> dict:
+        """Classifies a batch of names and returns {category dir name: [names]} in the order of `names`. Uncategorized names are dropped."""
+        grouped = {}
+        categories = self.categories
+        for name, category_id in zip(names, self.classify_batch(names, stamps)):
+            if category_id != UNCATEGORIZED:
+                grouped.setdefault(categories[category_id], []).append(name)
+        return grouped
+
+    def categorize_batches(self, batches):
+        """
+        Categorizes a stream of `(rel_dir, entries)` batches as produced by
+        :meth:`DirectoryWalker.iter_batches` without holding the whole tree in memory.
+
+        Args:
+            batches (iterable): An iterable of (rel_dir, entries) tuples, or of (rel_dir, entries, stamps) tuples
+                with the (size, mtime_ns) of the files for the size and age rules.
+
+        Yields:
+            tuple: A tuple of (rel_dir, categorized) where categorized maps a category directory name
+            to the list of files of the batch that belong to it. Batches below excluded directories and
+            batches without any categorized file are dropped.
+        """
+        for rel_dir, entries, *batch_stamps in batches:
+            if self.is_excluded_dir_path(rel_dir):
+                continue
+
+            stamps = batch_stamps[0] if batch_stamps else None
+            names = self.filter_excluded_names(entries, False)
+            if stamps is not None and len(names) != len(entries):
+                stamp_of = dict(zip(entries, stamps))
+                stamps = [stamp_of[name] for name in names]
+            categorized = self.group_by_category(names, stamps)
+            if categorized:
+                yield rel_dir, categorized
+
+    def categorize_dict(
+        self,
+        source_tree_dict: dict,
+        recursive: bool,
+        workers: int = 1,
+        partition_depth: int = DEFAULT_PARTITION_DEPTH,
+        lazy: bool = False,
+    ) -> dict:
         """
         Method that categorizes files based on input using the provided config and returns the categorized dictionary
         Args:
-            source_tree_dict (dict): The unsorted source tree structure dictionary
+            source_tree_dict (dict): The unsorted source tree structure dictionary or a CompactTree
             recursive (bool): Optional flag to recurce into all sub directories and categorize them based on the config
+            workers (int): Number of processes to categorize independent subtrees in parallel. The result is
+                identical to the serial categorization.
+            partition_depth (int): With `workers` > 1, the directories at this depth below the source root are
+                categorized as one task each. Everything above is categorized in this process.
+            lazy (bool): Return a :class:`LazyCategorizedNode` that categorizes each directory only when it
+                is accessed. Takes precedence over `workers`.
         Returns:
             dict: A sorted and categorized dictionary containing files and subdirectories in the format:
                 {
@@ -93,54 +430,178 @@ class Categorizer:
         LOGGER.info(
             " - Generating clean and organised tree structure based on the provided config."
         )
+        if isinstance(source_tree_dict, CompactTree):
+            source_tree_dict = source_tree_dict.root()
 
-        def categorize(input_dict) -> dict:
-            """Takes in the config and categorizes based on the config"""
-            sorted_dict = {DIR: {}, FILES: []}
-            current_level_files = self.filter_excluded_names(input_dict[FILES], False)
-            for file_name in current_level_files:
-                # TODO: Create dirs for name regex which takes precedence over format check.
-                matched_dir_name = self.check_name_pattern(
-                    file_name
-                )  # Dir name to be created for matched files.
-                if matched_dir_name:
-                    if matched_dir_name in sorted_dict[DIR]:
-                        sorted_dict[DIR][matched_dir_name][FILES].append(file_name)
-                    else:
-                        sorted_dict[DIR][matched_dir_name] = {
-                            DIR: {},
-                            FILES: [file_name],
-                        }
+        if lazy and recursive:
+            return LazyCategorizedNode(self, source_tree_dict)
+        if workers > 1 and recursive:
+            return self._categorize_parallel(source_tree_dict, workers, partition_depth)
+        return self.categorize_tree(source_tree_dict, recursive)
+
+    def categorize_tree(
+        self, input_dict: dict, recursive: bool, submit=None, partition_depth: int = 0
+    ) -> dict:
+        """
+        Categorizes one node of the source tree, see :meth:`categorize_dict`.
+
+        Args:
+            input_dict (dict): The node in the oIt dictionary format.
+            recursive (bool): Recurse into the sub directories.
+            submit (callable): Optional callable that takes over the sub directories at `partition_depth`
+                and returns a placeholder dict for their categorized subtree.
+            partition_depth (int): The depth of the sub directories handed to `submit`, 1 for the direct ones.
+        """
+        sorted_dict = {DIR: {}, FILES: []}
+        level_files = input_dict[FILES]
+        current_level_files = self.filter_excluded_names(level_files, False)
+        stamps = (
+            self._file_stamps(input_dict, level_files)
+            if self.uses_stats or self.content_sniffer is not None
+            else None
+        )
+        if stamps is not None and len(current_level_files) != len(level_files):
+            stamp_of = dict(zip(level_files, stamps))
+            stamps = [stamp_of[file_path] for file_path in current_level_files]
+        # Dir name to be created for matched files, classified for the whole directory at once.
+        for matched_dir_name, files in self.group_by_category(
+            current_level_files, stamps
+        ).items():
+            sorted_dict[DIR][matched_dir_name] = {DIR: {}, FILES: files}
+
+        if recursive:
+            # Go into each sub dir of source_tree_dict and categorize recursively.
+            current_level_subdir = input_dict[DIR]
+            current_level_subdir_names = self.filter_excluded_names(
+                current_level_subdir.keys(), True
+            )
+            for dir_name in current_level_subdir_names:
+                subdir = current_level_subdir[dir_name]
+                # Check if we have files to categorize at this level
+                if not len(subdir[FILES]):
+                    continue
+                if submit is not None and partition_depth <= 1:
+                    sorted_dict[DIR][dir_name] = submit(subdir)
                 else:
-                    # File format check: last substring with . is in the cache and add the format as dir_name to the dict
-                    current_file_format = file_name.rsplit(".", 1)[1]
-                    if current_file_format in self.types_to_format_dict:
-                        current_dir_format_name = self.types_to_format_dict[
-                            current_file_format
-                        ]
-                        if current_dir_format_name in sorted_dict[DIR]:
-                            sorted_dict[DIR][current_dir_format_name][FILES].append(
-                                file_name
-                            )
-                        else:
-                            sorted_dict[DIR][current_dir_format_name] = {
-                                DIR: {},
-                                FILES: [file_name],
-                            }
+                    sorted_dict[DIR][dir_name] = self.categorize_tree(
+                        subdir, recursive, submit, partition_depth - 1
+                    )
+
+        return sorted_dict
+
+    def _file_stamps(self, input_dict, file_paths: list) -> list:
+        """Returns the recorded (size, mtime_ns) of the files of a node or None if there are no stats."""
+        if isinstance(input_dict, CompactNodeView):
+            return input_dict.file_stamps()
+        if self.stamps_by_path is not None:
+            return [self.stamps_by_path.get(file_path) for file_path in file_paths]
+        return None
+
+    def _categorize_parallel(
+        self, source_tree_dict: dict, workers: int, partition_depth: int
+    ) -> dict:
+        """
+        Categorizes the subtrees at `partition_depth` in a process pool. The categorizer is pickled once per
+        worker by the pool initializer, so the rules are not compiled again for every subtree. Subtrees are
+        submitted in tree order and their results fill placeholders that already sit at the right position,
+        so the merged dict has the same content and key order as the serial categorization.
+        """
+        worker_categorizer = copy.copy(self)
+        if self.rule_stats is not None:
+            worker_categorizer.rule_stats = RuleStats()
+        pending = []
 
-            if recursive:
-                # Go into each sub dir of source_tree_dict and categorize recursively.
-                current_level_subdir = input_dict[DIR]
-                current_level_subdir_names = self.filter_excluded_names(
-                    current_level_subdir.keys(), True
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(worker_categorizer,),
+        ) as executor:
+
+            def submit(subtree) -> dict:
+                stamps_by_path = None
+                if isinstance(subtree, CompactNodeView):
+                    # The stats are shipped with the paths, the workers get plain dicts.
+                    if (
+                        self.uses_stats or self.content_sniffer is not None
+                    ) and subtree.tree.stats is not None:
+                        stamps_by_path = _collect_stamps(subtree)
+                    subtree = subtree.to_dict()
+                elif self.stamps_by_path is not None:
+                    stamps_by_path = self.stamps_by_path
+                placeholder = {}
+                pending.append(
+                    (
+                        placeholder,
+                        executor.submit(_categorize_subtree, subtree, stamps_by_path),
+                    )
                 )
-                for dir_name in current_level_subdir_names:
-                    # Check if we have files to categorize at this level
-                    if len(current_level_subdir[dir_name][FILES]):
-                        sorted_dict[DIR][dir_name] = categorize(
-                            current_level_subdir[dir_name]
-                        )
+                return placeholder
+
+            sorted_dict = self.categorize_tree(
+                source_tree_dict, True, submit, max(1, partition_depth)
+            )
+            for placeholder, future in pending:
+                subtree_dict, rule_stats = future.result()
+                placeholder.update(subtree_dict)
+                if rule_stats is not None:
+                    self.rule_stats.merge(rule_stats)
+
+        return sorted_dict
+
 
-            return sorted_dict
+class LazyCategorizedNode(Mapping):
+    """
+    Read only view of a categorized directory that behaves like a node of the dictionary returned by
+    :meth:`Categorizer.categorize_dict`. The files of the directory are categorized when the node is
+    first accessed, its sub directories become lazy nodes themselves, so only the parts of the tree that
+    are rendered or copied are ever categorized. Every level is categorized once and memoized.
 
-        return categorize(source_tree_dict)
+    Methods:
+        to_dict(self) -> dict
+    """
+
+    __slots__ = ("categorizer", "source_node", "_level")
+
+    def __init__(self, categorizer: Categorizer, source_node: dict):
+        """
+        Constructor
+
+        Args:
+            categorizer (Categorizer): The categorizer of the run.
+            source_node (dict): The source directory node in the oIt dictionary format or a CompactTree view.
+        """
+        self.categorizer = categorizer
+        self.source_node = source_node
+        self._level = None
+
+    def _categorized_level(self) -> dict:
+        if self._level is None:
+            self._level = self.categorizer.categorize_tree(
+                self.source_node,
+                True,
+                lambda subdir: LazyCategorizedNode(self.categorizer, subdir),
+                1,
+            )
+        return self._level
+
+    def __getitem__(self, key):
+        return self._categorized_level()[key]
+
+    def __iter__(self):
+        return iter((DIR, FILES))
+
+    def __len__(self) -> int:
+        return 2
+
+    def to_dict(self) -> dict:
+        """Categorizes the remaining directories and returns the plain categorized dictionary."""
+        level = self._categorized_level()
+        return {
+            DIR: {
+                dir_name: (
+                    node.to_dict() if isinstance(node, LazyCategorizedNode) else node
+                )
+                for dir_name, node in level[DIR].items()
+            },
+            FILES: level[FILES],
+        }
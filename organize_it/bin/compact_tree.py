@@ -0,0 +1,322 @@
+""" Compact tree module. An array backed representation of the oIt tree dictionary """
+
+import os
+from array import array
+from collections.abc import Mapping
+
+from organize_it.settings import FILES, DIR, SKIPPED
+
+NO_INDEX = -1
+
+
+class CompactTree:
+    """
+    Array backed tree of directories and files with interned path components.
+
+    Directories are rows of a node table holding the parent index and the name id. Files are rows of a
+    file table holding the directory node index and the name id of the base name. Children and files of
+    a node are chained through "first/next" index arrays, so no per node lists or dicts are allocated.
+    File paths like "./subDir1/x.jpg" are never stored. They are rebuilt on demand from the components.
+    Files of categorized trees live in a category node but keep their source directory, which is stored as
+    an interned directory id per file.
+
+    The tree can be consumed like the legacy oIt dictionary through :meth:`root`, which returns a read only
+    mapping view, or converted with :meth:`to_dict`.
+
+    Methods:
+        from_dict(tree_dict: dict, root_rel_dir: str = ".") -> CompactTree
+        intern(self, name: str) -> int
+        add_node(self, parent: int, name: str) -> int
+        add_file(self, node: int, name: str, rel_dir: str = None) -> int
+        add_skipped(self, node: int, name: str)
+        children(self, node: int)
+        files(self, node: int)
+        file_indexes(self, node: int)
+        iter_file_paths(self)
+        root(self) -> CompactNodeView
+        to_dict(self) -> dict
+    """
+
+    __slots__ = (
+        "root_rel_dir",
+        "names",
+        "_name_ids",
+        "node_parent",
+        "node_name",
+        "node_first_child",
+        "node_last_child",
+        "node_next_sibling",
+        "node_first_file",
+        "node_last_file",
+        "file_node",
+        "file_name",
+        "file_dir",
+        "file_next",
+        "skipped",
+        "stats",
+    )
+
+    def __init__(self, root_rel_dir: str = os.curdir):
+        """
+        Constructor. Creates a tree with an empty root node.
+
+        Args:
+            root_rel_dir (str): The relative directory of the root node used as prefix of the file paths.
+                "." yields the legacy "./file" paths of the source root.
+        """
+        self.root_rel_dir = root_rel_dir
+        self.names = []
+        self._name_ids = {}
+
+        self.node_parent = array("i")
+        self.node_name = array("i")
+        self.node_first_child = array("i")
+        self.node_last_child = array("i")
+        self.node_next_sibling = array("i")
+        self.node_first_file = array("i")
+        self.node_last_file = array("i")
+
+        self.file_node = array("i")
+        self.file_name = array("i")
+        self.file_dir = array("i")
+        self.file_next = array("i")
+
+        # Sparse {node: [name_id]} of directories pruned by the skip rules.
+        self.skipped = {}
+        # Optional FileStats with one row per file, recorded during the walk.
+        self.stats = None
+
+        self._append_node(NO_INDEX, NO_INDEX)
+
+    @classmethod
+    def from_dict(cls, tree_dict: dict, root_rel_dir: str = os.curdir):
+        """Builds a compact tree from a legacy oIt tree dictionary."""
+        tree = cls(root_rel_dir)
+        stack = [(0, root_rel_dir, tree_dict)]
+        while stack:
+            node, rel_dir, node_dict = stack.pop()
+            for file_path in node_dict.get(FILES, []):
+                file_dir, name = os.path.split(file_path)
+                tree.add_file(node, name, None if file_dir == rel_dir else file_dir)
+            for name in node_dict.get(SKIPPED, []):
+                tree.add_skipped(node, name)
+            for name, child_dict in node_dict.get(DIR, {}).items():
+                child_rel_dir = (
+                    name if rel_dir == os.curdir else os.path.join(rel_dir, name)
+                )
+                stack.append((tree.add_node(node, name), child_rel_dir, child_dict))
+        return tree
+
+    def __len__(self) -> int:
+        """Returns the number of files in the tree."""
+        return len(self.file_node)
+
+    @property
+    def node_count(self) -> int:
+        """Returns the number of directory nodes including the root."""
+        return len(self.node_parent)
+
+    def intern(self, name: str) -> int:
+        """Returns the id of `name` in the name pool, adding it if needed."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self._name_ids[name] = name_id
+            self.names.append(name)
+        return name_id
+
+    def _append_node(self, parent: int, name_id: int) -> int:
+        node = len(self.node_parent)
+        self.node_parent.append(parent)
+        self.node_name.append(name_id)
+        self.node_first_child.append(NO_INDEX)
+        self.node_last_child.append(NO_INDEX)
+        self.node_next_sibling.append(NO_INDEX)
+        self.node_first_file.append(NO_INDEX)
+        self.node_last_file.append(NO_INDEX)
+        return node
+
+    def add_node(self, parent: int, name: str) -> int:
+        """Appends a sub directory `name` to the `parent` node and returns its index."""
+        node = self._append_node(parent, self.intern(name))
+        last_child = self.node_last_child[parent]
+        if last_child == NO_INDEX:
+            self.node_first_child[parent] = node
+        else:
+            self.node_next_sibling[last_child] = node
+        self.node_last_child[parent] = node
+        return node
+
+    def add_file(self, node: int, name: str, rel_dir: str = None) -> int:
+        """
+        Appends a file with the base name `name` to `node` and returns its index. `rel_dir` is only needed
+        if the file does not live in the directory of the node, e.g. in a categorized tree.
+        """
+        file_index = len(self.file_node)
+        self.file_node.append(node)
+        self.file_name.append(self.intern(name))
+        self.file_dir.append(NO_INDEX if rel_dir is None else self.intern(rel_dir))
+        self.file_next.append(NO_INDEX)
+        last_file = self.node_last_file[node]
+        if last_file == NO_INDEX:
+            self.node_first_file[node] = file_index
+        else:
+            self.file_next[last_file] = file_index
+        self.node_last_file[node] = file_index
+        return file_index
+
+    def add_skipped(self, node: int, name: str):
+        """Records a directory pruned by the skip rules below `node`."""
+        self.skipped.setdefault(node, []).append(self.intern(name))
+
+    def children(self, node: int):
+        """Yields the (name, child_node) pairs of a node in insertion order."""
+        child = self.node_first_child[node]
+        while child != NO_INDEX:
+            yield self.names[self.node_name[child]], child
+            child = self.node_next_sibling[child]
+
+    def files(self, node: int):
+        """
+        Yields the (rel_dir, name) pairs of the files of a node in insertion order. `rel_dir` is None for
+        files in the directory of the node.
+        """
+        file_index = self.node_first_file[node]
+        while file_index != NO_INDEX:
+            dir_id = self.file_dir[file_index]
+            yield (
+                None if dir_id == NO_INDEX else self.names[dir_id],
+                self.names[self.file_name[file_index]],
+            )
+            file_index = self.file_next[file_index]
+
+    def file_indexes(self, node: int):
+        """Yields the indexes of the files of a node in the same order as :meth:`files`."""
+        file_index = self.node_first_file[node]
+        while file_index != NO_INDEX:
+            yield file_index
+            file_index = self.file_next[file_index]
+
+    def iter_file_paths(self):
+        """Yields the (file_index, file_path) pairs of all files in the tree in the legacy oIt path format."""
+        stack = [(0, self.root_rel_dir)]
+        while stack:
+            node, rel_dir = stack.pop()
+            file_index = self.node_first_file[node]
+            while file_index != NO_INDEX:
+                dir_id = self.file_dir[file_index]
+                yield file_index, os.path.join(
+                    rel_dir if dir_id == NO_INDEX else self.names[dir_id],
+                    self.names[self.file_name[file_index]],
+                )
+                file_index = self.file_next[file_index]
+            for name, child in self.children(node):
+                stack.append(
+                    (
+                        child,
+                        name if rel_dir == os.curdir else os.path.join(rel_dir, name),
+                    )
+                )
+
+    def root(self):
+        """Returns a read only mapping view of the root node in the legacy oIt dictionary format."""
+        return CompactNodeView(self, 0, self.root_rel_dir)
+
+    def to_dict(self) -> dict:
+        """Converts the tree to the legacy oIt dictionary format."""
+        return _view_to_dict(self.root())
+
+
+def _view_to_dict(view) -> dict:
+    tree_dict = {FILES: list(view[FILES]), DIR: {}}
+    if SKIPPED in view:
+        tree_dict[SKIPPED] = list(view[SKIPPED])
+    for name, child_view in view[DIR].items():
+        tree_dict[DIR][name] = _view_to_dict(child_view)
+    return tree_dict
+
+
+class CompactNodeView(Mapping):
+    """
+    Read only view of a CompactTree node that behaves like a node of the legacy oIt dictionary.
+    The file paths of a node are only built when its 'files' key is accessed.
+    """
+
+    __slots__ = ("tree", "node", "rel_dir")
+
+    def __init__(self, tree: CompactTree, node: int, rel_dir: str):
+        self.tree = tree
+        self.node = node
+        self.rel_dir = rel_dir
+
+    def _keys(self) -> tuple:
+        return (FILES, DIR, SKIPPED) if self.node in self.tree.skipped else (FILES, DIR)
+
+    def __getitem__(self, key):
+        if key == FILES:
+            return [
+                os.path.join(self.rel_dir if file_dir is None else file_dir, name)
+                for file_dir, name in self.tree.files(self.node)
+            ]
+        if key == DIR:
+            return CompactDirView(self.tree, self.node, self.rel_dir)
+        if key == SKIPPED and self.node in self.tree.skipped:
+            return [
+                self.tree.names[name_id] for name_id in self.tree.skipped[self.node]
+            ]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def to_dict(self) -> dict:
+        """Converts the node and its sub directories to the legacy oIt dictionary format."""
+        return _view_to_dict(self)
+
+    def file_stamps(self) -> list:
+        """
+        Returns the recorded (size, mtime_ns) of the files of the node in the order of its 'files', None for
+        files that could not be stat'ed. Returns None if the tree has no stats.
+        """
+        stats = self.tree.stats
+        if stats is None:
+            return None
+        return [
+            stats.stamp(file_index) for file_index in self.tree.file_indexes(self.node)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+
+class CompactDirView(Mapping):
+    """Read only view of the sub directories of a CompactTree node, mapping names to CompactNodeViews."""
+
+    __slots__ = ("tree", "node", "rel_dir", "_children")
+
+    def __init__(self, tree: CompactTree, node: int, rel_dir: str):
+        self.tree = tree
+        self.node = node
+        self.rel_dir = rel_dir
+        self._children = None
+
+    def _child_nodes(self) -> dict:
+        if self._children is None:
+            self._children = dict(self.tree.children(self.node))
+        return self._children
+
+    def __getitem__(self, name):
+        child = self._child_nodes()[name]
+        child_rel_dir = (
+            name if self.rel_dir == os.curdir else os.path.join(self.rel_dir, name)
+        )
+        return CompactNodeView(self.tree, child, child_rel_dir)
+
+    def __iter__(self):
+        return (name for name, _ in self.tree.children(self.node))
+
+    def __len__(self) -> int:
+        return len(self._child_nodes())
+
+    def __contains__(self, name) -> bool:
+        return name in self._child_nodes()
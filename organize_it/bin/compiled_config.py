@@ -0,0 +1,119 @@
+""" Compiled config module which caches the parsed, validated and compiled config between runs """
+
+import os
+import json
+import hashlib
+import logging
+
+import yaml
+
+from organize_it.settings import TMP_DIR, SCHEMA, load_yaml
+from organize_it.bin.categorizer import Categorizer
+from organize_it.schema_validation.validator import JSONSchemaValidator
+
+LOGGER = logging.getLogger(__name__)
+
+# Bump when the json records of the artifact change. The layout of Categorizer is not part of the artifact.
+COMPILED_CONFIG_VERSION = 3
+
+
+class CompiledConfig(dict):
+    """
+    A parsed and schema validated config together with its compiled :class:`Categorizer` (normalized rules,
+    extension trie and name pattern sources).
+
+    It is a dict of the config, so it can be passed wherever a config is expected, and a Categorizer created
+    for it copies the compiled rules instead of building them again. The artifact is saved as plain json to
+    `TMP_DIR`: the parsed config with its rules and name pattern sources and the validation result, keyed by
+    the hash of the config file content and the schema. Later runs load it directly and skip the YAML parsing
+    and the validation, the extension trie and the regexes are rebuilt from it. Editing the config or the schema
+    changes the key. The artifact holds no code or objects, so loading a tampered or stale one can not run
+    anything and a change of the Categorizer needs no version bump.
+
+    Methods:
+        load(config_path: str, schema: dict = SCHEMA, cache_dir: str = TMP_DIR)
+        content_hash(config_bytes: bytes, schema: dict = SCHEMA) -> str
+    """
+
+    def __init__(self, config: dict, config_hash: str, validated: bool):
+        """
+        Constructor. Compiles the rules of `config`.
+
+        Args:
+            config (dict): The parsed config.
+            config_hash (str): The hash of the config file content and the schema.
+            validated (bool): If the config passed the schema validation.
+        """
+        super().__init__(config)
+        self.config_hash = config_hash
+        self.validated = validated
+        self.compiled_categorizer = Categorizer(config)
+
+    @staticmethod
+    def content_hash(config_bytes: bytes, schema: dict = SCHEMA) -> str:
+        """Returns the hash of a config file content, the schema and the artifact version."""
+        content_hash = hashlib.sha1(config_bytes)
+        content_hash.update(repr(sorted(schema.items())).encode("utf-8"))
+        content_hash.update(str(COMPILED_CONFIG_VERSION).encode("utf-8"))
+        return content_hash.hexdigest()
+
+    @classmethod
+    def load(cls, config_path: str, schema: dict = SCHEMA, cache_dir: str = TMP_DIR):
+        """
+        Returns the compiled config of a YAML file, from the artifact in `cache_dir` if the file was compiled
+        before. Otherwise the file is parsed, validated, compiled and the artifact is saved.
+
+        Args:
+            config_path (str): The YAML config file or a directory with a single YAML file.
+            schema (dict): The json-schema the config is validated with.
+            cache_dir (str): The directory of the compiled artifacts.
+
+        Returns:
+            CompiledConfig: The compiled config. Directories with several YAML files are loaded with
+            `load_yaml` as before and returned as list without compiling them.
+        """
+        if os.path.isdir(config_path):
+            yaml_files = sorted(
+                name for name in os.listdir(config_path) if name.endswith(".yaml")
+            )
+            if len(yaml_files) != 1:
+                return load_yaml(config_path)
+            config_path = os.path.join(config_path, yaml_files[0])
+
+        with open(config_path, "rb") as config_file:
+            config_bytes = config_file.read()
+        config_hash = cls.content_hash(config_bytes, schema)
+        artifact_path = os.path.join(cache_dir, f".compiled_config_{config_hash}.json")
+
+        if os.path.exists(artifact_path):
+            try:
+                with open(artifact_path, "r", encoding="utf-8") as artifact_file:
+                    artifact = json.load(artifact_file)
+                return cls(artifact["config"], config_hash, artifact["validated"])
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                LOGGER.warning(
+                    " - Ignoring unreadable compiled config %s: %s",
+                    artifact_path,
+                    error,
+                )
+
+        config = yaml.full_load(config_bytes)
+        # Exits the tool if the config is invalid, so only valid configs are compiled and saved.
+        validated = JSONSchemaValidator(
+            config_data=config, schema=schema
+        ).validate_config()
+        compiled_config = cls(config, config_hash, validated)
+
+        try:
+            artifact = json.dumps({"config": config, "validated": validated})
+            if json.loads(artifact)["config"] != config:
+                raise ValueError("the config does not survive a json round trip")
+        except (TypeError, ValueError) as error:
+            # YAML values without a json equivalent, e.g. dates or integer keys, are compiled on every run.
+            LOGGER.warning(" - Not saving the compiled config: %s", error)
+            return compiled_config
+        tmp_path = f"{artifact_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as artifact_file:
+            artifact_file.write(artifact)
+        os.replace(tmp_path, artifact_path)
+        return compiled_config
@@ -0,0 +1,142 @@
+""" Content sniffer module which detects the format of files by their leading magic bytes """
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Maximum number of bytes read from the start of a file. The tar signature at offset 257 is the deepest.
+SNIFF_BYTES = 512
+
+DEFAULT_SNIFF_WORKERS = 8
+
+# (offset, magic bytes, extension) of the detected formats. The extension is looked up in the format rules
+# of the config, so a sniffed file gets the same category as a file with that extension.
+MAGIC_SIGNATURES = (
+    (0, b"\xff\xd8\xff", "jpg"),
+    (0, b"\x89PNG\r\n\x1a\n", "png"),
+    (0, b"GIF87a", "gif"),
+    (0, b"GIF89a", "gif"),
+    (0, b"%PDF-", "pdf"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "doc"),
+    (0, b"PK\x03\x04", "zip"),
+    (0, b"Rar!\x1a\x07", "rar"),
+    (0, b"\x1f\x8b", "gz"),
+    (0, b"!<arch>\ndebian", "deb"),
+    (0, b"\x30\x26\xb2\x75\x8e\x66\xcf\x11", "wmv"),
+    (4, b"ftyp", "mp4"),
+    (257, b"ustar", "tar"),
+)
+
+
+def _pread(fd: int, size: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, 0)
+    return os.read(fd, size)
+
+
+def detect_extension(head: bytes) -> str:
+    """Returns the extension of the first signature that matches the leading bytes `head` or None."""
+    for offset, magic, extension in MAGIC_SIGNATURES:
+        if head.startswith(magic, offset):
+            return extension
+    return None
+
+
+class ContentSniffer:
+    """
+    Detects the format of files from their first bytes, for files that are not classified by their name
+    or extension, e.g. extensionless or renamed files.
+
+    At most `read_size` bytes are read per file with a single `pread`, and the batches of a run are read by
+    one pool of threads. The files are never stat'ed. Files with the (size, mtime_ns) recorded during the
+    walk are cached by path and stamp, so a file classified again in the same run, e.g. by a lazy tree that is
+    rendered and then copied, is not read twice. Nothing is cached across runs.
+
+    Methods:
+        sniff(self, rel_path: str, stamp: tuple = None) -> str
+        sniff_batch(self, rel_paths: list, stamps: list = None) -> list
+        close(self)
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        workers: int = DEFAULT_SNIFF_WORKERS,
+        read_size: int = SNIFF_BYTES,
+    ):
+        """
+        Constructor
+
+        Args:
+            root_path (str): The source directory the relative file paths belong to.
+            workers (int): Number of threads reading files concurrently in `sniff_batch`.
+            read_size (int): Maximum number of bytes read per file.
+        """
+        self.root_path = root_path
+        self.workers = max(1, workers or 1)
+        self.read_size = read_size
+        self.files_read = 0
+        # {(rel_path, size, mtime_ns): extension}
+        self._cache = {}
+        self._executor = None
+
+    def __getstate__(self) -> dict:
+        # The thread pool stays in this process, e.g. when the categorizer is sent to worker processes.
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    def sniff(self, rel_path: str, stamp: tuple = None) -> str:
+        """
+        Returns the extension detected from the content of the file at `rel_path` or None.
+
+        Args:
+            rel_path (str): The file path relative to `root_path`.
+            stamp (tuple): Optional (size, mtime_ns) of the file as recorded during the walk. Only files
+                with a stamp are cached.
+        """
+        cache_key = None
+        if stamp is not None:
+            cache_key = (rel_path, *stamp)
+            if cache_key in self._cache:
+                return self._cache[cache_key]
+
+        path = os.path.join(self.root_path, rel_path)
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        except OSError:
+            return None
+        try:
+            head = _pread(fd, self.read_size)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+
+        self.files_read += 1
+        extension = detect_extension(head)
+        if cache_key is not None:
+            self._cache[cache_key] = extension
+        return extension
+
+    def sniff_batch(self, rel_paths: list, stamps: list = None) -> list:
+        """
+        Returns the detected extension or None for each path, reading the files with the thread pool of the
+        sniffer, which is started by the first batch.
+
+        Args:
+            rel_paths (list): The file paths relative to `root_path`.
+            stamps (list): Optional recorded (size, mtime_ns) per path, None for files without stats.
+        """
+        if stamps is None:
+            stamps = [None] * len(rel_paths)
+        if self.workers > 1 and len(rel_paths) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            return list(self._executor.map(self.sniff, rel_paths, stamps))
+        return list(map(self.sniff, rel_paths, stamps))
+
+    def close(self):
+        """Stops the thread pool. A later batch starts a new one."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,195 @@
+""" Copy backend module which copies file contents with the fastest mechanism the devices support """
+
+import os
+import sys
+import stat
+import errno
+import threading
+from collections import Counter
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Backends in the order they are tried.
+REFLINK = "reflink"
+COPY_FILE_RANGE = "copy_file_range"
+SENDFILE = "sendfile"
+BUFFERED = "buffered"
+
+# ioctl of Linux which shares the extents of a file with another file on btrfs, XFS and other CoW file systems.
+FICLONE = 0x40049409
+
+# Size of the chunks of the kernel copies and of the buffer of the buffered copy.
+CHUNK_SIZE = 8 * 2**20
+BUFFER_SIZE = 2**20
+
+# Errors of a backend that does not work for a pair of devices. Any other error is an error of the file.
+UNSUPPORTED_ERRNOS = frozenset(
+    code
+    for code in (
+        getattr(errno, name, None)
+        for name in (
+            "EXDEV",
+            "EINVAL",
+            "ENOSYS",
+            "ENOTTY",
+            "EOPNOTSUPP",
+            "ENOTSUP",
+            "EBADF",
+            "ETXTBSY",
+        )
+    )
+    if code is not None
+)
+
+
+def _nothing_copied(backend: str, size: int):
+    # Some kernel and file system pairs return 0 instead of failing with EXDEV, like CPython's shutil
+    # this is treated as an unsupported backend.
+    if size > 0:
+        raise OSError(
+            errno.EOPNOTSUPP, f"{backend} copied no data of a {size} byte file"
+        )
+
+
+def _reflink(src_fd: int, dst_fd: int, _: int):
+    fcntl.ioctl(dst_fd, FICLONE, src_fd)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int):
+    # The size of the source is not trusted, some files report 0, so copy until the end of the file.
+    copied = os.copy_file_range(src_fd, dst_fd, CHUNK_SIZE)
+    if not copied:
+        _nothing_copied(COPY_FILE_RANGE, size)
+    while copied:
+        copied = os.copy_file_range(src_fd, dst_fd, CHUNK_SIZE)
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int):
+    offset = 0
+    while True:
+        sent = os.sendfile(dst_fd, src_fd, offset, CHUNK_SIZE)
+        if not sent:
+            if not offset:
+                _nothing_copied(SENDFILE, size)
+            return
+        offset += sent
+
+
+def _buffered(src_fd: int, dst_fd: int, _: int):
+    while True:
+        chunk = memoryview(os.read(src_fd, BUFFER_SIZE))
+        if not chunk:
+            return
+        while chunk:
+            chunk = chunk[os.write(dst_fd, chunk) :]
+
+
+BACKEND_FUNCTIONS = {
+    REFLINK: _reflink,
+    COPY_FILE_RANGE: _copy_file_range,
+    SENDFILE: _sendfile,
+    BUFFERED: _buffered,
+}
+
+
+def available_backends() -> tuple:
+    """Returns the backends of this platform in the order they are tried. The buffered copy is always last."""
+    backends = []
+    if fcntl is not None and sys.platform.startswith("linux"):
+        backends.append(REFLINK)
+    if hasattr(os, "copy_file_range"):
+        backends.append(COPY_FILE_RANGE)
+    # sendfile only accepts regular files as output on Linux.
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        backends.append(SENDFILE)
+    backends.append(BUFFERED)
+    return tuple(backends)
+
+
+class CopyBackend:
+    """
+    Copies the content and the permission bits of files like `shutil.copy`, but with the fastest mechanism
+    the source and destination devices support: a `FICLONE` reflink, which shares the data on copy-on-write
+    file systems, `os.copy_file_range` and `os.sendfile`, which copy inside the kernel, and a buffered copy.
+
+    The backends are probed once per (source device, destination device) pair. A backend that fails with an
+    "unsupported" error, e.g. EXDEV or EOPNOTSUPP, is not tried again for that pair and the next one is
+    used. All other errors, like ENOSPC, are raised. A copy is only reported as done if the destination has at
+    least the size the source had when it was opened, so a short copy never leads to a removed source. It is thread safe, so a single instance is shared by
+    the workers of :class:`FileOperationExecutor`.
+
+    Methods:
+        copy_file(self, source_file_path: str, dest_file_path: str) -> str
+        pair_backend(self, source_dev: int, dest_dev: int) -> str
+    """
+
+    def __init__(self, backends: tuple = None):
+        """
+        Constructor
+
+        Args:
+            backends (tuple): Names of the backends to try in order. Defaults to `available_backends()`. The
+                buffered copy is appended if missing, so copying always works.
+        """
+        backends = tuple(backends or available_backends())
+        if BUFFERED not in backends:
+            backends += (BUFFERED,)
+        self.backends = backends
+        # Number of files copied per backend.
+        self.counts = Counter()
+        # {(source dev, dest dev): index of the first backend to try}
+        self._pair_backends = {}
+        self._lock = threading.Lock()
+
+    def pair_backend(self, source_dev: int, dest_dev: int) -> str:
+        """Returns the backend used for a pair of devices, the first one if the pair was not probed yet."""
+        return self.backends[self._pair_backends.get((source_dev, dest_dev), 0)]
+
+    def copy_file(self, source_file_path: str, dest_file_path: str) -> str:
+        """
+        Copies the content and the permission bits of `source_file_path` to `dest_file_path`, which is replaced
+        if it exists.
+
+        Returns:
+            str: The name of the backend that copied the file.
+        """
+        with open(source_file_path, "rb") as source_file, open(
+            dest_file_path, "wb"
+        ) as dest_file:
+            src_fd = source_file.fileno()
+            dst_fd = dest_file.fileno()
+            source_stat = os.fstat(src_fd)
+            pair = (source_stat.st_dev, os.fstat(dst_fd).st_dev)
+            backend_index = self._pair_backends.get(pair, 0)
+
+            while True:
+                backend = self.backends[backend_index]
+                try:
+                    BACKEND_FUNCTIONS[backend](src_fd, dst_fd, source_stat.st_size)
+                    copied_size = os.fstat(dst_fd).st_size
+                    if copied_size >= source_stat.st_size:
+                        break
+                    raise OSError(
+                        errno.EIO if backend == BUFFERED else errno.EOPNOTSUPP,
+                        f"{backend} copied {copied_size} of {source_stat.st_size} bytes",
+                        source_file_path,
+                    )
+                except OSError as error:
+                    if backend == BUFFERED or error.errno not in UNSUPPORTED_ERRNOS:
+                        raise
+                # Fall back to the next backend for this pair, from the start of both files.
+                backend_index += 1
+                with self._lock:
+                    if self._pair_backends.get(pair, 0) < backend_index:
+                        self._pair_backends[pair] = backend_index
+                os.lseek(src_fd, 0, os.SEEK_SET)
+                os.lseek(dst_fd, 0, os.SEEK_SET)
+                os.ftruncate(dst_fd, 0)
+
+        os.chmod(dest_file_path, stat.S_IMODE(source_stat.st_mode))
+        with self._lock:
+            self.counts[backend] += 1
+        return backend
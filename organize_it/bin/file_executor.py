@@ -0,0 +1,257 @@
+""" File executor module which copies or moves files with a bounded pool of threads """
+
+import os
+import errno
+import shutil
+import logging
+import threading
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+
+from organize_it.bin.copy_backend import CopyBackend
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_IO_WORKERS = 8
+
+# Maximum number of queued operations per worker. Bounds the memory of the work queue for huge trees.
+QUEUE_SIZE_PER_WORKER = 64
+
+# Strategies of the file operations. Moves within a device are a single rename, moves across devices are
+# a streaming copy followed by an unlink of the source.
+COPY = "copy"
+RENAME = "rename"
+COPY_UNLINK = "copy+unlink"
+HARDLINK = "hardlink"
+SYMLINK = "symlink"
+
+# Values of --link-mode. The destination tree is built out of hard or symbolic links to the source files.
+HARD_LINK_MODE = "hard"
+SYM_LINK_MODE = "sym"
+LINK_MODES = (HARD_LINK_MODE, SYM_LINK_MODE)
+
+# Errors of os.link for links the file system cannot create. The file is copied instead.
+HARDLINK_FALLBACK_ERRNOS = frozenset((errno.EXDEV, errno.EPERM, errno.EMLINK))
+
+
+class FileOperationExecutor:
+    """
+    Copies or moves files into their destination directories with a bounded pool of threads, so several
+    file operations are in flight at once. That matters on SSD arrays and network storage, where a single
+    copy at a time leaves most of the bandwidth unused.
+
+    Operations are queued with :meth:`submit`, which blocks while the queue is full. Failed operations do
+    not stop the others, their errors are collected in `errors` and reported once all operations are done.
+    Every file goes to the same destination as with :meth:`FileManager.sort_file`, so the resulting layout
+    does not depend on the number of workers.
+
+    Moves are grouped by the (source device, destination device) pair. The source device comes from the
+    stats recorded during the walk and the destination device is stat'ed once per directory. Moves within
+    a device are a single `os.rename`, moves across devices are copied and the source is unlinked once the
+    copy succeeded. Unlike `shutil.move`, an existing destination file is never replaced. The number of
+    files and the time spent per group are logged when the executor is closed.
+
+    File contents are copied with a :class:`CopyBackend`, which uses reflinks or in-kernel copies where the
+    devices support them.
+
+    With a `link_mode` the source files are neither copied nor moved. The destination tree is built out of
+    hard links (HARD_LINK_MODE) or absolute symbolic links (SYM_LINK_MODE), so only metadata is written.
+    Hard links cannot cross devices, those files are copied instead.
+
+    Methods:
+        submit(self, source_file_path: str, dest_dir_path: str, source_dev: int = None)
+        prepare_dirs(self, dest_dir_paths)
+        group_summary(self) -> list
+        close(self) -> list
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_IO_WORKERS,
+        move_files: bool = False,
+        queue_size: int = None,
+        copy_backend: CopyBackend = None,
+        link_mode: str = None,
+    ):
+        """
+        Constructor
+
+        Args:
+            workers (int): Number of threads copying or moving files concurrently.
+            move_files (bool): Move the files instead of copying them.
+            queue_size (int): Maximum number of queued operations. Defaults to QUEUE_SIZE_PER_WORKER per worker.
+            copy_backend (CopyBackend): The backend copying the file contents. Defaults to all available backends.
+            link_mode (str): One of LINK_MODES to link the files into the destination. `move_files` is ignored then.
+        """
+        if link_mode is not None and link_mode not in LINK_MODES:
+            raise ValueError(
+                f"Unknown link mode {link_mode}, expected one of {LINK_MODES}"
+            )
+        self.workers = max(1, workers or 1)
+        self.move_files = move_files
+        self.copy_backend = copy_backend or CopyBackend()
+        self.link_mode = link_mode
+        self.files = 0
+        self.errors = []
+        # {dest dir path: st_dev} of the directories created so far.
+        self._dest_devs = {}
+        # {(strategy, source dev, dest dev): [files, seconds]}
+        self._groups = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(
+            queue_size or self.workers * QUEUE_SIZE_PER_WORKER
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="oit-io"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def submit(self, source_file_path: str, dest_dir_path: str, source_dev: int = None):
+        """
+        Queues the copy or move of a file into `dest_dir_path`. Blocks while the queue is full.
+
+        Args:
+            source_file_path (str): The path of the source file.
+            dest_dir_path (str): The directory the file is copied or moved into. Created if needed.
+            source_dev (int): The recorded `st_dev` of the source file. Moves stat the file if it is None.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(
+                self._perform, source_file_path, dest_dir_path, source_dev
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+    def prepare_dirs(self, dest_dir_paths):
+        """Creates the destination directories up front, so the workers neither create nor stat them per file."""
+        for dest_dir_path in dest_dir_paths:
+            self._dest_dev(dest_dir_path)
+
+    def _dest_dev(self, dest_dir_path: str) -> int:
+        # Every category directory is created and stat'ed once instead of once per file.
+        dest_dev = self._dest_devs.get(dest_dir_path)
+        if dest_dev is None:
+            os.makedirs(dest_dir_path, exist_ok=True)
+            dest_dev = os.stat(dest_dir_path).st_dev
+            self._dest_devs[dest_dir_path] = dest_dev
+        return dest_dev
+
+    def _perform(self, source_file_path: str, dest_dir_path: str, source_dev: int):
+        start = perf_counter()
+        try:
+            dest_dev = self._dest_dev(dest_dir_path)
+            if self.link_mode is not None:
+                strategy = self._link(
+                    source_file_path, dest_dir_path, source_dev, dest_dev
+                )
+            elif self.move_files:
+                if source_dev is None:
+                    source_dev = os.lstat(source_file_path).st_dev
+                strategy = RENAME if source_dev == dest_dev else COPY_UNLINK
+                self._move(source_file_path, dest_dir_path, strategy)
+            else:
+                strategy = COPY
+                self.copy_backend.copy_file(
+                    source_file_path,
+                    os.path.join(dest_dir_path, os.path.basename(source_file_path)),
+                )
+        except (OSError, shutil.Error) as error:
+            with self._lock:
+                self.errors.append((source_file_path, dest_dir_path, error))
+            return
+
+        seconds = perf_counter() - start
+        with self._lock:
+            self.files += 1
+            group = self._groups.setdefault((strategy, source_dev, dest_dev), [0, 0.0])
+            group[0] += 1
+            group[1] += seconds
+
+    def _move(self, source_file_path: str, dest_dir_path: str, strategy: str):
+        dest_file_path = os.path.join(dest_dir_path, os.path.basename(source_file_path))
+        if os.path.lexists(dest_file_path):
+            raise FileExistsError(
+                errno.EEXIST, "Destination path already exists", dest_file_path
+            )
+        if strategy == RENAME:
+            os.rename(source_file_path, dest_file_path)
+            return
+        # The source is only removed once the copy is complete.
+        if os.path.islink(source_file_path):
+            shutil.copy2(source_file_path, dest_file_path, follow_symlinks=False)
+        else:
+            self.copy_backend.copy_file(source_file_path, dest_file_path)
+            shutil.copystat(source_file_path, dest_file_path)
+        os.unlink(source_file_path)
+
+    def _link(
+        self, source_file_path: str, dest_dir_path: str, source_dev: int, dest_dev: int
+    ) -> str:
+        dest_file_path = os.path.join(dest_dir_path, os.path.basename(source_file_path))
+        if self.link_mode == SYM_LINK_MODE:
+            os.symlink(os.path.abspath(source_file_path), dest_file_path)
+            return SYMLINK
+
+        # Files recorded on another device are copied right away instead of failing with EXDEV first.
+        if source_dev is None or source_dev == dest_dev:
+            try:
+                os.link(source_file_path, dest_file_path)
+                return HARDLINK
+            except OSError as error:
+                if error.errno not in HARDLINK_FALLBACK_ERRNOS:
+                    raise
+        if os.path.lexists(dest_file_path):
+            raise FileExistsError(
+                errno.EEXIST, "Destination path already exists", dest_file_path
+            )
+        self.copy_backend.copy_file(source_file_path, dest_file_path)
+        return COPY
+
+    def group_summary(self) -> list:
+        """Returns the strategy, devices, number of files and seconds of every (strategy, source dev, dest dev) group."""
+        return [
+            {
+                "strategy": strategy,
+                "source_dev": source_dev,
+                "dest_dev": dest_dev,
+                "files": files,
+                "seconds": seconds,
+            }
+            for (strategy, source_dev, dest_dev), (files, seconds) in sorted(
+                self._groups.items(), key=lambda item: str(item[0])
+            )
+        ]
+
+    def close(self) -> list:
+        """Waits for all queued operations and returns the list of (source, destination dir, error) of the failed ones."""
+        self._executor.shutdown(wait=True)
+        for group in self.group_summary():
+            LOGGER.info(
+                " - %s: %s files from device %s to %s in %.3f s (summed over the workers).",
+                group["strategy"],
+                group["files"],
+                group["source_dev"],
+                group["dest_dev"],
+                group["seconds"],
+            )
+        if self.copy_backend.counts:
+            LOGGER.info(
+                " - Copied files per backend: %s",
+                dict(self.copy_backend.counts.most_common()),
+            )
+        for source_file_path, dest_dir_path, error in self.errors:
+            LOGGER.error(
+                " - Failed to organize %s into %s: %s",
+                source_file_path,
+                dest_dir_path,
+                error,
+            )
+        return self.errors
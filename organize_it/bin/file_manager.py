@@ -12,6 +12,10 @@ from organize_it.settings import (
     RULES,
     exit_gracefully,
 )
+from organize_it.bin.walker import DirectoryWalker, DEFAULT_BATCH_SIZE
+from organize_it.bin.compact_tree import CompactTree
+from organize_it.bin.tree_snapshot import write_snapshot
+from organize_it.bin.file_executor import FileOperationExecutor
 
 LOGGER = logging.getLogger(__name__)
 
@@ -42,14 +46,26 @@ class FileManager:
     A class to handle complex file operations such as traversal, generating directory tree. etc
 
     Methods:
-        file_walk(self, current_dir: str = None, file_path: str = None) -> dict
+        file_walk(self, current_dir: str = None, file_path: str = None, exclude=None, show_pruned: bool = False) -> dict
+        file_walk_compact(self, exclude=None, show_pruned: bool = False) -> CompactTree
+        iter_file_batches(self, batch_size: int = DEFAULT_BATCH_SIZE, exclude=None, skip_dirs_without_files: bool = False, with_stats: bool = False)
         def generate_tree_structure(self, tree_dict, indent, generated_tree_file)
     """
 
-    def __init__(self, source_path: str, destination_path: str = None):
+    def __init__(
+        self,
+        source_path: str,
+        destination_path: str = None,
+        walk_workers: int = 1,
+        scan_index=None,
+    ):
         """Constructor"""
         self.source_path = sanitize_file_path(source_path)
         self.destination_path = sanitize_file_path(destination_path)
+        # Number of threads used to list directories concurrently in file_walk.
+        self.walk_workers = walk_workers
+        # Optional persistent ScanIndex to skip listing unchanged directories in file_walk.
+        self.scan_index = scan_index
 
         # Make sure the source directory has the necessary permissions.
         if not (
@@ -62,14 +78,23 @@ class FileManager:
                 )
             )
 
-    def file_walk(self, current_dir: str = None, file_path: str = None) -> dict:
+    def file_walk(
+        self,
+        current_dir: str = None,
+        file_path: str = None,
+        exclude=None,
+        show_pruned: bool = False,
+    ) -> dict:
         """
-        Recursively lists all files and directories starting from the given root directory,
+        Lists all files and directories starting from the given root directory in a single pass,
         and returns the result in a nested oIt dictionary format.
 
         Args:
             current_dir (str): The current directory from which to perform the search.
             file_path (str): File path to save the resultant dict, preferably as json.
+            exclude (callable): Optional `exclude(name, is_dir) -> bool` skip rule, e.g. :meth:`Categorizer.is_excluded`.
+                Excluded directories are pruned before they are walked.
+            show_pruned (bool): Keep the names of pruned directories under the 'skipped' key of their parent.
 
         Returns:
             dict: A dictionary containing files and subdirectories in the format:
@@ -97,31 +122,19 @@ class FileManager:
                 f"The provided path {current_dir} is not a valid directory."
             )
 
-        file_dict = {FILES: [], DIR: {}}
-
-        # Traverse the root directory using os.walk to get directories and files
-        for dirpath, _, filenames in os.walk(current_dir):
-            # Skip directories above the current directory level
-            rel_dir = os.path.relpath(
-                dirpath, self.source_path
-            )  # relative to source_dir
-            if dirpath == current_dir:
-                # Add files directly in the root directory
-                file_dict[FILES] = sorted([os.path.join(rel_dir, f) for f in filenames])
-
-            else:
-                # For subdirectories, add their content recursively
-                # TODO: if there are not sub dir, we don't need to return empty object. Fix tests later
-                if len(dirpath.split("/")) - 1 == len(current_dir.split("/")):
-                    subdir_name = os.path.basename(dirpath)
-                    if subdir_name not in file_dict[DIR]:
-                        file_dict[DIR][subdir_name] = {
-                            FILES: sorted(
-                                [os.path.join(rel_dir, f) for f in filenames]
-                            ),
-                            # Recursive call for subdirectories
-                            DIR: self.file_walk(current_dir=dirpath)[DIR],
-                        }
+        # Single pass traversal. Every directory is listed exactly once.
+        file_dict = DirectoryWalker(
+            self.source_path,
+            self.walk_workers,
+            self.scan_index,
+            exclude=exclude,
+            show_pruned=show_pruned,
+        ).walk(current_dir)
+
+        # Only a walk of the whole source directory refreshes every entry of the index.
+        if self.scan_index is not None and current_dir == self.source_path:
+            self.scan_index.save()
+
         if file_path:
             LOGGER.info(" - Saving file structure to %s", os.path.basename(file_path))
             FileManager.create_and_write_file(
@@ -133,11 +146,84 @@ class FileManager:
 
         return file_dict
 
+    def file_walk_compact(
+        self,
+        exclude=None,
+        show_pruned: bool = False,
+        snapshot_path: str = None,
+        file_path: str = None,
+        record_stats: bool = False,
+    ):
+        """
+        Walks the source directory like :meth:`file_walk` but returns a :class:`CompactTree`,
+        which needs a fraction of the memory of the nested dictionary for large trees.
+
+        Args:
+            exclude (callable): Optional `exclude(name, is_dir) -> bool` skip rule. Excluded directories are not walked.
+            show_pruned (bool): Keep the names of pruned directories as placeholders.
+            snapshot_path (str): File path to save the tree as a binary snapshot, see :class:`TreeSnapshot`.
+            file_path (str): File path to save the tree as json. Meant for debugging, it is much slower than the snapshot.
+            record_stats (bool): Record size, mtime, inode, device and mode of every file into `tree.stats`
+                during the walk, so later stages do not have to hit the file system again.
+        """
+        tree = DirectoryWalker(
+            self.source_path,
+            self.walk_workers,
+            self.scan_index,
+            exclude=exclude,
+            show_pruned=show_pruned,
+        ).walk_compact(record_stats=record_stats)
+
+        if self.scan_index is not None:
+            self.scan_index.save()
+
+        if snapshot_path:
+            LOGGER.info(
+                " - Saving file structure snapshot to %s",
+                os.path.basename(snapshot_path),
+            )
+            write_snapshot(tree, snapshot_path)
+
+        if file_path:
+            LOGGER.info(" - Saving file structure to %s", os.path.basename(file_path))
+            FileManager.create_and_write_file(
+                file_path=file_path,
+                callback=lambda file_stream: json.dump(
+                    tree.to_dict(), file_stream, ensure_ascii=False, indent=4
+                ),
+            )
+
+        return tree
+
+    def iter_file_batches(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        exclude=None,
+        skip_dirs_without_files: bool = False,
+        with_stats: bool = False,
+    ):
+        """
+        Streams the source directory as `(rel_dir, entries)` batches with bounded memory.
+        See :meth:`DirectoryWalker.iter_batches`.
+
+        Args:
+            batch_size (int): The maximum number of file entries per batch.
+            exclude (callable): Optional `exclude(name, is_dir) -> bool` skip rule. Excluded directories are not walked.
+            skip_dirs_without_files (bool): Skip the sub directories without files of their own and their subtrees.
+            with_stats (bool): Yield (rel_dir, entries, stamps) batches with the (size, mtime_ns) of the files.
+        """
+        return DirectoryWalker(self.source_path, exclude=exclude).iter_batches(
+            batch_size, skip_dirs_without_files, with_stats
+        )
+
     def categorize_and_sort_file(
         self,
         config: dict,
         sorted_tree_dict: dict,
         move_files: bool = False,
+        source_tree: CompactTree = None,
+        io_workers: int = 1,
+        link_mode: str = None,
     ):
         """
         Categorizes and sorts files from the source directory into the destination directory according to predefined rules.
@@ -154,53 +240,221 @@ class FileManager:
                         is expected to define how files should be categorized, renamed, or organized.
                         For example, it could contain file extensions or patterns to group by file type.
             sorted_tree_dict (dict): A dictionary representing the structure of the files to be categorized. It maps files or
-                                    directories to their respective categories.
+                                    directories to their respective categories. A categorized CompactTree is accepted as well.
             move_files (bool): A flag indicating whether the files should be moved (True) or copied (False) to the destination
                             directory. Default is False (copy).
+            source_tree (CompactTree): Optional walked source tree with recorded stats. The source files are then validated
+                            from the recorded stats instead of checking every file on the file system again.
+            io_workers (int): Number of threads copying or moving files concurrently. Failed file operations do not
+                            stop the others and the tool exits once all files were processed.
+            link_mode (str): "hard" or "sym" to build the destination tree out of hard or symbolic links to the source
+                            files instead of copying or moving them. Hard links across devices fall back to a copy.
         """
         LOGGER.info(
             " - Performing File operation based on the organised tree structure."
         )
+        file_indices = self.source_file_indices(source_tree)
+        validate_file = self.sort_file_validator(source_tree, file_indices)
+        source_dev = self.source_dev_lookup(source_tree, file_indices)
+
+        executor = FileOperationExecutor(io_workers, move_files, link_mode=link_mode)
+        for file_to_be_copied, dir_name in self.iter_sort_operations(
+            config, sorted_tree_dict
+        ):
+            self.sort_file(
+                file_to_be_copied,
+                dir_name,
+                move_files,
+                validate=validate_file(file_to_be_copied),
+                executor=executor,
+                source_dev=source_dev(file_to_be_copied),
+            )
+        self.close_executor(executor)
+        LOGGER.info(" - Successfully categorized and organized your files.")
+
+    @staticmethod
+    def iter_sort_operations(config: dict, sorted_tree_dict: dict):
+        """
+        Yields the (file path, category dir name) pairs of a categorized tree in the order :meth:`categorize_and_sort_file`
+        processes them. A categorized CompactTree is accepted as well.
+        """
         # Iterate through the sorted dict top-down and do the cp command.
+        if isinstance(sorted_tree_dict, CompactTree):
+            sorted_tree_dict = sorted_tree_dict.root()[DIR]
+
         format_rules = [rules[FORMAT] for rules in config[RULES] if FORMAT in rules]
         formats_in_config = list(format_rules[0].keys())
 
-        def perform(current_dir_contents):
-            current_level_directories = current_dir_contents.keys()
-            for dir_name in current_level_directories:
+        def walk(current_dir_contents):
+            for dir_name in current_dir_contents.keys():
                 for file_to_be_copied in current_dir_contents[dir_name][FILES]:
-                    # Get the relative path from the source file path
-                    rel_path = os.path.dirname(file_to_be_copied)
-                    dest_subdir_path = os.path.join(
-                        self.destination_path, rel_path, dir_name
-                    )
-                    os.makedirs(dest_subdir_path, exist_ok=True)
-
-                    cleaned_file_name = file_to_be_copied
-                    if file_to_be_copied.startswith("./"):
-                        cleaned_file_name = file_to_be_copied.replace(("."), "", 1)
-                    source_file_path = f"{self.source_path}/{cleaned_file_name}"
-                    if not (
-                        os.path.exists(source_file_path)
-                        and os.access(source_file_path, os.W_OK)
-                    ):
-                        exit_gracefully(
-                            (
-                                "The following source file is not accessible: %s",
-                                source_file_path,
-                            )
-                        )
-                    if move_files:
-                        shutil.move(source_file_path, dest_subdir_path)
-                    else:
-                        shutil.copy(source_file_path, dest_subdir_path)
+                    yield file_to_be_copied, dir_name
 
                 # Go into the directories that are not in the config and categorize them
                 if dir_name not in formats_in_config:
-                    perform(current_dir_contents[dir_name][DIR])
+                    yield from walk(current_dir_contents[dir_name][DIR])
 
-        perform(sorted_tree_dict)
-        LOGGER.info(" - Successfully categorized and organized your files.")
+        yield from walk(sorted_tree_dict)
+
+    @staticmethod
+    def source_file_indices(source_tree: CompactTree = None) -> dict:
+        """Returns {file path: file index} of a walked source tree with recorded stats, or None."""
+        if source_tree is None or source_tree.stats is None:
+            return None
+        return {path: index for index, path in source_tree.iter_file_paths()}
+
+    @staticmethod
+    def source_dev_lookup(source_tree: CompactTree = None, file_indices: dict = None):
+        """
+        Returns a `source_dev(file_path) -> int` callable with the `st_dev` recorded for a source file. It returns
+        None if `source_tree` has no recorded stats or the file is not part of it.
+        """
+        if source_tree is None or source_tree.stats is None:
+            return lambda _: None
+
+        if file_indices is None:
+            file_indices = FileManager.source_file_indices(source_tree)
+        devs = source_tree.stats.dev
+
+        def source_dev(file_path: str) -> int:
+            file_index = file_indices.get(file_path)
+            # A device of 0 marks a file which could not be stat'ed.
+            if file_index is None or not devs[file_index]:
+                return None
+            return devs[file_index]
+
+        return source_dev
+
+    @staticmethod
+    def close_executor(executor: FileOperationExecutor):
+        """Waits for the queued file operations and exits gracefully if any of them failed."""
+        errors = executor.close()
+        if errors:
+            exit_gracefully(
+                (
+                    "%s of %s file operations failed.",
+                    len(errors),
+                    len(errors) + executor.files,
+                )
+            )
+
+    def sort_file_validator(
+        self, source_tree: CompactTree = None, file_indices: dict = None
+    ):
+        """
+        Returns a `validate(file_path) -> bool` callable for :meth:`sort_file`. If `source_tree` has recorded stats,
+        the existence and permissions of the file are checked from the stats, which exits gracefully just like
+        :meth:`sort_file` does, and False is returned so :meth:`sort_file` skips its own file system checks.
+        Otherwise the callable always returns True. `file_indices` as returned by :meth:`source_file_indices` is
+        built from `source_tree` if not given.
+        """
+        if source_tree is None or source_tree.stats is None:
+            return lambda _: True
+
+        stats = source_tree.stats
+        if file_indices is None:
+            file_indices = self.source_file_indices(source_tree)
+        LOGGER.info(" - Organizing %s walked files.", len(file_indices))
+        LOGGER.info(" - Total size of the walked files: %s bytes.", stats.total_size())
+
+        def validate(file_path: str) -> bool:
+            file_index = file_indices.get(file_path)
+            if file_index is None:
+                # Not part of the walked tree, check it on the file system.
+                return True
+            if not (stats.exists(file_index) and stats.is_writable(file_index)):
+                exit_gracefully(
+                    (
+                        "The following source file is not accessible: %s",
+                        os.path.join(self.source_path, file_path),
+                    )
+                )
+            return False
+
+        return validate
+
+    def sort_file(
+        self,
+        file_to_be_copied: str,
+        dir_name: str,
+        move_files: bool = False,
+        validate: bool = True,
+        executor: FileOperationExecutor = None,
+        source_dev: int = None,
+    ):
+        """
+        Copies or moves a single file into its category directory below the destination directory.
+
+        Args:
+            file_to_be_copied (str): The file path relative to the source directory as found in the oIt dictionary.
+            dir_name (str): The category directory name the file belongs to.
+            move_files (bool): Move the file instead of copying it. Default is False (copy).
+            validate (bool): Check that the source file exists and is accessible. Callers that already validated the file
+                from recorded stats pass False to save the system calls.
+            executor (FileOperationExecutor): Optional executor the copy or move is queued on instead of performing it
+                right away. The source file is still validated before it is queued.
+            source_dev (int): The recorded `st_dev` of the source file, passed on to the executor.
+        """
+        # Get the relative path from the source file path
+        rel_path = os.path.dirname(file_to_be_copied)
+        dest_subdir_path = os.path.join(self.destination_path, rel_path, dir_name)
+        if executor is None:
+            os.makedirs(dest_subdir_path, exist_ok=True)
+
+        cleaned_file_name = file_to_be_copied
+        if file_to_be_copied.startswith("./"):
+            cleaned_file_name = file_to_be_copied.replace(("."), "", 1)
+        source_file_path = f"{self.source_path}/{cleaned_file_name}"
+        if validate and not (
+            os.path.exists(source_file_path) and os.access(source_file_path, os.W_OK)
+        ):
+            exit_gracefully(
+                (
+                    "The following source file is not accessible: %s",
+                    source_file_path,
+                )
+            )
+        if executor is not None:
+            executor.submit(source_file_path, dest_subdir_path, source_dev)
+        elif move_files:
+            shutil.move(source_file_path, dest_subdir_path)
+        else:
+            shutil.copy(source_file_path, dest_subdir_path)
+
+    def sort_batches(
+        self,
+        categorized_batches,
+        move_files: bool = False,
+        io_workers: int = 1,
+        link_mode: str = None,
+    ) -> int:
+        """
+        Copies or moves files from a stream of categorized batches as produced by
+        :meth:`Categorizer.categorize_batches`. Files are processed as soon as their batch arrives.
+
+        Args:
+            categorized_batches (iterable): An iterable of (rel_dir, {category: [files]}) tuples.
+            move_files (bool): Move the files instead of copying them. Default is False (copy).
+            io_workers (int): Number of threads copying or moving files concurrently.
+            link_mode (str): "hard" or "sym" to link the files instead of copying or moving them.
+
+        Returns:
+            int: The number of processed files.
+        """
+        LOGGER.info(" - Performing File operation on the streamed source tree.")
+        executor = FileOperationExecutor(io_workers, move_files, link_mode=link_mode)
+        file_count = 0
+        for _, categorized in categorized_batches:
+            for dir_name, files in categorized.items():
+                for file_to_be_copied in files:
+                    self.sort_file(
+                        file_to_be_copied, dir_name, move_files, executor=executor
+                    )
+                file_count += len(files)
+        self.close_executor(executor)
+
+        LOGGER.info(" - Successfully categorized and organized %s files.", file_count)
+        return file_count
 
     @staticmethod
     def create_and_write_file(callback, file_path: str):
@@ -0,0 +1,131 @@
+""" File stats module. Columnar stat metadata of the files of a CompactTree """
+
+import os
+import stat
+from array import array
+from collections import namedtuple
+from functools import cache
+from concurrent.futures import ThreadPoolExecutor
+
+# Column name and array type code of every recorded stat field.
+STAT_COLUMNS = (
+    ("size", "q"),
+    ("mtime_ns", "q"),
+    ("ino", "Q"),
+    ("dev", "Q"),
+    ("mode", "I"),
+    ("uid", "I"),
+    ("gid", "I"),
+)
+
+FileStat = namedtuple("FileStat", [name for name, _ in STAT_COLUMNS])
+
+
+@cache
+def _process_gids() -> frozenset:
+    return frozenset([os.getegid(), *os.getgroups()])
+
+
+class FileStats:
+    """
+    Stat metadata of the files of a CompactTree in one array per field. Row `i` belongs to the file with
+    the index `i` in the file table of the tree.
+
+    The stats are recorded once during the walk, so later stages like validation and size estimates
+    read them from memory instead of calling `stat`, `exists` or `access` again. Files that could not be
+    stat'ed, e.g. broken symlinks, are recorded with a mode of 0.
+
+    Methods:
+        collect(tree, root_path: str, workers: int = 1) -> FileStats
+        append(self, stat_result: os.stat_result = None)
+        row(self, file_index: int) -> FileStat
+        stamp(self, file_index: int) -> tuple
+        exists(self, file_index: int) -> bool
+        is_writable(self, file_index: int) -> bool
+        total_size(self) -> int
+    """
+
+    __slots__ = tuple(name for name, _ in STAT_COLUMNS)
+
+    def __init__(self):
+        """Constructor. Creates empty columns."""
+        for name, type_code in STAT_COLUMNS:
+            setattr(self, name, array(type_code))
+
+    @classmethod
+    def collect(cls, tree, root_path: str, workers: int = 1):
+        """
+        Stats every file of `tree` below `root_path`. Used when the listings came from somewhere that
+        has no stats, e.g. the parallel walk. With `workers` > 1 the files are stat'ed concurrently.
+        """
+
+        def stat_file(rel_path: str):
+            try:
+                return os.stat(os.path.join(root_path, rel_path))
+            except OSError:
+                return None
+
+        stats = cls()
+        file_paths = [path for _, path in sorted(tree.iter_file_paths())]
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(stat_file, file_paths))
+        else:
+            results = map(stat_file, file_paths)
+        for stat_result in results:
+            stats.append(stat_result)
+        return stats
+
+    def __len__(self) -> int:
+        return len(self.size)
+
+    def append(self, stat_result: os.stat_result = None):
+        """Appends the row of the next file. None records a file that could not be stat'ed."""
+        if stat_result is None:
+            for name, _ in STAT_COLUMNS:
+                getattr(self, name).append(0)
+            return
+
+        self.size.append(stat_result.st_size)
+        self.mtime_ns.append(stat_result.st_mtime_ns)
+        self.ino.append(stat_result.st_ino)
+        self.dev.append(stat_result.st_dev)
+        self.mode.append(stat_result.st_mode)
+        self.uid.append(stat_result.st_uid)
+        self.gid.append(stat_result.st_gid)
+
+    def row(self, file_index: int) -> FileStat:
+        """Returns all recorded fields of a file."""
+        return FileStat(*(getattr(self, name)[file_index] for name, _ in STAT_COLUMNS))
+
+    def stamp(self, file_index: int) -> tuple:
+        """Returns the (size, mtime_ns) of a file or None if it could not be stat'ed."""
+        if self.mode[file_index] == 0:
+            return None
+        return self.size[file_index], self.mtime_ns[file_index]
+
+    def exists(self, file_index: int) -> bool:
+        """Returns True if the file could be stat'ed during the walk."""
+        return self.mode[file_index] != 0
+
+    def is_writable(self, file_index: int) -> bool:
+        """Same check as `os.access(path, os.W_OK)` but from the recorded owner and permission bits."""
+        mode = self.mode[file_index]
+        if mode == 0:
+            return False
+        if not hasattr(os, "geteuid"):
+            # No POSIX owners, e.g. on Windows. Only the read only attribute is reflected in the mode.
+            return bool(mode & stat.S_IWRITE)
+
+        euid = os.geteuid()
+        if euid == 0:
+            return True
+        if self.uid[file_index] == euid:
+            return bool(mode & stat.S_IWUSR)
+        if self.gid[file_index] in _process_gids():
+            return bool(mode & stat.S_IWGRP)
+        return bool(mode & stat.S_IWOTH)
+
+    def total_size(self) -> int:
+        """Returns the sum of the sizes of all files in bytes."""
+        return sum(self.size)
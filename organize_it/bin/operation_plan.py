@@ -0,0 +1,283 @@
+""" Operation plan module which compiles a categorized tree into a flat, reviewable list of file operations """
+
+import os
+import json
+import logging
+from collections import Counter
+
+from organize_it.bin.compact_tree import CompactTree
+from organize_it.bin.file_manager import FileManager
+from organize_it.bin.file_executor import FileOperationExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+# Bump when the records of the plan file change.
+PLAN_FORMAT_VERSION = 1
+
+# Record types of the plan file, one json object per line in this order.
+HEADER = "plan"
+MKDIR = "mkdir"
+CONFLICT = "conflict"
+OPERATION = "op"
+
+# Reasons of a conflict.
+DUPLICATE = "duplicate"
+EXISTS = "exists"
+
+
+class OperationPlan:
+    """
+    The file operations of a run, compiled from the categorized tree before anything is written: the set of
+    destination directories, the ordered operations and the conflicts, i.e. several files with the same
+    destination or destination files that already exist.
+
+    The plan is saved as NDJSON, one record per line: a header with the source and destination directories
+    and the operation (copy, move, or a link mode), the directories, the conflicts and then the operations
+    as (file path, category, recorded source st_dev). It can be reviewed before running it and executed
+    later with :meth:`execute`, which streams the operations from the file without walking or categorizing
+    the source directory again.
+
+    Methods:
+        compile(cls, file_manager, config, sorted_tree_dict, move_files=False, source_tree=None, link_mode=None)
+        save(self, plan_path: str)
+        load(cls, plan_path: str)
+        iter_records(plan_path: str)
+        execute(plan_path: str, io_workers: int = 1) -> int
+        summary(self) -> dict
+    """
+
+    def __init__(
+        self,
+        source_path: str,
+        destination_path: str,
+        move_files: bool = False,
+        link_mode: str = None,
+    ):
+        """
+        Constructor. Starts with an empty plan.
+
+        Args:
+            source_path (str): The source directory the file paths are relative to.
+            destination_path (str): The destination directory the category directories are relative to.
+            move_files (bool): Move the files instead of copying them.
+            link_mode (str): "hard" or "sym" to link the files instead of copying or moving them.
+        """
+        self.source_path = source_path
+        self.destination_path = destination_path
+        self.move_files = move_files
+        self.link_mode = link_mode
+        # Destination directories relative to `destination_path`, sorted.
+        self.mkdirs = []
+        # (file path, category dir name, source st_dev or None) in execution order.
+        self.operations = []
+        # (destination file path relative to `destination_path`, reason)
+        self.conflicts = []
+
+    @property
+    def operation(self) -> str:
+        """The operation of the plan: "copy", "move", "hard" or "sym"."""
+        if self.link_mode:
+            return self.link_mode
+        return "move" if self.move_files else "copy"
+
+    @staticmethod
+    def dest_dir(file_path: str, dir_name: str) -> str:
+        """Returns the destination directory of a file relative to the destination, as :meth:`FileManager.sort_file` does."""
+        return os.path.join(os.path.dirname(file_path), dir_name)
+
+    @classmethod
+    def compile(
+        cls,
+        file_manager: FileManager,
+        config: dict,
+        sorted_tree_dict: dict,
+        move_files: bool = False,
+        source_tree: CompactTree = None,
+        link_mode: str = None,
+    ):
+        """
+        Compiles the operations of :meth:`FileManager.categorize_and_sort_file` into a plan.
+
+        Args:
+            file_manager (FileManager): The file manager of the source and destination directories.
+            config (dict): The config the tree was categorized with.
+            sorted_tree_dict (dict): The categorized tree or a categorized CompactTree.
+            move_files (bool): Move the files instead of copying them.
+            source_tree (CompactTree): Optional walked source tree with recorded stats. The files are validated and
+                their devices are taken from the stats.
+            link_mode (str): "hard" or "sym" to link the files instead of copying or moving them.
+
+        Returns:
+            OperationPlan: The compiled plan.
+        """
+        plan = cls(
+            os.path.abspath(file_manager.source_path),
+            os.path.abspath(file_manager.destination_path),
+            move_files,
+            link_mode,
+        )
+        file_indices = file_manager.source_file_indices(source_tree)
+        validate_file = file_manager.sort_file_validator(source_tree, file_indices)
+        source_dev = file_manager.source_dev_lookup(source_tree, file_indices)
+
+        dest_dirs = set()
+        dest_files = Counter()
+        for file_path, dir_name in file_manager.iter_sort_operations(
+            config, sorted_tree_dict
+        ):
+            # Exits gracefully for files the recorded stats mark as inaccessible.
+            validate_file(file_path)
+            dest_dir = cls.dest_dir(file_path, dir_name)
+            dest_dirs.add(dest_dir)
+            dest_files[
+                os.path.normpath(os.path.join(dest_dir, os.path.basename(file_path)))
+            ] += 1
+            plan.operations.append((file_path, dir_name, source_dev(file_path)))
+        plan.mkdirs = sorted(dest_dirs)
+
+        plan.conflicts = [
+            (dest_file, DUPLICATE)
+            for dest_file, count in dest_files.items()
+            if count > 1
+        ]
+        # Each existing destination directory is listed once instead of checking every file.
+        for dest_dir in plan.mkdirs:
+            try:
+                existing = set(
+                    os.listdir(os.path.join(plan.destination_path, dest_dir))
+                )
+            except OSError:
+                continue
+            plan.conflicts.extend(
+                (dest_file, EXISTS)
+                for dest_file in (
+                    os.path.normpath(os.path.join(dest_dir, name)) for name in existing
+                )
+                if dest_file in dest_files
+            )
+        plan.conflicts.sort()
+        return plan
+
+    def summary(self) -> dict:
+        """Returns the operation and the number of directories, operations and conflicts of the plan."""
+        return {
+            "operation": self.operation,
+            "mkdirs": len(self.mkdirs),
+            "operations": len(self.operations),
+            "conflicts": len(self.conflicts),
+        }
+
+    def save(self, plan_path: str):
+        """Saves the plan as NDJSON to `plan_path`."""
+        header = {
+            "type": HEADER,
+            "version": PLAN_FORMAT_VERSION,
+            "source": self.source_path,
+            "destination": self.destination_path,
+            "move": self.move_files,
+            "link_mode": self.link_mode,
+            **self.summary(),
+        }
+        tmp_path = f"{plan_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as plan_file:
+            plan_file.write(json.dumps(header) + "\n")
+            for dest_dir in self.mkdirs:
+                plan_file.write(json.dumps({"type": MKDIR, "dir": dest_dir}) + "\n")
+            for dest_file, reason in self.conflicts:
+                plan_file.write(
+                    json.dumps({"type": CONFLICT, "path": dest_file, "reason": reason})
+                    + "\n"
+                )
+            for file_path, dir_name, dev in self.operations:
+                plan_file.write(
+                    json.dumps(
+                        {
+                            "type": OPERATION,
+                            "file": file_path,
+                            "category": dir_name,
+                            "dev": dev,
+                        }
+                    )
+                    + "\n"
+                )
+        os.replace(tmp_path, plan_path)
+
+    @staticmethod
+    def iter_records(plan_path: str):
+        """Yields the records of a plan file one by one. Raises ValueError for files of another plan version."""
+        with open(plan_path, "r", encoding="utf-8") as plan_file:
+            for line_number, line in enumerate(plan_file):
+                record = json.loads(line)
+                if line_number == 0 and (
+                    record.get("type") != HEADER
+                    or record.get("version") != PLAN_FORMAT_VERSION
+                ):
+                    raise ValueError(
+                        f"{plan_path} is not a version {PLAN_FORMAT_VERSION} operation plan."
+                    )
+                yield record
+
+    @classmethod
+    def load(cls, plan_path: str):
+        """Loads a whole plan file, e.g. to review it."""
+        records = cls.iter_records(plan_path)
+        header = next(records)
+        plan = cls(
+            header["source"], header["destination"], header["move"], header["link_mode"]
+        )
+        for record in records:
+            if record["type"] == MKDIR:
+                plan.mkdirs.append(record["dir"])
+            elif record["type"] == CONFLICT:
+                plan.conflicts.append((record["path"], record["reason"]))
+            elif record["type"] == OPERATION:
+                plan.operations.append(
+                    (record["file"], record["category"], record["dev"])
+                )
+        return plan
+
+    @classmethod
+    def execute(cls, plan_path: str, io_workers: int = 1) -> int:
+        """
+        Executes a saved plan. All directories are created before the first file operation, and the operations
+        are streamed from the file into a :class:`FileOperationExecutor`. The source files are not checked again,
+        failed operations are reported once all files were processed.
+
+        Returns:
+            int: The number of executed operations.
+        """
+        records = cls.iter_records(plan_path)
+        header = next(records)
+        file_manager = FileManager(header["source"], header["destination"])
+        executor = FileOperationExecutor(
+            io_workers, header["move"], link_mode=header["link_mode"]
+        )
+        LOGGER.info(
+            " - Executing the %s plan %s: %s operations into %s.",
+            header["operation"],
+            plan_path,
+            header["operations"],
+            header["destination"],
+        )
+
+        operation_count = 0
+        for record in records:
+            if record["type"] == MKDIR:
+                executor.prepare_dirs(
+                    (os.path.join(header["destination"], record["dir"]),)
+                )
+            elif record["type"] == CONFLICT:
+                LOGGER.warning(" - Conflict (%s): %s", record["reason"], record["path"])
+            elif record["type"] == OPERATION:
+                file_manager.sort_file(
+                    record["file"],
+                    record["category"],
+                    header["move"],
+                    validate=False,
+                    executor=executor,
+                    source_dev=record["dev"],
+                )
+                operation_count += 1
+        file_manager.close_executor(executor)
+        LOGGER.info(" - Successfully executed %s operations.", operation_count)
+        return operation_count
@@ -0,0 +1,255 @@
+""" Rule engine module which compiles the categorization rules of a config once """
+
+import re
+import logging
+from bisect import bisect_right
+
+LOGGER = logging.getLogger(__name__)
+
+# Multipliers of the size units accepted by the size rules, e.g. "1.5 GB". Units are powers of 1024.
+SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*$", re.IGNORECASE)
+
+NANOSECONDS_PER_DAY = 86_400 * 10**9
+
+
+def parse_size(size) -> int:
+    """
+    Returns a size of a size rule in bytes, e.g. 1024, "500MB", "1.5 GiB" or "2G".
+
+    Raises:
+        ValueError: If the size cannot be parsed.
+    """
+    if isinstance(size, (int, float)):
+        return int(size)
+    match = SIZE_PATTERN.match(str(size))
+    if match is None:
+        raise ValueError(f"Invalid size: {size!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+class NameRuleMatcher:
+    """
+    Matches file names against the `name_pattern` rules of a config. The rules are compiled once and the
+    last rule that matches wins, just like evaluating every rule with `re.search` in config order.
+
+    All rules are combined into a single regex of zero width lookaheads, one per rule, each followed by an
+    empty named group:
+
+        (?:(?=(?s:.*?)(?:<pattern_0>))(?P<r0>))?(?:(?=(?s:.*?)(?:<pattern_1>))(?P<r1>))?...
+
+    Every lookahead is tried from the start of the name, so one `match` call tells which rules match and
+    the group with the highest index is the winner. Patterns that cannot be embedded safely, e.g. because
+    they contain groups which would shift back references or global inline flags, fall back to
+    precompiled patterns that are evaluated from the last rule with an early exit.
+
+    Methods:
+        match(self, file_name: str) -> str
+        match_index(self, file_name: str) -> int
+    """
+
+    def __init__(self, name_rules: dict):
+        """
+        Constructor
+
+        Args:
+            name_rules (dict): The 'names' rules of a config as {dir_name: {"name_pattern": regex}}.
+
+        Raises:
+            re.error: If a name pattern is not a valid regular expression.
+        """
+        self.dir_names = list(name_rules)
+        self.patterns = [
+            re.compile(name_rules[dir_name]["name_pattern"])
+            for dir_name in self.dir_names
+        ]
+        self.combined_pattern = self._combine(self.patterns)
+
+    @staticmethod
+    def _combine(patterns: list):
+        # Global inline flags like "(?i)" show up in the flags of their compiled pattern. Embedded in the
+        # combined regex they would apply to every rule, or fail to compile depending on the Python version.
+        if not patterns or any(
+            pattern.groups or pattern.flags & ~re.UNICODE for pattern in patterns
+        ):
+            return None
+        try:
+            return re.compile(
+                "".join(
+                    f"(?:(?=(?s:.*?)(?:{pattern.pattern}))(?P<r{index}>))?"
+                    for index, pattern in enumerate(patterns)
+                )
+            )
+        except re.error as error:
+            LOGGER.debug("Name patterns are matched one by one: %s", error)
+            return None
+
+    def match(self, file_name: str) -> str:
+        """Returns the directory name of the last rule that matches `file_name` or None."""
+        index = self.match_index(file_name)
+        return None if index == -1 else self.dir_names[index]
+
+    def match_index(self, file_name: str) -> int:
+        """Returns the index of the last rule that matches `file_name` in config order or -1."""
+        if self.combined_pattern is not None:
+            match = self.combined_pattern.match(file_name)
+            if match.lastindex is None:
+                return -1
+            # Groups r0..rN are numbered 1..N+1 and lastindex is the highest one that matched.
+            return match.lastindex - 1
+
+        for index in range(len(self.patterns) - 1, -1, -1):
+            if self.patterns[index].search(file_name):
+                return index
+        return -1
+
+
+# Value of the flat extension table for last components with configured longer variants, e.g. "gz" of "tar.gz".
+_DEEPER = object()
+
+
+class ExtensionTrie:
+    """
+    Finds the longest configured extension of a file name, so multi part extensions like "tar.gz" win over
+    "gz" and extensionless names simply have no match.
+
+    The trie is keyed by the dot separated extension components in reverse order, e.g. "tar.gz" is stored
+    as "gz" -> "tar". Next to it a flat table maps every last component to its value, or to a marker if
+    longer extensions end with it. Without multi part extensions a batch is looked up with the same
+    `rsplit(".", 1)` and dict lookup as the previous single extension lookup. Otherwise only the names with
+    a marker, e.g. "*.gz" with "tar.gz" configured, walk down the trie, remembering the deepest node with a
+    value.
+
+    Methods:
+        add(self, extension: str, value)
+        match(self, file_name: str, default=None)
+        match_batch(self, file_names, default=None) -> list
+    """
+
+    __slots__ = ("root", "ignore_case", "_flat", "_multi_part")
+
+    def __init__(self, ignore_case: bool = False):
+        """
+        Constructor
+
+        Args:
+            ignore_case (bool): Match extensions case insensitively, e.g. "JPG" matches "jpg".
+        """
+        self.root = {}
+        self.ignore_case = ignore_case
+        # {last component: value or _DEEPER}
+        self._flat = {}
+        # True once a multi part extension like "tar.gz" was added.
+        self._multi_part = False
+
+    def add(self, extension: str, value):
+        """Adds an extension like "jpg" or "tar.gz" (with or without leading dot). The last added value wins."""
+        if self.ignore_case:
+            extension = extension.lower()
+        components = extension.lstrip(".").split(".")
+        # Every entry is a [value, children] pair. Nodes without a value only lead to longer extensions.
+        children = self.root
+        for component in reversed(components):
+            entry = children.setdefault(component, [None, {}])
+            children = entry[1]
+        entry[0] = value
+
+        last_entry = self.root[components[-1]]
+        self._flat[components[-1]] = _DEEPER if last_entry[1] else last_entry[0]
+        self._multi_part = self._multi_part or len(components) > 1
+
+    def match(self, file_name: str, default=None):
+        """
+        Returns the value of the longest configured extension of `file_name` or `default`.
+
+        Args:
+            file_name (str): The file name or relative file path.
+            default: The value returned if no extension matches.
+        """
+        return self.match_batch((file_name,), default)[0]
+
+    def match_batch(self, file_names, default=None) -> list:
+        """
+        Returns the values of the longest configured extensions of a batch of file names. The per name cost
+        is one split and one dict lookup of the last component, only the marked names walk down the trie.
+
+        Args:
+            file_names (iterable): The file names or relative file paths.
+            default: The value used for names without a matching extension.
+        """
+        if self.ignore_case:
+            file_names = map(str.lower, file_names)
+        flat_get = self._flat.get
+        if not self._multi_part:
+            # Only single part extensions are configured: the previous rsplit and dict lookup.
+            return [
+                (
+                    flat_get(file_name.rsplit(".", 1)[1], default)
+                    if "." in file_name
+                    else default
+                )
+                for file_name in file_names
+            ]
+
+        root = self.root
+        results = []
+        append = results.append
+        for file_name in file_names:
+            stem, separator, extension = file_name.rpartition(".")
+            value = flat_get(extension, default) if separator else default
+            if value is _DEEPER:
+                # "gz" of "tar.gz": walk down the trie and keep the deepest value.
+                entry = root[extension]
+                value = default if entry[0] is None else entry[0]
+                children = entry[1]
+                while children:
+                    stem, separator, extension = stem.rpartition(".")
+                    if not separator:
+                        break
+                    entry = children.get(extension)
+                    if entry is None:
+                        break
+                    if entry[0] is not None:
+                        value = entry[0]
+                    children = entry[1]
+            append(value)
+        return results
+
+
+class ThresholdRuleMatcher:
+    """
+    Matches numeric file metadata like the size or the age against the lower bounds of a set of rules. The
+    rule with the highest bound that the value reaches wins, e.g. with "large" from 1 GB and "huge" from
+    10 GB, a 5 GB file is "large".
+
+    The bounds are kept sorted, so a lookup is one binary search no matter how many rules there are.
+
+    Methods:
+        add(self, lower_bound: int, value)
+        match(self, number: int, default=None)
+    """
+
+    __slots__ = ("bounds", "values")
+
+    def __init__(self):
+        """Constructor. Creates a matcher without rules."""
+        self.bounds = []
+        self.values = []
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def add(self, lower_bound: int, value):
+        """Adds a rule for the numbers >= `lower_bound`. The last value added for a bound wins."""
+        index = bisect_right(self.bounds, lower_bound)
+        if index and self.bounds[index - 1] == lower_bound:
+            self.values[index - 1] = value
+            return
+        self.bounds.insert(index, lower_bound)
+        self.values.insert(index, value)
+
+    def match(self, number: int, default=None):
+        """Returns the value of the rule with the highest lower bound <= `number` or `default`."""
+        index = bisect_right(self.bounds, number)
+        return self.values[index - 1] if index else default
@@ -0,0 +1,99 @@
+""" Rule stats module which collects per rule counters and timings of the categorization """
+
+import json
+import logging
+from collections import Counter
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RuleStats:
+    """
+    Counters of a categorization run: evaluations, matches and the cumulative time of every rule, and the
+    number of files per category.
+
+    Rules are keyed by their kind and name, e.g. ("names", "photo_by_name"). The format rules are looked
+    up at once in the extension trie, so they are reported as a single ("format", "extension trie") rule.
+
+    Methods:
+        record(self, kind: str, rule: str, evaluations: int, matches: int, seconds: float)
+        count_categories(self, categories)
+        merge(self, other: RuleStats)
+        to_dict(self) -> dict
+        format_table(self) -> str
+        save(self, file_path: str)
+    """
+
+    def __init__(self):
+        """Constructor. Starts with empty counters."""
+        # (kind, rule) -> [evaluations, matches, seconds]
+        self.rules = {}
+        self.categories = Counter()
+
+    def record(
+        self, kind: str, rule: str, evaluations: int, matches: int, seconds: float
+    ):
+        """Adds the evaluations, matches and time of one batch to a rule."""
+        counters = self.rules.get((kind, rule))
+        if counters is None:
+            self.rules[(kind, rule)] = [evaluations, matches, seconds]
+            return
+        counters[0] += evaluations
+        counters[1] += matches
+        counters[2] += seconds
+
+    def count_categories(self, categories):
+        """Counts the files of an iterable of category dir names, None for uncategorized files."""
+        self.categories.update(categories)
+
+    def merge(self, other):
+        """Adds the counters of `other`, e.g. collected by a worker process."""
+        for (kind, rule), (evaluations, matches, seconds) in other.rules.items():
+            self.record(kind, rule, evaluations, matches, seconds)
+        self.categories.update(other.categories)
+
+    def to_dict(self) -> dict:
+        """Returns the counters as a json serializable dict, the most expensive rules first."""
+        return {
+            "rules": [
+                {
+                    "kind": kind,
+                    "rule": rule,
+                    "evaluations": evaluations,
+                    "matches": matches,
+                    "seconds": seconds,
+                }
+                for (kind, rule), (evaluations, matches, seconds) in sorted(
+                    self.rules.items(), key=lambda item: -item[1][2]
+                )
+            ],
+            "categories": {
+                "uncategorized" if category is None else category: count
+                for category, count in self.categories.most_common()
+            },
+        }
+
+    def format_table(self) -> str:
+        """Returns the counters as a plain text table."""
+        report = self.to_dict()
+        lines = [
+            f"{'kind':<8} {'rule':<24} {'evaluations':>12} {'matches':>10} {'ms':>10} {'us/eval':>8}"
+        ]
+        for row in report["rules"]:
+            us_per_eval = (
+                row["seconds"] / row["evaluations"] * 1e6 if row["evaluations"] else 0
+            )
+            lines.append(
+                f"{row['kind']:<8} {row['rule']:<24} {row['evaluations']:>12} {row['matches']:>10}"
+                f" {row['seconds'] * 1e3:>10.2f} {us_per_eval:>8.2f}"
+            )
+        lines.append("")
+        lines.append(f"{'category':<33} {'files':>12}")
+        for category, count in report["categories"].items():
+            lines.append(f"{category:<33} {count:>12}")
+        return "\n".join(lines)
+
+    def save(self, file_path: str):
+        """Saves the counters as json."""
+        with open(file_path, "w", encoding="utf-8") as stats_file:
+            json.dump(self.to_dict(), stats_file, indent=4)
@@ -0,0 +1,161 @@
+""" Scan index module which persists directory listings between runs """
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from organize_it.settings import TMP_DIR
+
+LOGGER = logging.getLogger(__name__)
+
+SCAN_INDEX_VERSION = 1
+
+# Directories modified less than this many nanoseconds before they were listed are not cached.
+# Their mtime could change again within the timestamp granularity of the file system without us noticing.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def _stat_file(file_path: str):
+    try:
+        return os.stat(file_path)
+    except OSError:
+        return None
+
+
+class ScanIndex:
+    """
+    A persistent index of directory listings keyed by the directory path.
+
+    Every entry records the mtime and inode of a directory together with its listing. Adding, removing
+    or renaming an entry of a directory updates its mtime, so a later walk only has to `stat` a directory
+    and can reuse the cached listing if neither the mtime nor the inode changed.
+
+    Only the names are cached. Editing a file does not change the mtime of its directory, so walks that
+    record file stats `stat` the files of a cached directory instead of reusing stale stats. That still
+    saves the listing, `DirEntry.stat()` costs the same system call on POSIX.
+
+    Methods:
+        for_source(source_path: str, index_dir: str = TMP_DIR) -> ScanIndex
+        list_dir(self, dir_path: str, scan_dir) -> tuple
+        save(self)
+    """
+
+    def __init__(self, index_path: str):
+        """Constructor. Loads the index from `index_path` if it exists."""
+        self.index_path = index_path
+        self.hits = 0
+        self.misses = 0
+        # Entries of the directories visited in the current walk. Only these are saved.
+        self._visited = {}
+        # list_dir is called from the threads of a parallel walk.
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    @classmethod
+    def for_source(cls, source_path: str, index_dir: str = TMP_DIR):
+        """Returns the scan index of a source directory. Every source directory has its own index file."""
+        source_hash = hashlib.sha1(
+            os.path.abspath(source_path).encode("utf-8")
+        ).hexdigest()
+        return cls(os.path.join(index_dir, f".scan_index_{source_hash}.json"))
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError) as error:
+            LOGGER.warning(
+                " - Ignoring unreadable scan index %s: %s", self.index_path, error
+            )
+            return {}
+
+        if index.get("version") != SCAN_INDEX_VERSION:
+            return {}
+        return index.get("dirs", {})
+
+    def list_dir(self, dir_path: str, scan_dir, with_stats: bool = False) -> tuple:
+        """
+        Returns the listing of a directory from the index if the directory did not change since it was
+        cached, otherwise lists it with `scan_dir` and records the result.
+
+        Args:
+            dir_path (str): The path of the directory to list.
+            scan_dir (callable): Lists a directory and returns a (file_names, dir_names) tuple. Called with
+                `with_stats=True` for a walk that records stats, see :meth:`DirectoryWalker.scan_dir`.
+            with_stats (bool): Also return the current `stat` result of every file, None if it cannot be stat'ed.
+
+        Returns:
+            tuple: A tuple of (file_names, dir_names) lists. With `with_stats` a tuple of
+                (file_names, dir_names, file_stats).
+
+        Raises:
+            OSError: If the directory cannot be accessed.
+        """
+        key = os.path.abspath(dir_path)
+        dir_stat = os.stat(dir_path)
+
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry[0] == dir_stat.st_mtime_ns
+            and entry[1] == dir_stat.st_ino
+        ):
+            with self._lock:
+                self.hits += 1
+                self._visited[key] = entry
+            if with_stats:
+                return (
+                    entry[2],
+                    entry[3],
+                    [_stat_file(os.path.join(dir_path, name)) for name in entry[2]],
+                )
+            return entry[2], entry[3]
+
+        with self._lock:
+            self.misses += 1
+        listed_at = time.time_ns()
+        if with_stats:
+            file_names, dir_names, file_stats = scan_dir(dir_path, with_stats=True)
+        else:
+            file_names, dir_names = scan_dir(dir_path)
+        if listed_at - dir_stat.st_mtime_ns > RACY_WINDOW_NS:
+            with self._lock:
+                self._visited[key] = [
+                    dir_stat.st_mtime_ns,
+                    dir_stat.st_ino,
+                    file_names,
+                    dir_names,
+                ]
+        if with_stats:
+            return file_names, dir_names, file_stats
+        return file_names, dir_names
+
+    def save(self):
+        """
+        Saves the entries of the directories visited since the index was loaded. Entries of removed directories are
+        dropped. Nothing is saved if no directory was visited, so a walk that did not use the index keeps it.
+        """
+        if not self.hits and not self.misses:
+            return
+        LOGGER.info(
+            " - Saving scan index to %s (%s cached, %s rescanned directories)",
+            os.path.basename(self.index_path),
+            self.hits,
+            self.misses,
+        )
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump(
+                {"version": SCAN_INDEX_VERSION, "dirs": self._visited},
+                index_file,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.index_path)
+        self._entries = self._visited
+        self._visited = {}
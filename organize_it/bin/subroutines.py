@@ -1,19 +1,24 @@
 """ Common reusable subroutines """
 
 import logging
-import json
 import os
 
+import organize_it.settings as settings
 from organize_it.settings import (
-    CONFIG,
     GENERATED_SOURCE_TREE,
-    GENERATED_SOURCE_JSON,
+    GENERATED_SOURCE_SNAPSHOT,
     get_or_update_current_state,
 )
 
 from organize_it.bin.file_manager import FileManager
 from organize_it.bin.tree_structure import TreeStructure
-from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.categorizer import Categorizer, DEFAULT_PARTITION_DEPTH
+from organize_it.bin.content_sniffer import ContentSniffer
+from organize_it.bin.walker import DEFAULT_BATCH_SIZE
+from organize_it.bin.scan_index import ScanIndex
+from organize_it.bin.tree_snapshot import TreeSnapshot
+from organize_it.bin.watcher import FolderWatcher, DEFAULT_DEBOUNCE
+from organize_it.bin.operation_plan import OperationPlan
 from organize_it.ai.gpt_wrapper import GPTWrapper
 
 logger = logging.getLogger(__name__)
@@ -34,7 +39,12 @@ def process_source_and_generate_tree(
     source_directory: str,
     destination_directory: str,
     generated_source_tree_path: str,
-    generated_source_json: str = GENERATED_SOURCE_JSON,
+    generated_source_json: str = None,
+    generated_source_snapshot: str = GENERATED_SOURCE_SNAPSHOT,
+    walk_workers: int = 1,
+    use_scan_index: bool = False,
+    config: dict = None,
+    record_stats: bool = False,
 ):
     """
     Processes a source directory path, generates a hierarchical tree structure of files,
@@ -48,8 +58,19 @@ def process_source_and_generate_tree(
                                  containing files to be processed.
         generated_source_tree_path (str): The path where the generated file tree structure
                                       will be saved.
-        generated_source_json (str): The path where the generated file structure dict
-                                      will be saved.
+        generated_source_json (str): Optional path where the generated file structure dict
+                                      will be saved as json for debugging.
+        generated_source_snapshot (str): The path where the generated file structure will be
+                                      saved as a binary snapshot and loaded from in later steps.
+        walk_workers (int): Number of threads used to list the source directories concurrently.
+                            Useful on high latency file systems like NFS or SMB mounts.
+        use_scan_index (bool): Use the persistent scan index in TMP_DIR so directories which did not
+                               change since the last run are not listed again.
+        config (dict): Optional config dict. If provided, the directories excluded by its skip rules are
+                       pruned during the walk and shown as collapsed placeholders in the source tree.
+        record_stats (bool): Record the stat metadata of every file during the walk, e.g. for an operation plan.
+                             The stats are always recorded if `config` has size or age rules. Without stats the
+                             source files are checked on the file system when they are sorted.
 
     Returns:
         tuple: A tuple containing:
@@ -57,8 +78,9 @@ def process_source_and_generate_tree(
               file operations in the source and destination directories.
             - tree_structure (TreeStructure): An instance of the TreeStructure class that
               represents the generated file tree.
-            - source_tree_dict (dict): A dictionary representation of the file structure in
-              the source directory, generated by walking through the source directory recursively.
+            - source_tree_dict (CompactTree): The file structure of the source directory, generated
+              by walking through the source directory recursively. A memory mapped TreeSnapshot if the
+              tree was generated before. Use `to_dict()` for the nested dictionary.
 
     Notes:
         - The method may skip tree generation if the tree structure has been previously
@@ -71,7 +93,10 @@ def process_source_and_generate_tree(
         file_manager, tree_structure, source_tree_dict = process_source_and_generate_tree(source_dir, destination_dir)
     """
 
-    file_manager = FileManager(source_directory, destination_directory)
+    scan_index = ScanIndex.for_source(source_directory) if use_scan_index else None
+    file_manager = FileManager(
+        source_directory, destination_directory, walk_workers, scan_index
+    )
     tree_structure = TreeStructure()
 
     # If cli is in interactive mode, then source tree will be will be generated already.
@@ -82,7 +107,17 @@ def process_source_and_generate_tree(
         get_or_update_current_state(True)
 
         # Read the source directory and create oIt tree input dictionary and save it to a file
-        source_tree_dict = file_manager.file_walk(file_path=generated_source_json)
+        categorizer = Categorizer(config) if config is not None else None
+        exclude = categorizer.is_excluded if categorizer is not None else None
+        source_tree_dict = file_manager.file_walk_compact(
+            exclude=exclude,
+            show_pruned=exclude is not None,
+            snapshot_path=generated_source_snapshot,
+            file_path=generated_source_json,
+            # One stat per file, only if something reads the stats.
+            record_stats=record_stats
+            or (categorizer is not None and categorizer.uses_stats),
+        )
 
         # write the source tree structure result to a file
         FileManager.create_and_write_file(
@@ -93,8 +128,8 @@ def process_source_and_generate_tree(
         )
         return file_manager, tree_structure, source_tree_dict
 
-    with open(os.path.join(generated_source_json), "r", encoding="utf-8") as f:
-        source_tree_dict = json.loads(f.read())
+    # The snapshot is memory mapped, only the parts of the tree that are accessed are read.
+    source_tree_dict = TreeSnapshot(generated_source_snapshot)
     return file_manager, tree_structure, source_tree_dict
 
 
@@ -103,6 +138,12 @@ def categorize_and_generate_dest_tree(
     tree_structure: TreeStructure,
     dest_tree_path: str,
     config: dict,
+    categorize_workers: int = 1,
+    partition_depth: int = DEFAULT_PARTITION_DEPTH,
+    sniff_source_directory: str = None,
+    rule_stats_path: str = None,
+    lazy: bool = False,
+    max_depth: int = None,
 ):
     """
     Categorizes files and directories paths from the source tree dictionary based on a
@@ -118,6 +159,16 @@ def categorize_and_generate_dest_tree(
                                          to generate and write the categorized tree structure
                                          to the destination directory.
         dest_tree_path (str): Path to the categorized tree path.
+        categorize_workers (int): Number of processes to categorize the subtrees of the source in parallel.
+        partition_depth (int): Depth below the source root at which the tree is split into subtrees for
+                               the parallel categorization.
+        sniff_source_directory (str): Optional source directory of the tree. If provided, the files that no
+                                      rule matched are classified by their content.
+        rule_stats_path (str): Optional path of a json report with the evaluations, matches and time of
+                               every rule and the file count of every category. The table is also logged.
+        lazy (bool): Return a lazily categorized tree. Only the directories that are rendered, or later
+                     copied, are categorized.
+        max_depth (int): Optional number of directory levels expanded in the categorized tree file.
 
     Returns:
         dict: A dictionary representing the categorized file tree, where files and
@@ -128,19 +179,205 @@ def categorize_and_generate_dest_tree(
     """
 
     if config is None:
-        config = CONFIG
+        config = settings.CONFIG
 
     # Categorize the files and dirs based on the given config
-    categorizer = Categorizer(config)
+    categorizer = Categorizer(config, collect_stats=rule_stats_path is not None)
+    if sniff_source_directory is not None:
+        categorizer.content_sniffer = ContentSniffer(sniff_source_directory)
     categorized_tree_dict = categorizer.categorize_dict(
-        source_tree_dict=source_tree_dict, recursive=True
+        source_tree_dict=source_tree_dict,
+        recursive=True,
+        workers=categorize_workers,
+        partition_depth=partition_depth,
+        lazy=lazy,
     )
 
     FileManager.create_and_write_file(
         file_path=dest_tree_path,
         callback=lambda file_stream: tree_structure.generate_tree_structure(
-            tree_dict=categorized_tree_dict, indent="", generated_tree_file=file_stream
+            tree_dict=categorized_tree_dict,
+            indent="",
+            generated_tree_file=file_stream,
+            max_depth=max_depth,
         ),
     )
 
+    # A lazy tree that is copied later starts a new pool if it sniffs any more files.
+    if categorizer.content_sniffer is not None:
+        categorizer.content_sniffer.close()
+
+    # A lazy tree is categorized while it is rendered, so the counters are complete only now.
+    if categorizer.rule_stats is not None:
+        logger.info(" - Rule stats:\n%s", categorizer.rule_stats.format_table())
+        categorizer.rule_stats.save(rule_stats_path)
+
     return categorized_tree_dict
+
+
+def categorize_and_sort_streaming(
+    source_directory: str,
+    destination_directory: str,
+    config: dict,
+    move_files: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sniff_content: bool = False,
+    io_workers: int = 1,
+    link_mode: str = None,
+):
+    """
+    Walks, categorizes and copies/moves the source directory as a stream of batches. Unlike
+    :func:`process_source_and_generate_tree` no source tree dictionary, json or tree file is
+    generated, so the peak memory depends on the tree depth and batch size instead of the total
+    number of files.
+
+    Parameters:
+        source_directory (str): The path to the source directory containing files to be processed.
+        destination_directory (str): The path to the destination directory.
+        config (dict): The config dict.
+        move_files (bool): Move the files instead of copying them. Default is False (copy).
+        batch_size (int): The maximum number of file entries per batch.
+        sniff_content (bool): Classify the files that no rule matched by their content.
+        io_workers (int): Number of threads copying or moving files concurrently.
+        link_mode (str): "hard" or "sym" to link the files instead of copying or moving them.
+
+    Returns:
+        int: The number of processed files.
+
+    Example:
+        categorize_and_sort_streaming(source_dir, destination_dir, config)
+    """
+    if config is None:
+        config = settings.CONFIG
+
+    file_manager = FileManager(source_directory, destination_directory)
+    categorizer = Categorizer(
+        config,
+        content_sniffer=ContentSniffer(source_directory) if sniff_content else None,
+    )
+
+    try:
+        return file_manager.sort_batches(
+            categorizer.categorize_batches(
+                # Same directories as the tree mode, see Categorizer.categorize_tree.
+                file_manager.iter_file_batches(
+                    batch_size,
+                    categorizer.is_excluded,
+                    skip_dirs_without_files=True,
+                    # The files are only stat'ed for the size and age rules.
+                    with_stats=categorizer.uses_stats,
+                )
+            ),
+            move_files=move_files,
+            io_workers=io_workers,
+            link_mode=link_mode,
+        )
+    finally:
+        if categorizer.content_sniffer is not None:
+            categorizer.content_sniffer.close()
+
+
+def plan_file_operations(
+    file_manager: FileManager,
+    config: dict,
+    categorized_tree_dict: dict,
+    plan_path: str,
+    move_files: bool = False,
+    source_tree=None,
+    link_mode: str = None,
+) -> OperationPlan:
+    """
+    Compiles the file operations of the categorized tree into an operation plan and saves it as NDJSON for
+    review. Nothing is written to the destination directory. The plan is executed later with
+    :func:`execute_operation_plan`.
+
+    Parameters:
+        file_manager (FileManager): The file manager of the source and destination directories.
+        config (dict): The config dict.
+        categorized_tree_dict (dict): The categorized tree.
+        plan_path (str): The path of the saved plan.
+        move_files (bool): Move the files instead of copying them. Default is False (copy).
+        source_tree (CompactTree): Optional walked source tree with recorded stats.
+        link_mode (str): "hard" or "sym" to link the files instead of copying or moving them.
+
+    Returns:
+        OperationPlan: The compiled plan.
+
+    Example:
+        plan_file_operations(file_manager, config, categorized_tree_dict[DIR], GENERATED_OPERATION_PLAN)
+    """
+    if config is None:
+        config = settings.CONFIG
+
+    plan = OperationPlan.compile(
+        file_manager,
+        config,
+        categorized_tree_dict,
+        move_files=move_files,
+        source_tree=source_tree,
+        link_mode=link_mode,
+    )
+    plan.save(plan_path)
+    summary = plan.summary()
+    logger.info(
+        " - Planned %s %s operations into %s directories, %s conflicts. Review %s and run it with --execute-plan.",
+        summary["operations"],
+        summary["operation"],
+        summary["mkdirs"],
+        summary["conflicts"],
+        plan_path,
+    )
+    for dest_file, reason in plan.conflicts:
+        logger.warning(" - Conflict (%s): %s", reason, dest_file)
+    return plan
+
+
+def execute_operation_plan(plan_path: str, io_workers: int = 1) -> int:
+    """
+    Executes an operation plan saved by :func:`plan_file_operations` without walking or categorizing the
+    source directory again.
+
+    Parameters:
+        plan_path (str): The path of the saved plan.
+        io_workers (int): Number of threads copying or moving files concurrently.
+
+    Returns:
+        int: The number of executed operations.
+
+    Example:
+        execute_operation_plan(GENERATED_OPERATION_PLAN, io_workers=8)
+    """
+    return OperationPlan.execute(plan_path, io_workers=io_workers)
+
+
+def watch_and_organize(
+    source_directory: str,
+    destination_directory: str,
+    config: dict,
+    move_files: bool = False,
+    debounce: float = DEFAULT_DEBOUNCE,
+):
+    """
+    Watches the source directory and organizes new or renamed files as they arrive until the process
+    is interrupted. Uses inotify on Linux and falls back to polling elsewhere. The categorizer is
+    compiled once and the file operations are done in debounced batches.
+
+    Parameters:
+        source_directory (str): The path to the directory to watch.
+        destination_directory (str): The path to the destination directory.
+        config (dict): The config dict.
+        move_files (bool): Move the files instead of copying them. Default is False (copy).
+        debounce (float): Seconds without new files before a batch is organized.
+
+    Example:
+        watch_and_organize(source_dir, destination_dir, config, debounce=5)
+    """
+    if config is None:
+        config = settings.CONFIG
+
+    FolderWatcher(
+        file_manager=FileManager(source_directory, destination_directory),
+        categorizer=Categorizer(config),
+        move_files=move_files,
+        debounce=debounce,
+    ).run()
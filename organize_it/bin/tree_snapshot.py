@@ -0,0 +1,242 @@
+""" Tree snapshot module. A binary, memory mappable file format for the generated source tree """
+
+import os
+import sys
+import mmap
+import struct
+from array import array
+from collections.abc import Sequence
+
+from organize_it.bin.compact_tree import CompactTree
+from organize_it.bin.file_stats import FileStats, STAT_COLUMNS
+
+SNAPSHOT_MAGIC = b"OITSNAP\0"
+SNAPSHOT_VERSION = 2
+
+# magic, version, little endian flag, root_rel_dir name id, node count, file count, name count,
+# skipped count, stats count (0 or the file count) and the size of the string table in bytes.
+HEADER = struct.Struct("=8sIB3xiIIIIIQ")
+
+# All sections start at a multiple of 8 bytes, so they can be cast to typed memoryviews in place.
+ALIGNMENT = 8
+
+NODE_TABLES = (
+    "node_parent",
+    "node_name",
+    "node_first_child",
+    "node_last_child",
+    "node_next_sibling",
+    "node_first_file",
+    "node_last_file",
+)
+FILE_TABLES = ("file_node", "file_name", "file_dir", "file_next")
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_snapshot(tree: CompactTree, snapshot_path: str):
+    """
+    Writes a CompactTree to `snapshot_path` in the binary snapshot format.
+
+    Layout (all integers in the byte order of the writing machine):
+        header          HEADER
+        name offsets    int64[name_count + 1] byte offsets into the string table
+        node tables     int32[node_count] for each of NODE_TABLES
+        file tables     int32[file_count] for each of FILE_TABLES
+        skipped         int32[skipped_count] parent nodes followed by int32[skipped_count] name ids
+        stats           one column per STAT_COLUMNS entry with stats_count rows, if the tree has stats
+        string table    UTF-8 encoded names
+
+    Every section is padded to 8 bytes. The file is written to a temporary file first and renamed,
+    so readers never see a partially written snapshot.
+
+    Args:
+        tree (CompactTree): The tree to save. A TreeSnapshot is accepted as well.
+        snapshot_path (str): The path of the snapshot file.
+    """
+    names = list(tree.names)
+    root_name_id = names.index(tree.root_rel_dir) if tree.root_rel_dir in names else -1
+    if root_name_id == -1:
+        root_name_id = len(names)
+        names.append(tree.root_rel_dir)
+
+    name_offsets = array("q", [0])
+    string_table = bytearray()
+    for name in names:
+        string_table += name.encode("utf-8", "surrogateescape")
+        name_offsets.append(len(string_table))
+
+    skipped_nodes = array("i")
+    skipped_names = array("i")
+    for node, name_ids in tree.skipped.items():
+        skipped_nodes.extend([node] * len(name_ids))
+        skipped_names.extend(name_ids)
+
+    sections = [name_offsets]
+    sections.extend(array("i", getattr(tree, table)) for table in NODE_TABLES)
+    sections.extend(array("i", getattr(tree, table)) for table in FILE_TABLES)
+    sections.extend([skipped_nodes, skipped_names])
+    stats_count = 0 if tree.stats is None else len(tree.stats)
+    if stats_count:
+        sections.extend(
+            array(type_code, getattr(tree.stats, name))
+            for name, type_code in STAT_COLUMNS
+        )
+
+    header = HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        sys.byteorder == "little",
+        root_name_id,
+        tree.node_count,
+        len(tree),
+        len(names),
+        len(skipped_nodes),
+        stats_count,
+        len(string_table),
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, "wb") as snapshot_file:
+        snapshot_file.write(header)
+        offset = len(header)
+        for section in sections + [string_table]:
+            padding = _aligned(offset) - offset
+            snapshot_file.write(b"\0" * padding)
+            snapshot_file.write(section)
+            offset += padding + len(section) * getattr(section, "itemsize", 1)
+    os.replace(tmp_path, snapshot_path)
+
+
+class SnapshotNames(Sequence):
+    """Lazy name pool of a TreeSnapshot. Names are decoded from the mapped string table on access."""
+
+    __slots__ = ("_offsets", "_strings")
+
+    def __init__(self, offsets: memoryview, strings: memoryview):
+        self._offsets = offsets
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, name_id):
+        if not 0 <= name_id < len(self):
+            raise IndexError(name_id)
+        return bytes(
+            self._strings[self._offsets[name_id] : self._offsets[name_id + 1]]
+        ).decode("utf-8", "surrogateescape")
+
+
+class TreeSnapshot(CompactTree):
+    """
+    A read only CompactTree backed by a memory mapped snapshot file.
+
+    Opening a snapshot only parses the fixed size header. The node and file tables are typed views into
+    the mapped file and names are decoded when they are accessed, so a query only touches the pages it needs.
+    It can be passed to every consumer of a CompactTree, e.g. :meth:`Categorizer.categorize_dict`.
+
+    Methods:
+        close(self)
+    """
+
+    __slots__ = ("snapshot_path", "_mmap", "_views")
+
+    def __init__(self, snapshot_path: str):  # pylint: disable=super-init-not-called
+        """
+        Constructor. Maps the snapshot file into memory.
+
+        Raises:
+            FileNotFoundError: If the snapshot does not exist.
+            ValueError: If the file is not a snapshot of this version or was written with another byte order.
+        """
+        self.snapshot_path = snapshot_path
+        with open(snapshot_path, "rb") as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+
+        try:
+            self._map_sections()
+        except (ValueError, TypeError, struct.error):
+            self.close()
+            raise
+
+    def _view(self, offset: int, length: int, type_code: str) -> tuple:
+        offset = _aligned(offset)
+        end = offset + length * struct.calcsize(type_code)
+        if end > len(self._mmap):
+            raise ValueError(f"Truncated tree snapshot {self.snapshot_path}")
+        view = memoryview(self._mmap)[offset:end].cast(type_code)
+        self._views.append(view)
+        return view, end
+
+    def _map_sections(self):
+        (
+            magic,
+            version,
+            little_endian,
+            root_name_id,
+            node_count,
+            file_count,
+            name_count,
+            skipped_count,
+            stats_count,
+            string_table_size,
+        ) = HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"{self.snapshot_path} is not a version {SNAPSHOT_VERSION} tree snapshot"
+            )
+        if bool(little_endian) != (sys.byteorder == "little"):
+            raise ValueError(
+                f"{self.snapshot_path} was written with a different byte order"
+            )
+
+        offset = HEADER.size
+        name_offsets, offset = self._view(offset, name_count + 1, "q")
+        for table in NODE_TABLES:
+            view, offset = self._view(offset, node_count, "i")
+            setattr(self, table, view)
+        for table in FILE_TABLES:
+            view, offset = self._view(offset, file_count, "i")
+            setattr(self, table, view)
+        skipped_nodes, offset = self._view(offset, skipped_count, "i")
+        skipped_names, offset = self._view(offset, skipped_count, "i")
+        self.stats = None
+        if stats_count:
+            self.stats = FileStats.__new__(FileStats)
+            for name, type_code in STAT_COLUMNS:
+                view, offset = self._view(offset, stats_count, type_code)
+                setattr(self.stats, name, view)
+        strings, _ = self._view(offset, string_table_size, "B")
+
+        self.names = SnapshotNames(name_offsets, strings)
+        self._name_ids = None
+        self.root_rel_dir = self.names[root_name_id]
+        self.skipped = {}
+        for node, name_id in zip(skipped_nodes, skipped_names):
+            self.skipped.setdefault(node, []).append(name_id)
+
+    def _read_only(self, *_):
+        raise TypeError("A TreeSnapshot is read only.")
+
+    intern = add_node = add_file = add_skipped = _read_only
+
+    def close(self):
+        """Releases the views and unmaps the snapshot file."""
+        for view in self._views:
+            view.release()
+        self._views = []
+        for table in NODE_TABLES + FILE_TABLES:
+            setattr(self, table, array("i"))
+        self.stats = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
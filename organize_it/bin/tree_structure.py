@@ -1,6 +1,7 @@
 """ File Manager module which handles all product related file handling"""
 
-from organize_it.settings import FILES, DIR
+from organize_it.settings import FILES, DIR, SKIPPED
+from organize_it.bin.compact_tree import CompactTree
 
 
 class TreeStructure:
@@ -8,11 +9,13 @@ class TreeStructure:
     A class to handle tree operations and representations such as traversal, generating directory tree. etc
 
     Methods:
-        def generate_tree_structure(self, tree_dict, indent, generated_tree_file)
+        def generate_tree_structure(self, tree_dict, indent, generated_tree_file, max_depth=None)
         yaml_config_to_dict(self, config_dict)
     """
 
-    def generate_tree_structure(self, tree_dict, indent, generated_tree_file):
+    def generate_tree_structure(
+        self, tree_dict, indent, generated_tree_file, max_depth: int = None
+    ):
         """
         Recursively generates a textual tree structure representation of files and directories
         and writes it to a specified file.
@@ -26,12 +29,17 @@ class TreeStructure:
             tree_dict (dict): A nested dictionary representing the directory structure.
                             It should have two main keys: 'FILES' and 'DIR'. 'FILES' maps
                             to a list of file names, and 'DIR' maps to another dictionary
-                            of subdirectories with their corresponding structure.
+                            of subdirectories with their corresponding structure. An optional
+                            'SKIPPED' key lists directories pruned by the skip rules, which are
+                            written as collapsed placeholders. A CompactTree is accepted as well.
             indent (str): A string representing the current indentation level. This is used
                         to format the tree structure with appropriate spacing.
             generated_tree_file (file-like object): A writable file object where the tree structure
                                                     will be written. This could be a file opened
                                                     in write or append mode.
+            max_depth (int): Optional number of directory levels below `tree_dict` to expand. Deeper directories are written
+                        as collapsed placeholders without being accessed, so a lazily categorized tree is
+                        only categorized as far as it is shown.
 
         Example:
             tree_dict = {
@@ -48,6 +56,9 @@ class TreeStructure:
                 }
             }
         """
+        if isinstance(tree_dict, CompactTree):
+            tree_dict = tree_dict.root()
+
         indent += "│   "
 
         if FILES in tree_dict:
@@ -56,7 +67,18 @@ class TreeStructure:
 
         if DIR in tree_dict:
             for directory in tree_dict[DIR]:
+                if max_depth is not None and max_depth <= 0:
+                    generated_tree_file.write(f"\n{indent}├── {directory}/ [...]")
+                    continue
                 generated_tree_file.write(f"\n{indent}├── {directory}/")
                 self.generate_tree_structure(
-                    tree_dict[DIR][directory], indent + "    ", generated_tree_file
+                    tree_dict[DIR][directory],
+                    indent + "    ",
+                    generated_tree_file,
+                    None if max_depth is None else max_depth - 1,
                 )
+
+        # Directories pruned by the skip rules are shown collapsed.
+        if SKIPPED in tree_dict:
+            for directory in tree_dict[SKIPPED]:
+                generated_tree_file.write(f"\n{indent}├── {directory}/ [skipped]")
@@ -0,0 +1,399 @@
+""" Walker module which handles the traversal of the source directory tree """
+
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from organize_it.settings import FILES, DIR, SKIPPED
+from organize_it.bin.compact_tree import CompactTree
+from organize_it.bin.file_stats import FileStats
+
+LOGGER = logging.getLogger(__name__)
+
+# Default number of file entries per batch yielded by DirectoryWalker.iter_batches
+DEFAULT_BATCH_SIZE = 1000
+
+
+def child_rel_dir(rel_dir: str, name: str) -> str:
+    """Returns the relative path of a sub directory. The root prefix "." is dropped for sub directories."""
+    return name if rel_dir == os.curdir else os.path.join(rel_dir, name)
+
+
+class DirectoryWalker:
+    """
+    A single pass directory walker built on top of `os.scandir`.
+
+    Every directory is listed exactly once and the type information of each `os.DirEntry`
+    is reused, so no additional `isdir`/`stat` calls are made during the traversal.
+
+    Methods:
+        scan_dir(self, dir_path: str, with_stats: bool = False) -> tuple
+        list_dir(self, dir_path: str, with_stats: bool = False) -> tuple
+        walk(self, current_dir: str = None) -> dict
+        walk_compact(self, current_dir: str = None, record_stats: bool = False) -> CompactTree
+        iter_batches(self, batch_size: int = DEFAULT_BATCH_SIZE, skip_dirs_without_files: bool = False, with_stats: bool = False)
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        workers: int = 1,
+        scan_index=None,
+        exclude=None,
+        show_pruned: bool = False,
+    ):
+        """
+        Constructor
+
+        Args:
+            root_path (str): The root directory of the walk. File paths are relative to it.
+            workers (int): Number of threads used to list directories concurrently in `walk`.
+                A value of 1 walks serially on the calling thread.
+            scan_index (ScanIndex): Optional persistent index. Unchanged directories are not listed again in `walk`.
+            exclude (callable): Optional `exclude(name, is_dir) -> bool` skip rule, e.g. :meth:`Categorizer.is_excluded`.
+                Excluded directories are pruned before the walker descends into them. Directories are matched by name,
+                just like the Categorizer does. Files are always listed, the Categorizer filters them, so a directory
+                whose only files are excluded is still categorized with everything below it.
+            show_pruned (bool): Record the names of pruned directories under the 'skipped' key of their parent node
+                in `walk`, so the tree structure can show them as collapsed placeholders.
+        """
+        self.root_path = root_path
+        self.workers = max(1, workers or 1)
+        self.scan_index = scan_index
+        self.exclude = exclude
+        self.show_pruned = show_pruned
+
+    def scan_dir(self, dir_path: str, with_stats: bool = False) -> tuple:
+        """
+        Lists a single directory and splits its entries into files and sub directories.
+
+        Symlinks to directories are neither listed as files nor followed, which mirrors the
+        behaviour of `os.walk` with `followlinks=False`.
+
+        Args:
+            dir_path (str): The absolute or relative path of the directory to list.
+            with_stats (bool): Also return the `DirEntry.stat()` result of every file. None for files
+                that cannot be stat'ed, e.g. broken symlinks.
+
+        Returns:
+            tuple: A tuple of (file_names, dir_names) lists in the order returned by the OS.
+                With `with_stats` a tuple of (file_names, dir_names, file_stats).
+
+        Raises:
+            OSError: If the directory cannot be listed.
+        """
+        file_names = []
+        dir_names = []
+        file_stats = []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if not is_dir:
+                    file_names.append(entry.name)
+                    if with_stats:
+                        try:
+                            file_stats.append(entry.stat())
+                        except OSError:
+                            file_stats.append(None)
+                elif not entry.is_symlink():
+                    dir_names.append(entry.name)
+
+        if with_stats:
+            return file_names, dir_names, file_stats
+        return file_names, dir_names
+
+    def list_dir(self, dir_path: str, with_stats: bool = False) -> tuple:
+        """
+        Returns the (file_names, dir_names) of a directory, from the scan index if one is set and the directory did not
+        change. With `with_stats` the `stat` results of the files are returned as well, see :meth:`scan_dir`.
+        """
+        if self.scan_index is not None:
+            return self.scan_index.list_dir(
+                dir_path, self.scan_dir, with_stats=with_stats
+            )
+        if with_stats:
+            return self.scan_dir(dir_path, with_stats=True)
+        return self.scan_dir(dir_path)
+
+    def walk(self, current_dir: str = None) -> dict:
+        """
+        Walks the tree below `current_dir` and returns it in the nested oIt dictionary format.
+        File paths are relative to the walker root. Files and sub directories are sorted by name
+        so the result is deterministic, whether the walk is serial or parallel.
+
+        Args:
+            current_dir (str): The directory to start from. Defaults to the walker root.
+
+        Returns:
+            dict: A dictionary containing files and subdirectories in the format:
+                {
+                    'files': [list_of_files],
+                    'dir': {
+                        'subdir_name': {
+                            'files': [list_of_files_in_subdir],
+                            'dir': {
+                                ...
+                            }
+                        }
+                    }
+                }
+        """
+        if current_dir is None:
+            current_dir = self.root_path
+
+        root_node = {FILES: [], DIR: {}}
+        # Each item is (dir_path, rel_dir, node, parent_node). parent_node is None for the root.
+        root_item = (
+            current_dir,
+            os.path.relpath(current_dir, self.root_path),
+            root_node,
+            None,
+        )
+        if self.workers > 1:
+            self._walk_parallel(root_item)
+        else:
+            self._walk_serial(root_item)
+
+        return root_node
+
+    def walk_compact(
+        self, current_dir: str = None, record_stats: bool = False
+    ) -> CompactTree:
+        """
+        Walks the tree below `current_dir` like :meth:`walk` but builds a :class:`CompactTree`
+        instead of the nested dictionary, which needs a fraction of the memory per file.
+
+        Args:
+            current_dir (str): The directory to start from. Defaults to the walker root.
+            record_stats (bool): Record the stat metadata of every file into `tree.stats`, see :class:`FileStats`.
+                The stats are taken from the `DirEntry` of the listing, or from a `stat` of the files of directories
+                the scan index did not list again.
+
+        Returns:
+            CompactTree: The walked tree. `to_dict()` returns the same dictionary as :meth:`walk`.
+        """
+        if current_dir is None:
+            current_dir = self.root_path
+
+        root_rel_dir = os.path.relpath(current_dir, self.root_path)
+        if self.workers > 1:
+            # The parallel walk links nodes in completion order, so it is built as a dictionary first.
+            tree = CompactTree.from_dict(self.walk(current_dir), root_rel_dir)
+            if record_stats:
+                tree.stats = FileStats.collect(tree, self.root_path, self.workers)
+            return tree
+
+        tree = CompactTree(root_rel_dir)
+        if record_stats:
+            tree.stats = FileStats()
+        # Each item is (dir_path, rel_dir, parent_node, name). parent_node is None for the root.
+        stack = [(current_dir, root_rel_dir, None, None)]
+        while stack:
+            dir_path, rel_dir, parent_node, name = stack.pop()
+            try:
+                if record_stats:
+                    file_names, dir_names, file_stats = self.list_dir(
+                        dir_path, with_stats=True
+                    )
+                else:
+                    file_names, dir_names = self.list_dir(dir_path)
+            except OSError as error:
+                if parent_node is None:
+                    raise
+                LOGGER.warning(
+                    " - Skipping unreadable directory %s: %s", dir_path, error
+                )
+                continue
+
+            node = 0 if parent_node is None else tree.add_node(parent_node, name)
+            for index in sorted(range(len(file_names)), key=file_names.__getitem__):
+                tree.add_file(node, file_names[index])
+                if record_stats:
+                    tree.stats.append(file_stats[index])
+
+            dir_names = sorted(dir_names)
+            if self.exclude is not None:
+                pruned_dir_names = [
+                    dir_name for dir_name in dir_names if self.exclude(dir_name, True)
+                ]
+                dir_names = [
+                    dir_name
+                    for dir_name in dir_names
+                    if dir_name not in pruned_dir_names
+                ]
+                if self.show_pruned:
+                    for dir_name in pruned_dir_names:
+                        tree.add_skipped(node, dir_name)
+
+            # Pushed in reverse so the sub directories are added to the node in sorted order.
+            for dir_name in reversed(dir_names):
+                stack.append(
+                    (
+                        os.path.join(dir_path, dir_name),
+                        child_rel_dir(rel_dir, dir_name),
+                        node,
+                        dir_name,
+                    )
+                )
+
+        return tree
+
+    def _walk_serial(self, root_item: tuple):
+        """Depth first walk on the current thread."""
+        stack = [root_item]
+        while stack:
+            item = stack.pop()
+            try:
+                file_names, dir_names = self.list_dir(item[0])
+            except OSError as error:
+                self._drop_unreadable(item, error)
+                continue
+
+            stack.extend(self._add_listing(item, file_names, dir_names))
+
+    def _walk_parallel(self, root_item: tuple):
+        """
+        Walk with a pool of `self.workers` threads. Pending directories form the work queue and
+        are listed concurrently, which hides the round trip of every `readdir` on network file systems.
+        The nodes are only ever created and linked on the calling thread, so the result is identical
+        to the serial walk.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {executor.submit(self.list_dir, root_item[0]): root_item}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        file_names, dir_names = future.result()
+                    except OSError as error:
+                        self._drop_unreadable(item, error)
+                        continue
+
+                    for child_item in self._add_listing(item, file_names, dir_names):
+                        pending[executor.submit(self.list_dir, child_item[0])] = (
+                            child_item
+                        )
+
+    def _add_listing(self, item: tuple, file_names: list, dir_names: list) -> list:
+        """
+        Fills the node of a walked directory with its sorted files and empty sub directory nodes.
+        Excluded directories are left out.
+
+        Returns:
+            list: The items of the sub directories which still have to be walked.
+        """
+        dir_path, rel_dir, node, _ = item
+        file_paths = [os.path.join(rel_dir, name) for name in sorted(file_names)]
+        dir_names = sorted(dir_names)
+        if self.exclude is not None:
+            pruned_dir_names = [name for name in dir_names if self.exclude(name, True)]
+            if pruned_dir_names:
+                dir_names = [name for name in dir_names if name not in pruned_dir_names]
+                if self.show_pruned:
+                    node[SKIPPED] = pruned_dir_names
+        node[FILES] = file_paths
+
+        child_items = []
+        for name in dir_names:
+            child_node = {FILES: [], DIR: {}}
+            node[DIR][name] = child_node
+            child_items.append(
+                (
+                    os.path.join(dir_path, name),
+                    child_rel_dir(rel_dir, name),
+                    child_node,
+                    node,
+                )
+            )
+        return child_items
+
+    @staticmethod
+    def _drop_unreadable(item: tuple, error: OSError):
+        """Removes an unreadable sub directory from its parent, just like os.walk does. Errors on the root are raised."""
+        dir_path, _, _, parent_node = item
+        if parent_node is None:
+            raise error
+
+        LOGGER.warning(" - Skipping unreadable directory %s: %s", dir_path, error)
+        del parent_node[DIR][os.path.basename(dir_path)]
+
+    def iter_batches(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        skip_dirs_without_files: bool = False,
+        with_stats: bool = False,
+    ):
+        """
+        Streams the tree below the walker root as `(rel_dir, entries)` batches instead of building
+        the whole nested dictionary in memory.
+
+        The walk is depth first. Every directory is listed completely, and its `os.scandir` iterator
+        closed, before its first batch is yielded, so the files of a batch can be moved or renamed
+        while the walk goes on. The memory used depends on the depth of the tree, the size of the
+        largest directories and the batch size but not on the total number of files. The files of a
+        single directory may be split across several batches and are yielded in the order returned by the OS.
+
+        Args:
+            batch_size (int): The maximum number of file entries per batch.
+            skip_dirs_without_files (bool): Skip the sub directories without files of their own and everything
+                below them, like :meth:`Categorizer.categorize_tree` does with a walked tree.
+            with_stats (bool): Also yield the recorded (size, mtime_ns) of every file, e.g. for the size and age
+                rules. None for files that cannot be stat'ed.
+
+        Yields:
+            tuple: A tuple of (rel_dir, entries) where entries is a list of file paths relative to
+            the walker root in the same format as the oIt dictionary, e.g. "./file.jpg" or "subDir1/file.jpg".
+            With `with_stats` a tuple of (rel_dir, entries, stamps).
+        """
+        root_rel_dir = os.path.relpath(self.root_path, self.root_path)
+        stack = [(self.root_path, root_rel_dir)]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            try:
+                if with_stats:
+                    file_names, dir_names, file_stats = self.scan_dir(
+                        dir_path, with_stats=True
+                    )
+                else:
+                    file_names, dir_names = self.scan_dir(dir_path)
+                    file_stats = [None] * len(file_names)
+            except OSError as error:
+                if rel_dir == root_rel_dir:
+                    raise
+                LOGGER.warning(
+                    " - Skipping unreadable directory %s: %s", dir_path, error
+                )
+                continue
+
+            file_paths = [os.path.join(rel_dir, name) for name in file_names]
+            stamps = [
+                (
+                    None
+                    if file_stat is None
+                    else (file_stat.st_size, file_stat.st_mtime_ns)
+                )
+                for file_stat in file_stats
+            ]
+            if skip_dirs_without_files and not file_paths and rel_dir != root_rel_dir:
+                continue
+
+            for start in range(0, len(file_paths), batch_size):
+                if with_stats:
+                    yield rel_dir, file_paths[start : start + batch_size], stamps[
+                        start : start + batch_size
+                    ]
+                else:
+                    yield rel_dir, file_paths[start : start + batch_size]
+
+            # Pushed in reverse so the sub directories are walked in the order returned by the OS.
+            for dir_name in reversed(dir_names):
+                if self.exclude is not None and self.exclude(dir_name, True):
+                    continue
+                stack.append(
+                    (os.path.join(dir_path, dir_name), child_rel_dir(rel_dir, dir_name))
+                )
@@ -0,0 +1,358 @@
+""" Watcher module which organizes newly arriving files in a long running process """
+
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+
+from organize_it.settings import exit_gracefully
+from organize_it.bin.walker import DirectoryWalker, child_rel_dir
+from organize_it.bin.file_executor import FileOperationExecutor
+from organize_it.bin.categorizer import UNCATEGORIZED
+
+LOGGER = logging.getLogger(__name__)
+
+# inotify event masks from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")
+READ_BUFFER_SIZE = 64 * 1024
+
+# Seconds without new events before a batch of files is organized.
+DEFAULT_DEBOUNCE = 2.0
+# Maximum number of files per batch. A full batch is organized right away.
+DEFAULT_MAX_BATCH = 1000
+# Seconds between two scans of the polling fallback.
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+def is_inside(path: str, parent_path: str) -> bool:
+    """Returns True if `path` is `parent_path` or below it."""
+    return path == parent_path or path.startswith(parent_path.rstrip(os.sep) + os.sep)
+
+
+class InotifyWatcher:
+    """
+    Watches a directory tree with Linux inotify. Every directory gets its own watch, new directories are
+    added as they appear.
+
+    Methods:
+        poll(self, timeout: float) -> list
+        close(self)
+    """
+
+    def __init__(self, root_path: str, exclude_path: str = None):
+        """
+        Constructor
+
+        Raises:
+            OSError: If inotify is not available on this system.
+        """
+        self.root_path = os.path.abspath(root_path)
+        self.exclude_path = os.path.abspath(exclude_path) if exclude_path else None
+        self._wd_to_rel_dir = {}
+
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+
+        self._add_tree(self.root_path)
+
+    def _add_watch(self, dir_path: str) -> bool:
+        if self.exclude_path and is_inside(dir_path, self.exclude_path):
+            return False
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(dir_path), ctypes.c_uint32(WATCH_MASK)
+        )
+        if wd < 0:
+            LOGGER.warning(
+                " - Cannot watch %s: %s", dir_path, os.strerror(ctypes.get_errno())
+            )
+            return False
+        self._wd_to_rel_dir[wd] = os.path.relpath(dir_path, self.root_path)
+        return True
+
+    def _add_tree(self, dir_path: str) -> list:
+        """Adds a watch to every directory below `dir_path` and returns the files that are already inside."""
+        walker = DirectoryWalker(self.root_path)
+        existing_files = []
+        stack = [dir_path]
+        while stack:
+            current_path = stack.pop()
+            if not self._add_watch(current_path):
+                continue
+            try:
+                file_names, dir_names = walker.scan_dir(current_path)
+            except OSError:
+                continue
+            rel_dir = os.path.relpath(current_path, self.root_path)
+            existing_files.extend(os.path.join(rel_dir, name) for name in file_names)
+            stack.extend(os.path.join(current_path, name) for name in dir_names)
+        return existing_files
+
+    def poll(self, timeout: float) -> list:
+        """
+        Waits up to `timeout` seconds for events and returns the new or renamed files.
+
+        Returns:
+            list: File paths relative to the root in the oIt dictionary format.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+
+        try:
+            buffer = os.read(self._fd, READ_BUFFER_SIZE)
+        except BlockingIOError:
+            return []
+
+        new_files = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + name_length].rstrip(b"\0"))
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                LOGGER.warning(" - inotify queue overflow, some files may be missed.")
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF):
+                self._wd_to_rel_dir.pop(wd, None)
+                continue
+
+            rel_dir = self._wd_to_rel_dir.get(wd)
+            if rel_dir is None or not name:
+                continue
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files can land in a new directory before its watch exists, so pick them up now.
+                    sub_dir_path = os.path.join(
+                        self.root_path, child_rel_dir(rel_dir, name)
+                    )
+                    new_files.extend(self._add_tree(sub_dir_path))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                new_files.append(os.path.join(rel_dir, name))
+
+        return new_files
+
+    def close(self):
+        """Releases the inotify file descriptor."""
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """
+    Portable fallback for systems without inotify. Periodically lists the tree and reports files that
+    were not there in the previous scan.
+
+    Methods:
+        poll(self, timeout: float) -> list
+        close(self)
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        exclude_path: str = None,
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        """Constructor"""
+        self.root_path = os.path.abspath(root_path)
+        self.exclude_path = os.path.abspath(exclude_path) if exclude_path else None
+        self.interval = interval
+        self._known_files = self._snapshot()
+        self._last_scan = time.monotonic()
+
+    def _snapshot(self) -> set:
+        exclude_rel_dir = None
+        if self.exclude_path and is_inside(self.exclude_path, self.root_path):
+            exclude_rel_dir = os.path.relpath(self.exclude_path, self.root_path)
+
+        files = set()
+        for rel_dir, entries in DirectoryWalker(self.root_path).iter_batches():
+            if exclude_rel_dir and is_inside(rel_dir, exclude_rel_dir):
+                continue
+            files.update(entries)
+        return files
+
+    def poll(self, timeout: float) -> list:
+        """
+        Waits up to `timeout` seconds and returns the files that appeared since the previous scan.
+
+        Returns:
+            list: File paths relative to the root in the oIt dictionary format.
+        """
+        remaining = self.interval - (time.monotonic() - self._last_scan)
+        if remaining > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(remaining, 0))
+
+        current_files = self._snapshot()
+        self._last_scan = time.monotonic()
+        new_files = sorted(current_files - self._known_files)
+        self._known_files = current_files
+        return new_files
+
+    def close(self):
+        """Nothing to release for the polling watcher."""
+
+
+def create_watcher(root_path: str, exclude_path: str = None, polling: bool = False):
+    """
+    Returns an InotifyWatcher on Linux and falls back to a PollingWatcher if inotify is not
+    available or `polling` is set.
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root_path, exclude_path)
+        except (OSError, AttributeError) as error:
+            LOGGER.warning(
+                " - inotify is not available (%s). Falling back to polling.", error
+            )
+    return PollingWatcher(root_path, exclude_path)
+
+
+class FolderWatcher:
+    """
+    Long running organizer for drop folders. New and renamed files are categorized with a Categorizer
+    that is compiled once and kept in memory, and copied/moved in debounced batches with a
+    :class:`FileOperationExecutor`. A file that cannot be organized, e.g. because it is unreadable or its
+    name already exists in the category directory of a move, is logged and skipped, the watcher keeps running.
+
+    Methods:
+        process_events(self, timeout: float) -> int
+        flush(self) -> int
+        run(self)
+    """
+
+    def __init__(
+        self,
+        file_manager,
+        categorizer,
+        move_files: bool = False,
+        debounce: float = DEFAULT_DEBOUNCE,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        watcher=None,
+    ):
+        """Constructor"""
+        if os.path.abspath(file_manager.source_path) == os.path.abspath(
+            file_manager.destination_path
+        ):
+            exit_gracefully(
+                "The watch mode needs a destination directory outside of the source directory."
+            )
+        self.file_manager = file_manager
+        self.categorizer = categorizer
+        self.move_files = move_files
+        self.debounce = debounce
+        self.max_batch = max_batch
+        self.watcher = watcher or create_watcher(
+            file_manager.source_path, file_manager.destination_path
+        )
+        # Files waiting for the next batch. A dict keeps the arrival order and drops duplicates.
+        self._pending = {}
+        self._last_event = None
+
+    def process_events(self, timeout: float) -> int:
+        """
+        Waits up to `timeout` seconds for new files and organizes the pending batch once no new files
+        arrived for `debounce` seconds or the batch is full.
+
+        Returns:
+            int: The number of organized files.
+        """
+        new_files = self.watcher.poll(timeout)
+        if new_files:
+            self._pending.update(dict.fromkeys(new_files))
+            self._last_event = time.monotonic()
+
+        if not self._pending:
+            return 0
+        if (
+            len(self._pending) >= self.max_batch
+            or time.monotonic() - self._last_event >= self.debounce
+        ):
+            return self.flush()
+        return 0
+
+    def flush(self) -> int:
+        """
+        Categorizes and copies/moves all pending files.
+
+        Returns:
+            int: The number of organized files.
+        """
+        pending_files = list(self._pending)
+        self._pending = {}
+
+        file_names = []
+        stamps = []
+        for file_name in self.categorizer.filter_excluded_names(pending_files, False):
+            if self.categorizer.is_excluded_dir_path(os.path.dirname(file_name)):
+                continue
+            # The file could be gone again before the batch is organized. The stat is used by the size and age rules.
+            try:
+                file_stat = os.stat(
+                    os.path.join(self.file_manager.source_path, file_name)
+                )
+            except OSError:
+                LOGGER.warning(" - %s disappeared before it was organized.", file_name)
+                continue
+            file_names.append(file_name)
+            stamps.append((file_stat.st_size, file_stat.st_mtime_ns))
+
+        executor = FileOperationExecutor(1, self.move_files)
+        categories = self.categorizer.categories
+        for file_name, category_id in zip(
+            file_names, self.categorizer.classify_batch(file_names, stamps)
+        ):
+            if category_id == UNCATEGORIZED:
+                continue
+            dir_name = categories[category_id]
+            source_file_path = os.path.join(self.file_manager.source_path, file_name)
+            if not os.access(source_file_path, os.W_OK if self.move_files else os.R_OK):
+                LOGGER.warning(" - Skipping %s, it is not accessible.", file_name)
+                continue
+            self.file_manager.sort_file(
+                file_name, dir_name, self.move_files, validate=False, executor=executor
+            )
+
+        # Failed operations are logged by close, they must not stop the watcher.
+        executor.close()
+        sorted_count = executor.files
+        if sorted_count:
+            LOGGER.info(" - Organized %s new files.", sorted_count)
+        return sorted_count
+
+    def run(self):
+        """Organizes new files until the process is interrupted."""
+        LOGGER.info(
+            " - Watching %s for new files. Press Ctrl+C to stop.",
+            self.file_manager.source_path,
+        )
+        try:
+            while True:
+                self.process_events(timeout=min(self.debounce, 1.0) or 1.0)
+        except KeyboardInterrupt:
+            LOGGER.info(" - Stopping the watcher.")
+            self.flush()
+        finally:
+            self.watcher.close()
@@ -2,7 +2,10 @@
 
 import argparse
 from organize_it.cli.interactive_cli import InteractiveCLI
-from organize_it.settings import load_yaml
+from organize_it.settings import load_yaml, GENERATED_OPERATION_PLAN
+from organize_it.bin.watcher import DEFAULT_DEBOUNCE
+from organize_it.bin.categorizer import DEFAULT_PARTITION_DEPTH
+from organize_it.bin.file_executor import LINK_MODES
 
 
 class InputArgParser:
@@ -23,6 +26,20 @@ class InputArgParser:
             self._interactive,
             self._ai,
             self._config,
+            self._stream,
+            self._walk_workers,
+            self._no_index,
+            self._watch,
+            self._debounce,
+            self._export_json,
+            self._categorize_workers,
+            self._partition_depth,
+            self._sniff_content,
+            self._rule_stats,
+            self._io_workers,
+            self._link_mode,
+            self._plan_only,
+            self._execute_plan,
         ) = self.parse_args()
 
         if bool(self._interactive):
@@ -58,6 +75,62 @@ class InputArgParser:
     def ai(self):
         return bool(self._ai)
 
+    @property
+    def stream(self):
+        return bool(self._stream)
+
+    @property
+    def walk_workers(self):
+        return self._walk_workers or 1
+
+    @property
+    def no_index(self):
+        return bool(self._no_index)
+
+    @property
+    def watch(self):
+        return bool(self._watch)
+
+    @property
+    def debounce(self):
+        return DEFAULT_DEBOUNCE if self._debounce is None else self._debounce
+
+    @property
+    def export_json(self):
+        return bool(self._export_json)
+
+    @property
+    def categorize_workers(self):
+        return self._categorize_workers or 1
+
+    @property
+    def partition_depth(self):
+        return self._partition_depth or DEFAULT_PARTITION_DEPTH
+
+    @property
+    def sniff_content(self):
+        return bool(self._sniff_content)
+
+    @property
+    def rule_stats(self):
+        return bool(self._rule_stats)
+
+    @property
+    def io_workers(self):
+        return self._io_workers or 1
+
+    @property
+    def link_mode(self):
+        return self._link_mode
+
+    @property
+    def plan_only(self):
+        return bool(self._plan_only)
+
+    @property
+    def execute_plan(self):
+        return self._execute_plan
+
     @property
     def config(self):
         if self._interactive:
@@ -65,6 +138,11 @@ class InputArgParser:
 
         return load_yaml(self._config)
 
+    @property
+    def config_path(self):
+        """The --config path, None in interactive mode where the config is already loaded."""
+        return None if self._interactive else self._config
+
     def parse_args(self) -> dict:
         """
         Parses command-line arguments and options using the configured argument parser.
@@ -118,11 +196,113 @@ class InputArgParser:
                 help="--ai: Use this flag to use AI to organize your files.",
                 action="store_true",
             )
+            parser.add_argument(
+                "--stream",
+                help="--stream: Walk, categorize and copy/move the source directory in batches with bounded memory. No tree is generated.",
+                action="store_true",
+            )
+            parser.add_argument(
+                "--walk-workers",
+                type=int,
+                default=1,
+                help="--walk-workers: Number of threads to scan the source directories concurrently. Useful on network file systems.",
+            )
+            parser.add_argument(
+                "--no-index",
+                help="--no-index: Rescan every source directory instead of reusing the persistent scan index of previous runs.",
+                action="store_true",
+            )
+            parser.add_argument(
+                "--watch",
+                help="--watch: Keep running and organize new files as they arrive in the source directory.",
+                action="store_true",
+            )
+            parser.add_argument(
+                "--debounce",
+                type=float,
+                default=DEFAULT_DEBOUNCE,
+                help="--debounce: Seconds without new files before a batch is organized in --watch mode.",
+            )
+            parser.add_argument(
+                "--export-json",
+                help="--export-json: Also save the source tree as json next to the binary snapshot. Useful for debugging.",
+                action="store_true",
+            )
+            parser.add_argument(
+                "--categorize-workers",
+                type=int,
+                default=1,
+                help="--categorize-workers: Number of processes to categorize the subtrees of the source directory in parallel.",
+            )
+            parser.add_argument(
+                "--partition-depth",
+                type=int,
+                default=DEFAULT_PARTITION_DEPTH,
+                help="--partition-depth: Depth below the source directory at which it is split into subtrees for --categorize-workers.",
+            )
+            parser.add_argument(
+                "--sniff-content",
+                help="--sniff-content: Classify extensionless and unknown files by their first bytes. Files matched by name or extension are never read.",
+                action="store_true",
+            )
+            parser.add_argument(
+                "--rule-stats",
+                help="--rule-stats: Report the evaluations, matches and time of every rule and the file count of every category.",
+                action="store_true",
+            )
+            parser.add_argument(
+                "--io-workers",
+                type=int,
+                default=1,
+                help="--io-workers: Number of threads copying or moving files concurrently. Useful on SSD arrays and network storage.",
+            )
+            parser.add_argument(
+                "--link-mode",
+                choices=LINK_MODES,
+                default=None,
+                help="--link-mode: Build the destination tree out of hard or symbolic links to the source files instead of copying them. Hard links across devices fall back to a copy.",
+            )
+
+            parser.add_argument(
+                "--plan-only",
+                help=f"--plan-only: Save the planned file operations to {GENERATED_OPERATION_PLAN} for review instead of performing them.",
+                action="store_true",
+            )
+            parser.add_argument(
+                "--execute-plan",
+                nargs="?",
+                const=GENERATED_OPERATION_PLAN,
+                default=None,
+                help="--execute-plan: Perform the file operations of a plan saved with --plan-only without scanning or categorizing the source again.",
+            )
 
             cli_args = parser.parse_args()
+            if vars(cli_args).get("link_mode") and vars(cli_args).get("move"):
+                parser.error("--link-mode cannot be combined with --move.")
             return [
                 vars(cli_args).get(f)
-                for f in ["src", "dest", "move", "interactive", "ai", "config"]
+                for f in [
+                    "src",
+                    "dest",
+                    "move",
+                    "interactive",
+                    "ai",
+                    "config",
+                    "stream",
+                    "walk_workers",
+                    "no_index",
+                    "watch",
+                    "debounce",
+                    "export_json",
+                    "categorize_workers",
+                    "partition_depth",
+                    "sniff_content",
+                    "rule_stats",
+                    "io_workers",
+                    "link_mode",
+                    "plan_only",
+                    "execute_plan",
+                ]
             ]
 
         except SystemExit as exception:
@@ -29,6 +29,9 @@ ARG_SIDE_EFFECTS = {"config": "on_config_set"}
 # The number of user attempts per input before exiting.
 NUMBER_OF_ATTEMPTS = 5
 
+# The number of directory levels of the categorized tree preview. Deeper directories are not categorized.
+PREVIEW_DEPTH = 3
+
 # TODO: backwards iteration https://stackoverflow.com/questions/55380989/is-there-any-way-to-go-back-a-step-in-a-python-for-loop
 
 
@@ -147,6 +150,9 @@ class InteractiveCLI:
             source_tree_dict=self.source_tree_dict,
             tree_structure=self.tree_structure,
             dest_tree_path=GENERATED_DESTINATION_TREE,
+            config=self.arg_dict.get("config"),
+            lazy=True,
+            max_depth=PREVIEW_DEPTH,
         )
         # Print the source tree only if the use chooses to view it.
         if args.user_response == "y":
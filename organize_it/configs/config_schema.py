@@ -1,6 +1,6 @@
 """ This is a Pydantic schema class to complement json-schema"""
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from pydantic import BaseModel, Field, RootModel
 
 
@@ -34,6 +34,21 @@ class NamesRule(BaseModel):
     )
 
 
+class SizeRule(BaseModel):
+    min_size: Union[int, str] = Field(
+        title="Minimum Size",
+        description="Minimum file size in bytes or with a unit, e.g. 1GB. Units are powers of 1024.",
+    )
+
+
+class AgeRule(BaseModel):
+    min_days: float = Field(
+        title="Minimum Age",
+        description="Minimum number of days since the file was last modified.",
+        ge=0,
+    )
+
+
 class RuleItem(BaseModel):
     # Key is a string(directory names) and values are list of formats.
     format: Optional[Dict[str, FormatRule]] = Field(
@@ -45,6 +60,12 @@ class RuleItem(BaseModel):
     skip: Optional[SkipRule] = Field(
         None, description="Rules for skipping certain files or directories."
     )
+    size: Optional[Dict[str, SizeRule]] = Field(
+        None, description="Rules for organizing files based on their size."
+    )
+    age: Optional[Dict[str, AgeRule]] = Field(
+        None, description="Rules for organizing files based on their last modification."
+    )
 
 
 class ConfigSchema(BaseModel):
@@ -23,6 +23,9 @@ FORMAT = "format"
 FILES = "files"
 DIR = "dir"
 SKIP = "skip"
+SIZE = "size"
+AGE = "age"
+SKIPPED = "skipped"
 # Current path
 WORKING_DIR = os.getcwd()
 
@@ -49,6 +52,9 @@ GENERATED_DESTINATION_TREE = f"{TMP_DIR}/.generated_destination.tree"
 GENERATED_DESTINATION_JSON = f"{TMP_DIR}/.generated_destination.json"
 GENERATED_SOURCE_TREE = f"{TMP_DIR}/.generated.tree"
 GENERATED_SOURCE_JSON = f"{TMP_DIR}/.generated.json"
+GENERATED_SOURCE_SNAPSHOT = f"{TMP_DIR}/.generated.snapshot"
+GENERATED_RULE_STATS = f"{TMP_DIR}/.rule_stats.json"
+GENERATED_OPERATION_PLAN = f"{TMP_DIR}/.operation_plan.ndjson"
 
 
 def load_json_schema():
@@ -100,11 +106,18 @@ def load_yaml(yaml_dir: str, yaml_path: str = None) -> list[any]:
 # The json-schema
 SCHEMA = load_json_schema()
 
-# The YAML config file
-CONFIG = load_yaml(CONFIG_DIR)
+# YAML configs which are only parsed when they are first accessed, so importing the settings parses no YAML.
+# CONFIG: the default YAML config file, TEST_FIXTURES_CONFIGS: the test fixture configs.
+_LAZY_YAML_DIRS = {"CONFIG": CONFIG_DIR, "TEST_FIXTURES_CONFIGS": TEST_FIXTURES_DIR}
+
+
+def __getattr__(name: str):
+    """Loads the lazy YAML configs of the module on first access and keeps them as module attributes."""
+    if name not in _LAZY_YAML_DIRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = load_yaml(_LAZY_YAML_DIRS[name])
+    return value
 
-# Load test fixures
-TEST_FIXTURES_CONFIGS = load_yaml(TEST_FIXTURES_DIR)
 
 # A simple state management system.
 CURRENT_RUN = False
@@ -0,0 +1,117 @@
+""" Benchmark for the categorization of the source tree.
+
+Compares Categorizer.categorize_dict, which classifies the files of a directory with one
+classify_batch call, with the previous implementation that categorized one file at a time
+and searched every name pattern with an uncompiled regex.
+
+Usage:
+    python -m organize_it.tests.benchmarks.categorize_benchmark
+"""
+
+import re
+import time
+import random
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.settings import FILES, DIR, TEST_FIXTURES_CONFIGS as CONFIG
+from organize_it.tests.benchmarks.tree_generator import DEFAULT_EXTENSION_MIX
+
+DIRS = 100
+
+
+def legacy_categorize_dict(categorizer: Categorizer, source_tree_dict: dict) -> dict:
+    """The previous per file Categorizer.categorize_dict implementation."""
+    name_rules = getattr(categorizer, "name_rules_dict", {})
+    types_to_format_dict = {
+        format_type: category
+        for rules in CONFIG[1]["rules"]
+        for category, types in rules.get("format", {}).items()
+        for format_type in types["types"]
+    }
+
+    def categorize_file(file_name):
+        matched = [
+            dir_name
+            for dir_name in name_rules
+            if re.search(name_rules[dir_name]["name_pattern"], file_name)
+        ]
+        if matched:
+            return matched[-1]
+        return types_to_format_dict.get(file_name.rsplit(".", 1)[1])
+
+    def categorize(input_dict) -> dict:
+        sorted_dict = {DIR: {}, FILES: []}
+        for file_name in categorizer.filter_excluded_names(input_dict[FILES], False):
+            matched_dir_name = categorize_file(file_name)
+            if matched_dir_name:
+                if matched_dir_name in sorted_dict[DIR]:
+                    sorted_dict[DIR][matched_dir_name][FILES].append(file_name)
+                else:
+                    sorted_dict[DIR][matched_dir_name] = {DIR: {}, FILES: [file_name]}
+
+        for dir_name in categorizer.filter_excluded_names(input_dict[DIR].keys(), True):
+            if len(input_dict[DIR][dir_name][FILES]):
+                sorted_dict[DIR][dir_name] = categorize(input_dict[DIR][dir_name])
+        return sorted_dict
+
+    return categorize(source_tree_dict)
+
+
+def generate_tree_dict(file_count: int) -> dict:
+    """Returns a flat two level oIt dictionary with `file_count` files and the default extension mix."""
+    rng = random.Random(0)
+    # Multi part extensions like "tar.gz" are only matched by the new implementation.
+    extension_mix = {
+        extension: weight
+        for extension, weight in DEFAULT_EXTENSION_MIX.items()
+        if "." not in extension
+    }
+    extensions = list(extension_mix)
+    weights = list(extension_mix.values())
+    words = ["holiday", "image", "scan", "project", "report", "pic", "invoice"]
+
+    tree_dict = {FILES: [], DIR: {}}
+    for dir_index in range(DIRS):
+        dir_name = f"dir_{dir_index}"
+        tree_dict[DIR][dir_name] = {
+            FILES: [
+                f"{dir_name}/{rng.choice(words)}_{index}.{rng.choices(extensions, weights)[0]}"
+                for index in range(file_count // DIRS)
+            ],
+            DIR: {},
+        }
+    return tree_dict
+
+
+def time_call(call, repeat: int = 3) -> float:
+    """Returns the best wall clock time of `repeat` runs of `call`."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(file_counts=(10_000, 100_000, 1_000_000)):
+    """Runs the benchmark for each file count and prints the time spent per file."""
+    categorizer = Categorizer(CONFIG[1])
+    print(
+        f"{'files':>8} {'batch (s)':>10} {'us/file':>8} {'legacy (s)':>11} {'us/file':>8}"
+    )
+    for file_count in file_counts:
+        tree_dict = generate_tree_dict(file_count)
+        assert categorizer.categorize_dict(tree_dict, True) == legacy_categorize_dict(
+            categorizer, tree_dict
+        )
+
+        batch_time = time_call(lambda: categorizer.categorize_dict(tree_dict, True))
+        legacy_time = time_call(lambda: legacy_categorize_dict(categorizer, tree_dict))
+        print(
+            f"{file_count:>8} {batch_time:>10.3f} {batch_time / file_count * 1e6:>8.2f}"
+            f" {legacy_time:>11.3f} {legacy_time / file_count * 1e6:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,112 @@
+""" Benchmark for the copy backends.
+
+Writes a set of small files and a few large files and copies them once with every backend of
+`copy_backend.available_backends()`. Prints the backend that actually copied the files (a backend
+the devices do not support falls back to the next one) and the throughput in files/s and MB/s.
+
+Usage:
+    python -m organize_it.tests.benchmarks.copy_backend_benchmark --small-files 2000 --large-files 4 --large-size 268435456
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+from organize_it.bin.copy_backend import CopyBackend, available_backends
+
+
+def write_files(base_path: str, count: int, size: int) -> list:
+    """Writes `count` files of `size` random bytes below `base_path` and returns their paths."""
+    os.makedirs(base_path)
+    file_paths = []
+    for index in range(count):
+        file_path = os.path.join(base_path, f"file_{index}.bin")
+        with open(file_path, "wb") as sample_file:
+            remaining = size
+            while remaining:
+                chunk = min(remaining, 2**20)
+                sample_file.write(os.urandom(chunk))
+                remaining -= chunk
+        file_paths.append(file_path)
+    return file_paths
+
+
+def copy_all(backend: CopyBackend, file_paths: list, dest_path: str) -> float:
+    """Copies `file_paths` into `dest_path` and returns the seconds it took."""
+    os.makedirs(dest_path)
+    start = time.perf_counter()
+    for file_path in file_paths:
+        backend.copy_file(
+            file_path, os.path.join(dest_path, os.path.basename(file_path))
+        )
+    return time.perf_counter() - start
+
+
+def run(args):
+    """Copies the small and the large files with every backend and prints the throughput."""
+    base_path = tempfile.mkdtemp(prefix="oit_copy_backend_benchmark_", dir=args.tmp_dir)
+    dest_root = args.dest_dir or base_path
+    try:
+        file_sets = {
+            "small": (
+                write_files(
+                    os.path.join(base_path, "small"), args.small_files, args.small_size
+                ),
+                args.small_size,
+            ),
+            "large": (
+                write_files(
+                    os.path.join(base_path, "large"), args.large_files, args.large_size
+                ),
+                args.large_size,
+            ),
+        }
+
+        print(
+            f"{'backend':>16} {'used':>16} {'set':>6} {'files':>7} {'seconds':>9} {'files/s':>9} {'MB/s':>9}"
+        )
+        for name in args.backends or available_backends():
+            for set_name, (file_paths, size) in file_sets.items():
+                backend = CopyBackend((name,))
+                dest_path = os.path.join(dest_root, f"oit_dest_{name}_{set_name}")
+                seconds = copy_all(backend, file_paths, dest_path)
+                shutil.rmtree(dest_path)
+                used = ",".join(sorted(backend.counts))
+                print(
+                    f"{name:>16} {used:>16} {set_name:>6} {len(file_paths):>7} {seconds:>9.3f}"
+                    f" {len(file_paths) / seconds:>9.0f}"
+                    f" {len(file_paths) * size / seconds / 2**20:>9.1f}"
+                )
+    finally:
+        shutil.rmtree(base_path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Copy backend benchmark.")
+    parser.add_argument("--small-files", type=int, default=2000)
+    parser.add_argument("--small-size", type=int, default=16 * 1024)
+    parser.add_argument("--large-files", type=int, default=4)
+    parser.add_argument("--large-size", type=int, default=64 * 2**20)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=None,
+        help="Backends to compare. Defaults to all backends of the platform.",
+    )
+    parser.add_argument(
+        "--tmp-dir",
+        default=None,
+        help="Directory of the source files, e.g. on the storage to measure.",
+    )
+    parser.add_argument(
+        "--dest-dir",
+        default=None,
+        help="Directory of the copies. Use another device to measure cross-device copies.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
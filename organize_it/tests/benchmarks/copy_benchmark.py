@@ -0,0 +1,95 @@
+""" Benchmark for the copy stage.
+
+Generates a synthetic tree with `tree_generator`, categorizes it once and copies it with
+FileManager.categorize_and_sort_file for every `--io-workers` count. Prints the throughput
+in files/s and MB/s and checks that every run produces the same destination layout.
+
+Usage:
+    python -m organize_it.tests.benchmarks.copy_benchmark --files 20000 --file-size 65536 --io-workers 1 4 8 16
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.file_manager import FileManager
+from organize_it.settings import DIR, TEST_FIXTURES_CONFIGS as CONFIG
+from organize_it.tests.benchmarks.tree_generator import generate_synthetic_tree
+
+
+def destination_layout(destination_path: str) -> set:
+    """Returns the paths of all files below `destination_path` relative to it."""
+    return {
+        os.path.relpath(os.path.join(dir_path, file_name), destination_path)
+        for dir_path, _, file_names in os.walk(destination_path)
+        for file_name in file_names
+    }
+
+
+def run(args):
+    """Copies the generated tree once per worker count and prints the throughput."""
+    base_path = tempfile.mkdtemp(prefix="oit_copy_benchmark_", dir=args.tmp_dir)
+    source_path = os.path.join(base_path, "source")
+    try:
+        summary = generate_synthetic_tree(
+            source_path,
+            args.files,
+            fan_out=args.fan_out,
+            depth=args.depth,
+            file_size=args.file_size,
+        )
+        categorized_tree_dict = Categorizer(CONFIG[1]).categorize_dict(
+            FileManager(source_path, "").file_walk_compact(), True
+        )
+
+        print(
+            f"{'io workers':>10} {'files':>8} {'seconds':>9} {'files/s':>9} {'MB/s':>8}"
+        )
+        serial_layout = None
+        for io_workers in args.io_workers:
+            destination_path = os.path.join(base_path, f"dest_{io_workers}")
+            file_manager = FileManager(source_path, destination_path)
+            start = time.perf_counter()
+            file_manager.categorize_and_sort_file(
+                config=CONFIG[1],
+                sorted_tree_dict=categorized_tree_dict[DIR],
+                io_workers=io_workers,
+            )
+            seconds = time.perf_counter() - start
+
+            layout = destination_layout(destination_path)
+            if serial_layout is None:
+                serial_layout = layout
+            assert layout == serial_layout, "The destination layout differs."
+            shutil.rmtree(destination_path)
+
+            print(
+                f"{io_workers:>10} {len(layout):>8} {seconds:>9.3f}"
+                f" {len(layout) / seconds:>9.0f}"
+                f" {len(layout) * args.file_size / seconds / 2**20:>8.1f}"
+            )
+        print(f"\n{summary['files']} files of {args.file_size} bytes in {base_path}")
+    finally:
+        shutil.rmtree(base_path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Copy stage benchmark.")
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--file-size", type=int, default=64 * 1024)
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--io-workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument(
+        "--tmp-dir",
+        default=None,
+        help="Directory of the generated trees, e.g. on the storage to measure.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
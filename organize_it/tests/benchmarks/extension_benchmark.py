@@ -0,0 +1,76 @@
+""" Benchmark for the extension lookup of the format rules.
+
+Compares the longest suffix ExtensionTrie lookup with the previous single
+`rsplit(".", 1)` and dict lookup, which cannot match multi part extensions.
+The trie is measured with and without the multi part "tar.gz" type.
+
+Usage:
+    python -m organize_it.tests.benchmarks.extension_benchmark
+"""
+
+import time
+import random
+
+from organize_it.bin.rule_engine import ExtensionTrie
+from organize_it.tests.benchmarks.tree_generator import DEFAULT_EXTENSION_MIX
+
+NAME_COUNT = 1_000_000
+TYPES = ["png", "jpg", "mp4", "doc", "docx", "pdf", "txt", "zip", "tar", "tar.gz"]
+
+
+def legacy_lookup(types_to_format_dict: dict, names: list) -> list:
+    """The previous lookup. Extensionless names are skipped instead of raising IndexError."""
+    return [
+        types_to_format_dict.get(name.rsplit(".", 1)[1]) if "." in name else None
+        for name in names
+    ]
+
+
+def trie_lookup(trie: ExtensionTrie, names: list) -> list:
+    """The ExtensionTrie lookup."""
+    return trie.match_batch(names)
+
+
+def time_call(call, repeat: int = 3) -> float:
+    """Returns the best wall clock time of `repeat` runs of `call`."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run():
+    """Runs the benchmark and prints the time spent per name."""
+    rng = random.Random(0)
+    extensions = list(DEFAULT_EXTENSION_MIX) + ["", "JPG"]
+    names = [
+        f"dir_{index % 100}/file_{index}.{rng.choice(extensions)}".rstrip(".")
+        for index in range(NAME_COUNT)
+    ]
+
+    types_to_format_dict = {format_type: format_type for format_type in TYPES}
+    trie = ExtensionTrie()
+    folded_trie = ExtensionTrie(ignore_case=True)
+    single_part_trie = ExtensionTrie()
+    for format_type in TYPES:
+        trie.add(format_type, format_type)
+        folded_trie.add(format_type, format_type)
+        if "." not in format_type:
+            single_part_trie.add(format_type, format_type)
+
+    for name, lookup in [
+        ("rsplit + dict", lambda: legacy_lookup(types_to_format_dict, names)),
+        ("trie", lambda: trie_lookup(trie, names)),
+        ("trie single part", lambda: trie_lookup(single_part_trie, names)),
+        ("trie ignore_case", lambda: trie_lookup(folded_trie, names)),
+    ]:
+        seconds = time_call(lookup)
+        print(
+            f"{name:>17} {seconds:>8.3f} s {seconds / NAME_COUNT * 1e9:>6.0f} ns/name"
+        )
+
+
+if __name__ == "__main__":
+    run()
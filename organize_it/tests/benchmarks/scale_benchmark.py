@@ -0,0 +1,196 @@
+""" Scaling benchmark for the source tree traversal.
+
+Generates synthetic trees of growing size with `tree_generator`, measures the throughput
+(entries/s) and the peak Python memory of the FileManager walks on each of them and prints a
+scaling table. The results are saved as json, so the numbers of two commits can be compared
+with `--compare`.
+
+Usage:
+    python -m organize_it.tests.benchmarks.scale_benchmark --files 10000 100000 1000000
+    python -m organize_it.tests.benchmarks.scale_benchmark --compare .tmp/scale_benchmark_old.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+
+from organize_it.bin.file_manager import FileManager
+from organize_it.settings import TMP_DIR
+from organize_it.tests.benchmarks.tree_generator import (
+    generate_synthetic_tree,
+    parse_extension_mix,
+)
+
+BENCHMARK_VERSION = 1
+
+
+def walk_variants(walk_workers: int) -> dict:
+    """Returns the measured walks as {name: walk(source_path)}."""
+    return {
+        "file_walk": lambda path: FileManager(path, "").file_walk(),
+        "file_walk_compact": lambda path: FileManager(path, "").file_walk_compact(),
+        f"file_walk_workers_{walk_workers}": lambda path: FileManager(
+            path, "", walk_workers=walk_workers
+        ).file_walk(),
+    }
+
+
+def measure(walk, source_path: str, repeat: int) -> tuple:
+    """Returns the best wall clock time of `repeat` walks and the peak traced memory of one more walk."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        walk(source_path)
+        timings.append(time.perf_counter() - start)
+
+    # Traced separately, tracemalloc slows the walk down.
+    tracemalloc.start()
+    try:
+        tree = walk(source_path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del tree
+    return min(timings), peak
+
+
+def current_commit() -> str:
+    """Returns the short hash of the checked out commit or None outside of a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    """Runs the benchmark for every file count and returns the results."""
+    results = []
+    print(
+        f"{'files':>9} {'dirs':>6} {'walk':>22} {'seconds':>9} {'entries/s':>11} {'peak MiB':>9}"
+    )
+    for file_count in args.files:
+        base_path = tempfile.mkdtemp(prefix="oit_scale_benchmark_")
+        try:
+            summary = generate_synthetic_tree(
+                base_path,
+                file_count,
+                fan_out=args.fan_out,
+                depth=args.depth,
+                extension_mix=(
+                    parse_extension_mix(args.extension_mix)
+                    if args.extension_mix
+                    else None
+                ),
+                workers=args.generator_workers,
+            )
+            entries = summary["files"] + summary["dirs"]
+            for name, walk in walk_variants(args.walk_workers).items():
+                seconds, peak = measure(walk, base_path, args.repeat)
+                results.append(
+                    {
+                        "walk": name,
+                        "files": summary["files"],
+                        "dirs": summary["dirs"],
+                        "seconds": seconds,
+                        "entries_per_second": entries / seconds,
+                        "peak_memory_bytes": peak,
+                    }
+                )
+                print(
+                    f"{summary['files']:>9} {summary['dirs']:>6} {name:>22} {seconds:>9.3f}"
+                    f" {entries / seconds:>11.0f} {peak / 2**20:>9.1f}"
+                )
+        finally:
+            shutil.rmtree(base_path)
+
+    return {
+        "version": BENCHMARK_VERSION,
+        "commit": current_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": {
+            "fan_out": args.fan_out,
+            "depth": args.depth,
+            "extension_mix": args.extension_mix,
+            "walk_workers": args.walk_workers,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline_path: str):
+    """Prints the throughput and memory of `report` relative to a previously saved report."""
+    with open(baseline_path, "r", encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+
+    baseline_results = {
+        (result["walk"], result["files"]): result for result in baseline["results"]
+    }
+    print(f"\nCompared to {baseline.get('commit')} ({baseline_path}):")
+    print(f"{'files':>9} {'walk':>22} {'throughput':>11} {'peak memory':>12}")
+    for result in report["results"]:
+        old = baseline_results.get((result["walk"], result["files"]))
+        if old is None:
+            continue
+        print(
+            f"{result['files']:>9} {result['walk']:>22}"
+            f" {result['entries_per_second'] / old['entries_per_second']:>10.2f}x"
+            f" {result['peak_memory_bytes'] / old['peak_memory_bytes']:>11.2f}x"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Walk scaling benchmark.")
+    parser.add_argument(
+        "--files",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="File counts of the generated trees, e.g. 10000 100000 1000000.",
+    )
+    parser.add_argument("--fan-out", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument(
+        "--extension-mix", default=None, help='Extension weights like "jpg:5,pdf:2".'
+    )
+    parser.add_argument("--generator-workers", type=int, default=None)
+    parser.add_argument("--walk-workers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Path of the json report. Defaults to .tmp/scale_benchmark_<commit>.json",
+    )
+    parser.add_argument(
+        "--compare", default=None, help="Path of a previous json report."
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    cli_args = parse_args()
+    benchmark_report = run(cli_args)
+
+    output_path = cli_args.output or os.path.join(
+        TMP_DIR, f"scale_benchmark_{benchmark_report['commit'] or 'local'}.json"
+    )
+    with open(output_path, "w", encoding="utf-8") as report_file:
+        json.dump(benchmark_report, report_file, indent=4)
+    print(f"\nSaved the results to {output_path}")
+
+    if cli_args.compare:
+        compare(benchmark_report, cli_args.compare)
@@ -0,0 +1,157 @@
+""" Procedural generator of large synthetic source trees for the benchmarks.
+
+Unlike `generate_samples_with_config` in `tests/test_utils.py`, which creates the small fixture
+from an explicit dictionary, the trees are described by a handful of parameters and can hold
+millions of files. Directories are created up front and the files are written by a pool of
+worker processes.
+
+Usage:
+    python -m organize_it.tests.benchmarks.tree_generator /tmp/tree --files 100000 --fan-out 8 --depth 4
+"""
+
+import os
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Default extension mix as {extension: weight}. Roughly what a downloads or photo folder looks like.
+DEFAULT_EXTENSION_MIX = {
+    "jpg": 40,
+    "png": 10,
+    "pdf": 15,
+    "doc": 10,
+    "mp4": 5,
+    "zip": 5,
+    "tar.gz": 5,
+    "txt": 10,
+}
+
+
+def parse_extension_mix(extension_mix: str) -> dict:
+    """Parses an extension mix like "jpg:5,pdf:2,doc:1" into {extension: weight}."""
+    mix = {}
+    for item in extension_mix.split(","):
+        extension, _, weight = item.partition(":")
+        mix[extension.strip()] = int(weight or 1)
+    return mix
+
+
+def tree_dirs(fan_out: int, depth: int) -> list:
+    """Returns the relative paths of a balanced tree with `fan_out` sub directories per level, root first."""
+    dirs = [""]
+    level = [""]
+    for _ in range(depth):
+        level = [
+            os.path.join(parent, f"dir_{index}")
+            for parent in level
+            for index in range(fan_out)
+        ]
+        dirs.extend(level)
+    return dirs
+
+
+def _write_files(args: tuple) -> int:
+    base_path, jobs, file_size = args
+    content = b"\0" * file_size
+    for rel_dir, file_names in jobs:
+        dir_path = os.path.join(base_path, rel_dir)
+        for file_name in file_names:
+            with open(os.path.join(dir_path, file_name), "wb") as sample_file:
+                if content:
+                    sample_file.write(content)
+    return sum(len(file_names) for _, file_names in jobs)
+
+
+def generate_synthetic_tree(
+    base_path: str,
+    file_count: int,
+    fan_out: int = 8,
+    depth: int = 3,
+    extension_mix: dict = None,
+    workers: int = None,
+    seed: int = 0,
+    file_size: int = 0,
+) -> dict:
+    """
+    Creates a synthetic tree below `base_path` with `file_count` files of `file_size` bytes spread
+    evenly over a balanced tree of directories. The result is reproducible for the same parameters and seed.
+
+    Args:
+        base_path (str): The directory to create the tree in. Created if it does not exist.
+        file_count (int): The total number of files.
+        fan_out (int): Number of sub directories per directory.
+        depth (int): Number of directory levels below `base_path`.
+        extension_mix (dict): {extension: weight} of the file extensions. Defaults to DEFAULT_EXTENSION_MIX.
+        workers (int): Number of worker processes writing the files. Defaults to the number of CPUs.
+        seed (int): Seed of the extension choice.
+        file_size (int): Size of every file in bytes. Empty files by default.
+
+    Returns:
+        dict: A summary with the number of created files and directories.
+    """
+    extension_mix = extension_mix or DEFAULT_EXTENSION_MIX
+    extensions = list(extension_mix)
+    weights = [extension_mix[extension] for extension in extensions]
+    rng = random.Random(seed)
+
+    dirs = tree_dirs(fan_out, depth)
+    for rel_dir in dirs:
+        os.makedirs(os.path.join(base_path, rel_dir), exist_ok=True)
+
+    jobs = []
+    files_per_dir, remainder = divmod(file_count, len(dirs))
+    file_index = 0
+    for dir_index, rel_dir in enumerate(dirs):
+        count = files_per_dir + (1 if dir_index < remainder else 0)
+        chosen = rng.choices(extensions, weights, k=count)
+        jobs.append(
+            (
+                rel_dir,
+                [
+                    f"file_{file_index + offset}.{extension}"
+                    for offset, extension in enumerate(chosen)
+                ],
+            )
+        )
+        file_index += count
+
+    workers = workers or os.cpu_count() or 1
+    chunks = [(base_path, jobs[index::workers], file_size) for index in range(workers)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            created = sum(executor.map(_write_files, chunks))
+    else:
+        created = _write_files(chunks[0])
+
+    return {"files": created, "dirs": len(dirs)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic source tree.")
+    parser.add_argument("path", help="Directory to create the tree in.")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--fan-out", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument(
+        "--extension-mix",
+        default=None,
+        help='Extension weights like "jpg:5,pdf:2,doc:1".',
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--file-size", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = generate_synthetic_tree(
+        args.path,
+        args.files,
+        fan_out=args.fan_out,
+        depth=args.depth,
+        extension_mix=(
+            parse_extension_mix(args.extension_mix) if args.extension_mix else None
+        ),
+        workers=args.workers,
+        seed=args.seed,
+        file_size=args.file_size,
+    )
+    print(f"Created {summary['files']} files in {summary['dirs']} directories.")
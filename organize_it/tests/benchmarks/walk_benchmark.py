@@ -0,0 +1,94 @@
+""" Benchmark for the source tree traversal.
+
+Compares the single pass DirectoryWalker with the previous recursive os.walk based
+implementation on synthetic trees of growing size and depth.
+
+Usage:
+    python -m organize_it.tests.benchmarks.walk_benchmark
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from organize_it.bin.walker import DirectoryWalker
+from organize_it.settings import FILES, DIR
+
+FILES_PER_DIR = 50
+SUB_DIRS_PER_DIR = 2
+
+
+def legacy_file_walk(source_path: str, current_dir: str = None) -> dict:
+    """The previous FileManager.file_walk implementation which re-walks every sub tree."""
+    if current_dir is None:
+        current_dir = source_path
+
+    file_dict = {FILES: [], DIR: {}}
+    for dirpath, _, filenames in os.walk(current_dir):
+        rel_dir = os.path.relpath(dirpath, source_path)
+        if dirpath == current_dir:
+            file_dict[FILES] = sorted([os.path.join(rel_dir, f) for f in filenames])
+        elif len(dirpath.split("/")) - 1 == len(current_dir.split("/")):
+            subdir_name = os.path.basename(dirpath)
+            if subdir_name not in file_dict[DIR]:
+                file_dict[DIR][subdir_name] = {
+                    FILES: sorted([os.path.join(rel_dir, f) for f in filenames]),
+                    DIR: legacy_file_walk(source_path, dirpath)[DIR],
+                }
+    return file_dict
+
+
+def generate_tree(base_path: str, depth: int) -> int:
+    """Creates a balanced tree of the given depth and returns the number of created files."""
+    created = 0
+    for i in range(FILES_PER_DIR):
+        with open(os.path.join(base_path, f"file_{i}.jpg"), "w", encoding="utf-8"):
+            pass
+        created += 1
+
+    if depth > 1:
+        for i in range(SUB_DIRS_PER_DIR):
+            sub_path = os.path.join(base_path, f"dir_{i}")
+            os.makedirs(sub_path)
+            created += generate_tree(sub_path, depth - 1)
+    return created
+
+
+def time_walk(walk, repeat: int = 3) -> float:
+    """Returns the best wall clock time of `repeat` runs of `walk`."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        walk()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(depths=(2, 4, 6, 8, 10)):
+    """Runs the benchmark for each depth and prints the time spent per file."""
+    print(
+        f"{'depth':>5} {'files':>8} {'scandir (s)':>12} {'us/file':>8}"
+        f" {'os.walk (s)':>12} {'us/file':>8}"
+    )
+    for depth in depths:
+        base_path = tempfile.mkdtemp(prefix="oit_walk_benchmark_")
+        try:
+            file_count = generate_tree(base_path, depth)
+            walker = DirectoryWalker(base_path)
+
+            assert walker.walk() == legacy_file_walk(base_path)
+
+            new_time = time_walk(walker.walk)
+            legacy_time = time_walk(lambda: legacy_file_walk(base_path))
+            print(
+                f"{depth:>5} {file_count:>8} {new_time:>12.4f}"
+                f" {new_time / file_count * 1e6:>8.2f}"
+                f" {legacy_time:>12.4f} {legacy_time / file_count * 1e6:>8.2f}"
+            )
+        finally:
+            shutil.rmtree(base_path)
+
+
+if __name__ == "__main__":
+    run()
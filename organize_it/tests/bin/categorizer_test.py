@@ -1,7 +1,14 @@
 """ Testing module categorizer """
 
+import io
 import pytest
-from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.categorizer import (
+    Categorizer,
+    LazyCategorizedNode,
+    UNCATEGORIZED,
+)
+from organize_it.bin.tree_structure import TreeStructure
+from organize_it.bin.compact_tree import CompactTree
 from organize_it.settings import (
     FILES,
     DIR,
@@ -85,3 +92,127 @@ class TestCategorizer:
         for name, d in sample_file_names:
             matched_dir = categorizer.check_name_pattern(name)
             assert matched_dir == d
+
+    def test_categorize_batches(self):
+        """Test Categorizer.categorize_batches with a stream of (rel_dir, entries) batches"""
+        test_config = {
+            "rules": [
+                {"format": {"photo": {"types": ["jpg"]}}},
+                {"skip": {DIR: "^ignored$"}},
+                {"names": {"project": {"name_pattern": "project"}}},
+            ]
+        }
+        batches = [
+            (".", ["./a.jpg", "./a-project.doc", "./a.unknown"]),
+            ("sub", ["sub/b.jpg"]),
+            ("sub/ignored", ["sub/ignored/c.jpg"]),
+            ("other", ["other/d.unknown"]),
+        ]
+        categorizer = Categorizer(test_config)
+
+        assert list(categorizer.categorize_batches(batches)) == [
+            (".", {"photo": ["./a.jpg"], "project": ["./a-project.doc"]}),
+            ("sub", {"photo": ["sub/b.jpg"]}),
+        ]
+
+    def test_classify_batch(self):
+        """Test Categorizer.classify_batch maps a batch of names to integer category ids"""
+        categorizer = Categorizer(CONFIG[1])
+        names = [
+            "./dir.jpg",
+            "./dir-image.pdf",
+            "sub/a-project.doc",
+            "./no_extension",
+            "./unknown.xyz",
+            "./archive.zip",
+            "./archive.tar.gz",
+        ]
+
+        category_ids = categorizer.classify_batch(names)
+        assert [
+            (
+                None
+                if category_id == UNCATEGORIZED
+                else categorizer.categories[category_id]
+            )
+            for category_id in category_ids
+        ] == [
+            "photo",
+            "photo_by_name",
+            "project_by_name",
+            None,
+            None,
+            "compressed",
+            "compressed",
+        ]
+        assert [categorizer.categorize_file(name) for name in names] == [
+            "photo",
+            "photo_by_name",
+            "project_by_name",
+            None,
+            None,
+            "compressed",
+            "compressed",
+        ]
+        assert categorizer.group_by_category(names) == {
+            "photo": ["./dir.jpg"],
+            "photo_by_name": ["./dir-image.pdf"],
+            "project_by_name": ["sub/a-project.doc"],
+            "compressed": ["./archive.zip", "./archive.tar.gz"],
+        }
+        # Extensions are case sensitive unless case folding is enabled.
+        assert Categorizer(CONFIG[1]).categorize_file("./IMG.JPG") is None
+        assert (
+            Categorizer(CONFIG[1], ignore_case=True).categorize_file("./IMG.JPG")
+            == "photo"
+        )
+
+    def test_categorize_dict_parallel(self):
+        """Test that the process pool categorization is identical to the serial one, including the key order."""
+        categorizer = Categorizer(CONFIG[1])
+        serial = categorizer.categorize_dict(UNCATEGORIZED_DIR_DICTIONARY, True)
+
+        for partition_depth in (1, 2, 5):
+            parallel = categorizer.categorize_dict(
+                UNCATEGORIZED_DIR_DICTIONARY,
+                True,
+                workers=2,
+                partition_depth=partition_depth,
+            )
+            assert parallel == serial
+            assert repr(parallel) == repr(serial)
+
+        assert categorizer.categorize_dict(
+            CompactTree.from_dict(UNCATEGORIZED_DIR_DICTIONARY), True, workers=2
+        ) == categorizer.categorize_dict(
+            CompactTree.from_dict(UNCATEGORIZED_DIR_DICTIONARY), True
+        )
+
+    def test_categorize_dict_lazy(self):
+        """Test that the lazy view categorizes directories only when accessed and renders like the dict."""
+        categorizer = Categorizer(CONFIG[1])
+        serial = categorizer.categorize_dict(UNCATEGORIZED_DIR_DICTIONARY, True)
+        lazy = categorizer.categorize_dict(
+            UNCATEGORIZED_DIR_DICTIONARY, True, lazy=True
+        )
+
+        subdir_names = [
+            name
+            for name, node in lazy[DIR].items()
+            if isinstance(node, LazyCategorizedNode)
+        ]
+        assert subdir_names
+        assert all(lazy[DIR][name]._level is None for name in subdir_names)
+        assert list(lazy[DIR]) == list(serial[DIR])
+
+        lazy_tree, serial_tree = io.StringIO(), io.StringIO()
+        TreeStructure().generate_tree_structure(lazy, "", lazy_tree)
+        TreeStructure().generate_tree_structure(serial, "", serial_tree)
+        assert lazy_tree.getvalue() == serial_tree.getvalue()
+        assert lazy.to_dict() == serial
+
+        preview = categorizer.categorize_dict(
+            UNCATEGORIZED_DIR_DICTIONARY, True, lazy=True
+        )
+        TreeStructure().generate_tree_structure(preview, "", io.StringIO(), max_depth=0)
+        assert all(preview[DIR][name]._level is None for name in subdir_names)
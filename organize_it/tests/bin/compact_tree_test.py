@@ -0,0 +1,106 @@
+""" Testing module compact_tree """
+
+import io
+import os
+import json
+import pytest
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.compact_tree import CompactTree
+from organize_it.bin.file_manager import FileManager
+from organize_it.bin.tree_structure import TreeStructure
+from organize_it.bin.walker import DirectoryWalker
+from organize_it.settings import (
+    FILES,
+    DIR,
+    SKIPPED,
+    TEST_FIXTURES_CONFIGS as CONFIG,
+)
+from organize_it.tests._fixtures.directory_structure_fixtures import (
+    UNCATEGORIZED_DIR_DICTIONARY,
+    UNCATEGORIZED_DIR_PATH,
+    CATEGORIZED_DIR_DICTIONARY,
+)
+from organize_it.tests.test_utils import dicts_are_equal
+
+
+@pytest.mark.usefixtures("test_setup")
+class TestCompactTree:
+    """Main testing class for CompactTree Class"""
+
+    def test_from_dict_and_to_dict(self):
+        """Test that a legacy dictionary survives the conversion to a CompactTree and back."""
+        tree = CompactTree.from_dict(UNCATEGORIZED_DIR_DICTIONARY)
+
+        assert len(tree) == 25
+        assert tree.node_count == 5
+        assert tree.to_dict() == UNCATEGORIZED_DIR_DICTIONARY
+        # Path components are interned, e.g. "subDir1" is stored once.
+        assert tree.names.count("subDir1") == 1
+
+        # Files of a categorized tree keep their source directory.
+        categorized_tree = CompactTree.from_dict({DIR: CATEGORIZED_DIR_DICTIONARY})
+        assert categorized_tree.to_dict()[DIR] == CATEGORIZED_DIR_DICTIONARY
+
+    def test_root_view(self):
+        """Test the mapping view of a CompactTree behaves like the legacy dictionary."""
+        tree = CompactTree.from_dict(
+            {
+                FILES: ["./a.jpg"],
+                SKIPPED: [".git"],
+                DIR: {"sub": {FILES: ["sub/b.jpg"], DIR: {}}},
+            }
+        )
+        root = tree.root()
+
+        assert root[FILES] == ["./a.jpg"]
+        assert root[SKIPPED] == [".git"]
+        assert "sub" in root[DIR]
+        assert root[DIR]["sub"][FILES] == ["sub/b.jpg"]
+        assert SKIPPED not in root[DIR]["sub"]
+        with pytest.raises(KeyError):
+            _ = root[DIR]["missing"]
+
+    def test_walk_compact(self):
+        """Test DirectoryWalker.walk_compact returns the same tree as DirectoryWalker.walk."""
+        walker = DirectoryWalker(UNCATEGORIZED_DIR_PATH)
+
+        assert json.dumps(walker.walk_compact().to_dict()) == json.dumps(walker.walk())
+        sub_dir_path = os.path.join(UNCATEGORIZED_DIR_PATH, "subDir1")
+        assert json.dumps(walker.walk_compact(sub_dir_path).to_dict()) == json.dumps(
+            walker.walk(sub_dir_path)
+        )
+
+    def test_consumers(self, tmp_path):
+        """Test that Categorizer, TreeStructure and FileManager operate on a CompactTree directly."""
+        compact_tree = CompactTree.from_dict(UNCATEGORIZED_DIR_DICTIONARY)
+        categorizer = Categorizer(CONFIG[1])
+
+        categorized_tree_dict = categorizer.categorize_dict(compact_tree, True)
+        assert categorized_tree_dict == categorizer.categorize_dict(
+            UNCATEGORIZED_DIR_DICTIONARY, True
+        )
+
+        tree_structure = TreeStructure()
+        compact_tree_file = io.StringIO()
+        dict_tree_file = io.StringIO()
+        walker = DirectoryWalker(UNCATEGORIZED_DIR_PATH)
+        tree_structure.generate_tree_structure(
+            walker.walk_compact(), "", compact_tree_file
+        )
+        tree_structure.generate_tree_structure(walker.walk(), "", dict_tree_file)
+        assert compact_tree_file.getvalue() == dict_tree_file.getvalue()
+
+        manager = FileManager(UNCATEGORIZED_DIR_PATH, str(tmp_path))
+        manager.categorize_and_sort_file(
+            config=CONFIG[1],
+            sorted_tree_dict=CompactTree.from_dict({DIR: CATEGORIZED_DIR_DICTIONARY}),
+        )
+        assert dicts_are_equal(
+            FileManager(str(tmp_path), "").file_walk(),
+            FileManager(str(tmp_path), "").file_walk_compact().to_dict(),
+        )
+        assert sorted(os.listdir(tmp_path / "subDir2" / "document")) == [
+            "subDir2.doc",
+            "subDir2.pdf",
+        ]
@@ -0,0 +1,90 @@
+""" Testing module compiled_config """
+
+import os
+import sys
+import json
+import shutil
+import subprocess
+from unittest import mock
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.compiled_config import CompiledConfig
+from organize_it.settings import TEST_FIXTURES_DIR, load_yaml
+
+
+class TestCompiledConfig:
+    """Main testing class for CompiledConfig Class"""
+
+    def test_load_skips_parsing_and_validation(self, tmp_path):
+        """Test that the second load comes from the artifact and that a changed file is compiled again."""
+        config_path = str(tmp_path / "config.yaml")
+        shutil.copy(os.path.join(TEST_FIXTURES_DIR, "config_pass.yaml"), config_path)
+        cache_dir = str(tmp_path)
+
+        compiled = CompiledConfig.load(config_path, cache_dir=cache_dir)
+        assert compiled.validated is True
+        assert dict(compiled) == load_yaml(None, config_path)
+
+        with mock.patch(
+            "organize_it.bin.compiled_config.yaml.full_load", side_effect=AssertionError
+        ), mock.patch(
+            "organize_it.bin.compiled_config.JSONSchemaValidator",
+            side_effect=AssertionError,
+        ):
+            loaded = CompiledConfig.load(config_path, cache_dir=cache_dir)
+        assert loaded == compiled
+        assert loaded.config_hash == compiled.config_hash
+        assert loaded.validated is True
+
+        # The artifact is plain json data, an unreadable one is compiled again.
+        artifact_path = os.path.join(
+            cache_dir, f".compiled_config_{compiled.config_hash}.json"
+        )
+        with open(artifact_path, "r", encoding="utf-8") as artifact_file:
+            assert json.load(artifact_file) == {
+                "config": dict(compiled),
+                "validated": True,
+            }
+        with open(artifact_path, "w", encoding="utf-8") as artifact_file:
+            artifact_file.write("{broken")
+        assert CompiledConfig.load(config_path, cache_dir=cache_dir) == compiled
+
+        with open(config_path, "a", encoding="utf-8") as config_file:
+            config_file.write("\n# changed\n")
+        assert CompiledConfig.load(config_path, cache_dir=cache_dir).config_hash != (
+            compiled.config_hash
+        )
+
+    def test_categorizer_reuses_compiled_rules(self, tmp_path):
+        """Test that a Categorizer of a compiled config shares the compiled rules but not the mutable tables."""
+        compiled = CompiledConfig.load(
+            os.path.join(TEST_FIXTURES_DIR, "config_pass.yaml"), cache_dir=str(tmp_path)
+        )
+        names = ["./a.jpg", "./b.tar.gz", "./c-project.doc", "./d.xyz", "./e"]
+
+        categorizer = Categorizer(compiled)
+        assert (
+            categorizer.extension_trie is compiled.compiled_categorizer.extension_trie
+        )
+        assert (
+            categorizer.classify_batch(names).tolist()
+            == Categorizer(dict(compiled)).classify_batch(names).tolist()
+        )
+
+        categorizer.category_id("new_category")
+        assert "new_category" not in compiled.compiled_categorizer.categories
+        assert Categorizer(compiled, ignore_case=True).extension_trie.ignore_case
+
+    def test_settings_parse_no_yaml_on_import(self):
+        """Test that importing the tool parses no YAML and that the configs are loaded on first access."""
+        script = (
+            "import organize_it.settings as settings, organize_it.__main__\n"
+            "assert 'CONFIG' not in vars(settings)\n"
+            "assert 'TEST_FIXTURES_CONFIGS' not in vars(settings)\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True)
+
+        from organize_it import settings  # pylint: disable=import-outside-toplevel
+
+        assert settings.TEST_FIXTURES_CONFIGS is settings.TEST_FIXTURES_CONFIGS
+        assert "TEST_FIXTURES_CONFIGS" in vars(settings)
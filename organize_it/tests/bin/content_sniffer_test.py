@@ -0,0 +1,71 @@
+""" Testing module content_sniffer """
+
+import os
+import pickle
+from unittest import mock
+
+from organize_it.bin.categorizer import Categorizer, UNCATEGORIZED
+from organize_it.bin.content_sniffer import ContentSniffer, detect_extension
+from organize_it.settings import TEST_FIXTURES_CONFIGS as CONFIG
+
+
+def write_file(base_path, rel_path, content: bytes):
+    """Writes `content` to the file at `rel_path` below `base_path`."""
+    with open(os.path.join(base_path, rel_path), "wb") as sample_file:
+        sample_file.write(content)
+
+
+class TestContentSniffer:
+    """Main testing class for ContentSniffer Class"""
+
+    def test_detect_extension(self):
+        """Test the magic byte signatures, including the ones at an offset."""
+        assert detect_extension(b"\xff\xd8\xff\xe0\x00\x10JFIF") == "jpg"
+        assert detect_extension(b"%PDF-1.7\n") == "pdf"
+        assert detect_extension(b"\x00\x00\x00\x18ftypmp42") == "mp4"
+        assert detect_extension(b"\x00" * 257 + b"ustar\x0000") == "tar"
+        assert detect_extension(b"plain text") is None
+        assert detect_extension(b"") is None
+
+    def test_categorizer_sniffs_unmatched_files(self, tmp_path):
+        """Test that only files no rule matched are read and that the files with recorded stamps are cached."""
+        base_path = str(tmp_path)
+        write_file(base_path, "scan", b"%PDF-1.4\n" + b"x" * 4096)
+        write_file(base_path, "holiday.dat", b"\x89PNG\r\n\x1a\n")
+        write_file(base_path, "notes", b"just text")
+        # Mislabeled, but classified by its extension, so it is never read.
+        write_file(base_path, "photo.pdf", b"\xff\xd8\xff")
+
+        sniffer = ContentSniffer(base_path, workers=2, read_size=16)
+        categorizer = Categorizer(CONFIG[1], content_sniffer=sniffer)
+        names = ["./scan", "./holiday.dat", "./notes", "./photo.pdf", "./gone"]
+        stamps = [(4105, 1), (8, 1), (9, 1), (3, 1), None]
+        # The recorded stamps are the cache keys, the sniffer never stats a file.
+        with mock.patch(
+            "organize_it.bin.content_sniffer.os.stat", side_effect=AssertionError
+        ):
+            classified = categorizer.classify_batch(names, stamps)
+            executor = sniffer._executor
+
+            assert classified.tolist() == [
+                categorizer.category_id("document"),
+                categorizer.category_id("photo"),
+                UNCATEGORIZED,
+                categorizer.category_id("document"),
+                UNCATEGORIZED,
+            ]
+            assert sniffer.files_read == 3
+
+            categorizer.classify_batch(names, stamps)
+            assert sniffer.files_read == 3
+            # A changed stamp and a file without stamp are read again.
+            categorizer.classify_batch(names, [(4105, 2), (8, 1), None, (3, 1), None])
+            assert sniffer.files_read == 5
+
+        # All batches share one pool, which is not sent along with a pickled sniffer.
+        assert executor is not None and sniffer._executor is executor
+        assert pickle.loads(pickle.dumps(sniffer))._executor is None
+        sniffer.close()
+        assert sniffer._executor is None
+        assert sniffer.sniff_batch(["./scan", "./notes"]) == ["pdf", None]
+        sniffer.close()
@@ -0,0 +1,96 @@
+""" Testing module copy_backend """
+
+import os
+import errno
+import pytest
+
+from organize_it.bin import copy_backend
+from organize_it.bin.copy_backend import (
+    CopyBackend,
+    available_backends,
+    REFLINK,
+    COPY_FILE_RANGE,
+    BUFFERED,
+)
+
+
+class TestCopyBackend:
+    """Main testing class for CopyBackend Class"""
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_backends_copy_content_and_mode(self, tmp_path, backend):
+        """Test that every backend of the platform, or its fallback, copies the content and the permission bits."""
+        source_file = tmp_path / "video.mp4"
+        content = os.urandom(3 * copy_backend.BUFFER_SIZE + 7)
+        source_file.write_bytes(content)
+        source_file.chmod(0o640)
+        dest_file = tmp_path / "copy.mp4"
+        dest_file.write_bytes(b"replaced")
+
+        used = CopyBackend((backend,)).copy_file(str(source_file), str(dest_file))
+
+        assert used in (backend, BUFFERED)
+        assert dest_file.read_bytes() == content
+        assert dest_file.stat().st_mode & 0o777 == 0o640
+
+    def test_probe_once_per_device_pair(self, tmp_path, monkeypatch):
+        """Test that an unsupported backend is tried once per device pair and that other errors are raised."""
+        calls = []
+
+        def unsupported(*_):
+            calls.append(1)
+            raise OSError(errno.EOPNOTSUPP, "not supported")
+
+        monkeypatch.setitem(copy_backend.BACKEND_FUNCTIONS, REFLINK, unsupported)
+        backend = CopyBackend((REFLINK, BUFFERED))
+        for file_name in ("a.mkv", "b.mkv"):
+            (tmp_path / file_name).write_bytes(file_name.encode())
+            assert (
+                backend.copy_file(
+                    str(tmp_path / file_name), str(tmp_path / f"copy_{file_name}")
+                )
+                == BUFFERED
+            )
+            assert (tmp_path / f"copy_{file_name}").read_bytes() == file_name.encode()
+
+        dev = os.stat(tmp_path).st_dev
+        assert len(calls) == 1
+        assert backend.pair_backend(dev, dev) == BUFFERED
+        assert backend.counts == {BUFFERED: 2}
+
+        def no_space(*_):
+            raise OSError(errno.ENOSPC, "no space left")
+
+        monkeypatch.setitem(copy_backend.BACKEND_FUNCTIONS, REFLINK, no_space)
+        with pytest.raises(OSError):
+            CopyBackend((REFLINK, BUFFERED)).copy_file(
+                str(tmp_path / "a.mkv"), str(tmp_path / "c.mkv")
+            )
+
+    def test_empty_and_short_copies_fall_back(self, tmp_path, monkeypatch):
+        """Test that a kernel copy returning 0 right away or copying too little falls back instead of succeeding."""
+        source_file = tmp_path / "video.mp4"
+        source_file.write_bytes(b"x" * 4096)
+        monkeypatch.setattr(os, "copy_file_range", lambda *_: 0, raising=False)
+        monkeypatch.setitem(
+            copy_backend.BACKEND_FUNCTIONS,
+            REFLINK,
+            lambda src_fd, dst_fd, _: os.write(dst_fd, os.read(src_fd, 100)),
+        )
+
+        for backends in ((COPY_FILE_RANGE, BUFFERED), (REFLINK, BUFFERED)):
+            dest_file = tmp_path / "copy.mp4"
+            assert (
+                CopyBackend(backends).copy_file(str(source_file), str(dest_file))
+                == BUFFERED
+            )
+            assert dest_file.read_bytes() == b"x" * 4096
+
+        # An empty file is a valid result of copy_file_range.
+        (tmp_path / "empty").write_bytes(b"")
+        assert (
+            CopyBackend((COPY_FILE_RANGE,)).copy_file(
+                str(tmp_path / "empty"), str(tmp_path / "empty_copy")
+            )
+            == COPY_FILE_RANGE
+        )
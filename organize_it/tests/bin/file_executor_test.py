@@ -0,0 +1,117 @@
+""" Testing module file_executor """
+
+import os
+import pytest
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.file_executor import FileOperationExecutor
+from organize_it.bin.file_manager import FileManager
+from organize_it.tests._fixtures.directory_structure_fixtures import (
+    UNCATEGORIZED_DIR_PATH,
+)
+from organize_it.settings import DIR, TEST_FIXTURES_CONFIGS as CONFIG
+from organize_it.tests.test_utils import relative_files
+
+
+@pytest.mark.usefixtures("test_setup")
+class TestFileOperationExecutor:
+    """Main testing class for FileOperationExecutor Class"""
+
+    def test_same_layout_as_serial(self, tmp_path):
+        """Test that the concurrent copy produces the same destination layout as the serial one."""
+        categorized_tree_dict = Categorizer(CONFIG[1]).categorize_dict(
+            FileManager(UNCATEGORIZED_DIR_PATH, "").file_walk_compact(), True
+        )
+
+        for io_workers in (1, 4):
+            FileManager(
+                UNCATEGORIZED_DIR_PATH, str(tmp_path / f"dest_{io_workers}")
+            ).categorize_and_sort_file(
+                config=CONFIG[1],
+                sorted_tree_dict=categorized_tree_dict[DIR],
+                io_workers=io_workers,
+            )
+
+        serial_files = relative_files(tmp_path / "dest_1")
+        assert len(serial_files) == 25
+        assert relative_files(tmp_path / "dest_4") == serial_files
+
+    def test_errors_are_aggregated(self, tmp_path):
+        """Test that a failed operation does not stop the others and is reported on close."""
+        source_path = tmp_path / "source"
+        source_path.mkdir()
+        for file_name in ("a.jpg", "b.jpg"):
+            (source_path / file_name).write_bytes(b"x")
+
+        with FileOperationExecutor(workers=2, queue_size=1) as executor:
+            for file_name in ("a.jpg", "missing.jpg", "b.jpg"):
+                executor.submit(
+                    str(source_path / file_name), str(tmp_path / "dest" / "photo")
+                )
+
+        assert executor.files == 2
+        assert [os.path.basename(error[0]) for error in executor.errors] == [
+            "missing.jpg"
+        ]
+        assert sorted(os.listdir(tmp_path / "dest" / "photo")) == ["a.jpg", "b.jpg"]
+
+    def test_moves_are_grouped_by_device(self, tmp_path):
+        """Test that moves within a device are renamed, the others copied and unlinked, and that nothing is replaced."""
+        source_path = tmp_path / "source"
+        source_path.mkdir()
+        for file_name in ("a.jpg", "b.jpg", "c.jpg"):
+            (source_path / file_name).write_bytes(file_name.encode())
+        dest_path = tmp_path / "dest" / "photo"
+        dest_path.mkdir(parents=True)
+        (dest_path / "c.jpg").write_bytes(b"kept")
+        same_dev = os.stat(source_path).st_dev
+
+        with FileOperationExecutor(workers=2, move_files=True) as executor:
+            executor.submit(str(source_path / "a.jpg"), str(dest_path), same_dev)
+            # A different recorded device takes the copy and unlink path.
+            executor.submit(str(source_path / "b.jpg"), str(dest_path), same_dev + 1)
+            executor.submit(str(source_path / "c.jpg"), str(dest_path), same_dev)
+
+        assert sorted(os.listdir(source_path)) == ["c.jpg"]
+        assert (dest_path / "b.jpg").read_bytes() == b"b.jpg"
+        assert (dest_path / "c.jpg").read_bytes() == b"kept"
+        assert [os.path.basename(error[0]) for error in executor.errors] == ["c.jpg"]
+        assert [
+            (group["strategy"], group["source_dev"], group["files"])
+            for group in executor.group_summary()
+        ] == [("copy+unlink", same_dev + 1, 1), ("rename", same_dev, 1)]
+
+    @pytest.mark.parametrize("link_mode", ["hard", "sym"])
+    def test_link_mode(self, tmp_path, link_mode):
+        """Test that the destination tree is built out of links to the source files and that hard links across devices are copied."""
+        categorized_tree_dict = Categorizer(CONFIG[1]).categorize_dict(
+            FileManager(UNCATEGORIZED_DIR_PATH, "").file_walk_compact(), True
+        )
+        FileManager(
+            UNCATEGORIZED_DIR_PATH, str(tmp_path / "copy")
+        ).categorize_and_sort_file(
+            config=CONFIG[1], sorted_tree_dict=categorized_tree_dict[DIR]
+        )
+        dest_path = tmp_path / "links"
+        FileManager(UNCATEGORIZED_DIR_PATH, str(dest_path)).categorize_and_sort_file(
+            config=CONFIG[1],
+            sorted_tree_dict=categorized_tree_dict[DIR],
+            link_mode=link_mode,
+        )
+
+        assert relative_files(dest_path) == relative_files(tmp_path / "copy")
+        for rel_path in relative_files(dest_path):
+            dest_file_path = dest_path / rel_path
+            if link_mode == "sym":
+                assert os.path.islink(dest_file_path)
+                assert os.path.isabs(os.readlink(dest_file_path))
+            else:
+                assert os.stat(dest_file_path).st_nlink > 1
+
+        source_file = tmp_path / "a.mkv"
+        source_file.write_bytes(b"x")
+        source_dev = os.stat(source_file).st_dev
+        with FileOperationExecutor(link_mode="hard") as executor:
+            executor.submit(str(source_file), str(tmp_path / "video"), source_dev + 1)
+        assert os.stat(tmp_path / "video" / "a.mkv").st_nlink == 1
+        assert [group["strategy"] for group in executor.group_summary()] == ["copy"]
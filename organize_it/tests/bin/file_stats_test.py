@@ -0,0 +1,150 @@
+""" Testing module file_stats """
+
+import os
+import stat
+import pytest
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.file_manager import FileManager
+from organize_it.bin.tree_snapshot import TreeSnapshot, write_snapshot
+from organize_it.bin.walker import DirectoryWalker
+from organize_it.bin.watcher import FolderWatcher, PollingWatcher
+from organize_it.bin.subroutines import categorize_and_sort_streaming
+from organize_it.settings import DIR, FILES, TEST_FIXTURES_CONFIGS as CONFIG
+from organize_it.tests.test_utils import generate_samples_with_config
+
+
+# A small tree with files of different sizes.
+SAMPLE_STRUCTURE = {FILES: ["b.jpg", "a.pdf"], DIR: {"sub": {FILES: ["c.doc"]}}}
+SAMPLE_SIZES = {"b.jpg": 3, "a.pdf": 10, "c.doc": 7}
+
+
+class TestFileStats:
+    """Main testing class for FileStats Class"""
+
+    def test_walk_records_stats(self, tmp_path):
+        """Test that the serial and the parallel walk record the same stats in file table order."""
+        generate_samples_with_config(str(tmp_path), SAMPLE_STRUCTURE, SAMPLE_SIZES)
+
+        tree = DirectoryWalker(str(tmp_path)).walk_compact(record_stats=True)
+        paths = dict(tree.iter_file_paths())
+        assert [tree.stats.size[index] for index in sorted(paths)] == [10, 3, 7]
+        assert paths[0] == "./a.pdf"
+
+        file_stat = os.stat(tmp_path / "sub" / "c.doc")
+        row = tree.stats.row(2)
+        assert (row.ino, row.dev, row.mtime_ns) == (
+            file_stat.st_ino,
+            file_stat.st_dev,
+            file_stat.st_mtime_ns,
+        )
+        assert stat.S_ISREG(row.mode)
+        assert tree.stats.total_size() == 20
+        assert tree.stats.exists(0) and tree.stats.is_writable(0)
+
+        parallel_tree = DirectoryWalker(str(tmp_path), workers=3).walk_compact(
+            record_stats=True
+        )
+        assert list(parallel_tree.stats.size) == list(tree.stats.size)
+        assert list(parallel_tree.stats.ino) == list(tree.stats.ino)
+
+    def test_snapshot_keeps_stats(self, tmp_path):
+        """Test that the stats are saved in and mapped from the binary snapshot."""
+        source_path = tmp_path / "source"
+        generate_samples_with_config(str(source_path), SAMPLE_STRUCTURE, SAMPLE_SIZES)
+        tree = DirectoryWalker(str(source_path)).walk_compact(record_stats=True)
+        write_snapshot(tree, str(tmp_path / "source.snapshot"))
+
+        with TreeSnapshot(str(tmp_path / "source.snapshot")) as snapshot:
+            assert [snapshot.stats.row(index) for index in range(3)] == [
+                tree.stats.row(index) for index in range(3)
+            ]
+
+    def test_sort_without_file_system_checks(self, tmp_path, monkeypatch, caplog):
+        """Test that categorize_and_sort_file validates the files from the recorded stats."""
+        source_path = tmp_path / "source"
+        generate_samples_with_config(str(source_path), SAMPLE_STRUCTURE, SAMPLE_SIZES)
+        manager = FileManager(str(source_path), str(tmp_path / "dest"))
+        source_tree = manager.file_walk_compact(record_stats=True)
+        categorized_tree_dict = Categorizer(CONFIG[1]).categorize_dict(
+            source_tree, True
+        )
+
+        def fail_access(*_):
+            raise AssertionError("The source files should not be checked again.")
+
+        monkeypatch.setattr(os, "access", fail_access)
+        manager.categorize_and_sort_file(
+            config=CONFIG[1],
+            sorted_tree_dict=categorized_tree_dict[DIR],
+            source_tree=source_tree,
+        )
+        assert sorted(os.listdir(tmp_path / "dest" / "document")) == ["a.pdf"]
+        assert " - Organizing 3 walked files." in caplog.text
+        assert " - Total size of the walked files: 20 bytes." in caplog.text
+
+        # Files which could not be stat'ed are rejected just like with the file system check.
+        source_tree.stats.mode[0] = 0
+        with pytest.raises(SystemExit):
+            manager.categorize_and_sort_file(
+                config=CONFIG[1],
+                sorted_tree_dict=categorized_tree_dict[DIR],
+                source_tree=source_tree,
+            )
+
+    def test_size_and_age_rules(self, tmp_path):
+        """Test that the size and age rules use the stats of the walk and win over the name and format rules."""
+        base_path = str(tmp_path)
+        generate_samples_with_config(base_path, SAMPLE_STRUCTURE, SAMPLE_SIZES)
+        day_ns = 86_400 * 10**9
+        old_mtime_ns = os.stat(base_path).st_mtime_ns - 400 * day_ns
+        os.utime(os.path.join(base_path, "sub/c.doc"), ns=(old_mtime_ns, old_mtime_ns))
+
+        config = dict(CONFIG[1])
+        config["rules"] = CONFIG[1]["rules"] + [
+            {"size": {"large": {"min_size": 10}, "huge": {"min_size": "1KB"}}},
+            {"age": {"archive": {"min_days": 180}}},
+        ]
+        categorizer = Categorizer(config)
+        tree = FileManager(base_path, "").file_walk_compact(record_stats=True)
+
+        categorized_tree_dict = categorizer.categorize_dict(tree, True)
+        assert categorized_tree_dict[DIR]["large"][FILES] == ["./a.pdf"]
+        assert categorized_tree_dict[DIR]["photo"][FILES] == ["./b.jpg"]
+        assert categorized_tree_dict[DIR]["sub"][DIR]["archive"][FILES] == ["sub/c.doc"]
+        assert (
+            categorizer.categorize_dict(tree, True, workers=2) == categorized_tree_dict
+        )
+
+        # Without stats the size and age rules are not evaluated and nothing is stat'ed.
+        assert "large" not in categorizer.categorize_dict(tree.to_dict(), True)[DIR]
+
+    def test_stream_and_watch_apply_size_rules(self, tmp_path):
+        """Test that the size rules are applied to the streamed and to the watched files."""
+        config = dict(CONFIG[1])
+        config["rules"] = CONFIG[1]["rules"] + [{"size": {"large": {"min_size": 10}}}]
+
+        source_path = str(tmp_path / "source")
+        generate_samples_with_config(source_path, SAMPLE_STRUCTURE, SAMPLE_SIZES)
+        categorize_and_sort_streaming(
+            source_directory=source_path,
+            destination_directory=str(tmp_path / "stream"),
+            config=config,
+        )
+        assert os.listdir(tmp_path / "stream" / "large") == ["a.pdf"]
+        assert os.listdir(tmp_path / "stream" / "photo") == ["b.jpg"]
+
+        folder_watcher = FolderWatcher(
+            file_manager=FileManager(source_path, str(tmp_path / "watch")),
+            categorizer=Categorizer(config),
+            debounce=0,
+            watcher=PollingWatcher(source_path, interval=0),
+        )
+        with open(os.path.join(source_path, "new.pdf"), "wb") as new_file:
+            new_file.write(b"x" * 10)
+        with open(os.path.join(source_path, "new.jpg"), "wb") as new_file:
+            new_file.write(b"x" * 3)
+
+        assert folder_watcher.process_events(timeout=0) == 2
+        assert os.listdir(tmp_path / "watch" / "large") == ["new.pdf"]
+        assert os.listdir(tmp_path / "watch" / "photo") == ["new.jpg"]
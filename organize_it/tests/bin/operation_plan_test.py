@@ -0,0 +1,75 @@
+""" Testing module operation_plan """
+
+import os
+import json
+import pytest
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.file_manager import FileManager
+from organize_it.bin.operation_plan import (
+    OperationPlan,
+    CONFLICT,
+    MKDIR,
+    OPERATION,
+    EXISTS,
+)
+from organize_it.tests._fixtures.directory_structure_fixtures import (
+    UNCATEGORIZED_DIR_PATH,
+)
+from organize_it.settings import DIR, TEST_FIXTURES_CONFIGS as CONFIG
+from organize_it.tests.test_utils import relative_files
+
+
+@pytest.mark.usefixtures("test_setup")
+class TestOperationPlan:
+    """Main testing class for OperationPlan Class"""
+
+    def test_plan_and_execute(self, tmp_path, monkeypatch):
+        """Test that a saved plan is reviewable and executes to the same layout as the direct file operations."""
+        file_manager = FileManager(UNCATEGORIZED_DIR_PATH, str(tmp_path / "planned"))
+        source_tree = file_manager.file_walk_compact(record_stats=True)
+        categorized_tree_dict = Categorizer(CONFIG[1]).categorize_dict(
+            source_tree, True
+        )
+        FileManager(
+            UNCATEGORIZED_DIR_PATH, str(tmp_path / "direct")
+        ).categorize_and_sort_file(
+            config=CONFIG[1], sorted_tree_dict=categorized_tree_dict[DIR]
+        )
+
+        plan = OperationPlan.compile(
+            file_manager, CONFIG[1], categorized_tree_dict[DIR], source_tree=source_tree
+        )
+        plan_path = str(tmp_path / "plan.ndjson")
+        plan.save(plan_path)
+
+        # Nothing is written to the destination while planning.
+        assert not os.path.exists(tmp_path / "planned")
+        with open(plan_path, encoding="utf-8") as plan_file:
+            records = [json.loads(line) for line in plan_file]
+        assert records[0]["operation"] == "copy"
+        assert [record["type"] for record in records[1:]] == sorted(
+            (record["type"] for record in records[1:]),
+            key=[MKDIR, CONFLICT, OPERATION].index,
+        )
+        loaded = OperationPlan.load(plan_path)
+        assert loaded.operations == plan.operations
+        assert loaded.mkdirs == plan.mkdirs
+        assert len(plan.operations) == 25
+        assert all(dev is not None for _, _, dev in plan.operations)
+
+        def no_walk(*_):
+            raise AssertionError("The source should not be walked again.")
+
+        monkeypatch.setattr(FileManager, "file_walk_compact", no_walk)
+        assert OperationPlan.execute(plan_path, io_workers=2) == 25
+        assert relative_files(tmp_path / "planned") == relative_files(
+            tmp_path / "direct"
+        )
+
+        # Planning again reports the files which now exist in the destination.
+        replanned = OperationPlan.compile(
+            file_manager, CONFIG[1], categorized_tree_dict[DIR], source_tree=source_tree
+        )
+        assert len(replanned.conflicts) == 25
+        assert {reason for _, reason in replanned.conflicts} == {EXISTS}
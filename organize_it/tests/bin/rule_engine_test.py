@@ -0,0 +1,180 @@
+""" Testing module rule_engine """
+
+import re
+import random
+
+import pytest
+
+from organize_it.bin.rule_engine import (
+    NameRuleMatcher,
+    ExtensionTrie,
+    ThresholdRuleMatcher,
+    parse_size,
+)
+
+
+def naive_match(name_rules: dict, file_name: str):
+    """The previous Categorizer.check_name_pattern. Every rule is searched and the last match wins."""
+    matched = [
+        dir_name
+        for dir_name in name_rules
+        if re.search(name_rules[dir_name]["name_pattern"], file_name)
+    ]
+    return matched[-1] if matched else None
+
+
+class TestNameRuleMatcher:
+    """Main testing class for NameRuleMatcher Class"""
+
+    def test_last_rule_wins(self):
+        """Test that the combined matcher keeps the last rule wins semantics of the config order."""
+        name_rules = {
+            "photo_by_name": {"name_pattern": "image|pic$"},
+            "project_by_name": {"name_pattern": "project"},
+            "dir1": {"name_pattern": "^dir1"},
+            "any_doc": {"name_pattern": r"\.doc$"},
+        }
+        matcher = NameRuleMatcher(name_rules)
+        assert matcher.combined_pattern is not None
+
+        assert matcher.match("dir1-image.jpg") == "dir1"
+        assert matcher.match("sub/dir1-image.jpg") == "photo_by_name"
+        assert matcher.match("./a-project.doc") == "any_doc"
+        assert matcher.match("./a-project.pdf") == "project_by_name"
+        assert matcher.match("./nothing.txt") is None
+        assert NameRuleMatcher({}).match("./a.jpg") is None
+
+    def test_fallback(self):
+        """Test that patterns with groups or global flags are matched one by one with the same result."""
+        name_rules = {
+            "double": {"name_pattern": r"(\w)\1"},
+            "upper": {"name_pattern": "(?i)^REPORT"},
+        }
+        matcher = NameRuleMatcher(name_rules)
+        assert matcher.combined_pattern is None
+
+        assert matcher.match("report-aa.pdf") == "upper"
+        assert matcher.match("book.pdf") == "double"
+        assert matcher.match("abc.pdf") is None
+
+    def test_global_flags_fall_back(self):
+        """Test that global inline flags are detected up front, scoped flags are combined."""
+        for pattern in ["(?i)^report", "(?s)a.b", "(?x) ^ a b", "(?a)^\\w+$"]:
+            matcher = NameRuleMatcher(
+                {"flagged": {"name_pattern": pattern}, "plain": {"name_pattern": "^z"}}
+            )
+            assert matcher.combined_pattern is None
+
+        name_rules = {
+            "upper": {"name_pattern": "(?i:^report)"},
+            "plain": {"name_pattern": "^REPORT-z"},
+        }
+        matcher = NameRuleMatcher(name_rules)
+        assert matcher.combined_pattern is not None
+        assert matcher.match("Report.pdf") == "upper"
+        assert matcher.match("REPORT-z.pdf") == "plain"
+        assert matcher.match("report-Z.pdf") == "upper"
+
+    def test_equivalence(self):
+        """Test the combined matcher against the naive evaluation on random names."""
+        name_rules = {
+            "a": {"name_pattern": "ab"},
+            "b": {"name_pattern": "^b"},
+            "c": {"name_pattern": "c$"},
+            "d": {"name_pattern": "a.c|d+e"},
+            "e": {"name_pattern": "[^/]*/x"},
+        }
+        matcher = NameRuleMatcher(name_rules)
+        rng = random.Random(0)
+        for _ in range(2000):
+            file_name = "".join(rng.choices("abcdex/.\n", k=rng.randint(0, 8)))
+            assert matcher.match(file_name) == naive_match(name_rules, file_name)
+
+
+class TestExtensionTrie:
+    """Main testing class for ExtensionTrie Class"""
+
+    def test_longest_extension(self):
+        """Test that the longest configured extension wins and extensionless names do not match."""
+        trie = ExtensionTrie()
+        for extension, value in [
+            ("gz", "gzip"),
+            ("tar.gz", "tarball"),
+            ("jpg", "photo"),
+        ]:
+            trie.add(extension, value)
+
+        assert trie.match("./x.tar.gz") == "tarball"
+        assert trie.match("./x.gz") == "gzip"
+        assert trie.match("./tar.gz") == "gzip"
+        assert trie.match("sub.tar/x.gz") == "gzip"
+        assert trie.match("./x.jpg") == "photo"
+        assert trie.match("./x.JPG") is None
+        assert trie.match("./no_extension", "none") == "none"
+        assert trie.match("./x.") is None
+        assert trie.match_batch(["a.tar.gz", "b", "c.jpg"], -1) == [
+            "tarball",
+            -1,
+            "photo",
+        ]
+
+    def test_multi_part_extensions(self):
+        """Test multi part extensions of several lengths, added in any order, against the rsplit lookup."""
+        trie = ExtensionTrie()
+        for extension, value in [
+            ("tar.gz", "tarball"),
+            ("gz", "gzip"),
+            ("backup.tar.gz", "backup"),
+            ("tar.bz2", "bzip"),
+            ("jpg", "photo"),
+        ]:
+            trie.add(extension, value)
+
+        names = ["a.backup.tar.gz", "b.tar.gz", "c.gz", "d.bz2", "e.tar.bz2", "f.jpg"]
+        assert trie.match_batch(names, -1) == [
+            "backup",
+            "tarball",
+            "gzip",
+            -1,
+            "bzip",
+            "photo",
+        ]
+        # Without multi part extensions the result is the single rsplit lookup.
+        single = ExtensionTrie()
+        single.add("gz", "gzip")
+        assert single.match_batch(names) == ["gzip", "gzip", "gzip", None, None, None]
+
+    def test_ignore_case(self):
+        """Test the optional case folding."""
+        trie = ExtensionTrie(ignore_case=True)
+        trie.add("TAR.gz", 1)
+
+        assert trie.match("./X.Tar.GZ") == 1
+        assert trie.match("./x.gz") is None
+
+
+class TestThresholdRuleMatcher:
+    """Main testing class for ThresholdRuleMatcher Class"""
+
+    def test_highest_bound_wins(self):
+        """Test that the rule with the highest reached lower bound wins, whatever the order they are added in."""
+        matcher = ThresholdRuleMatcher()
+        matcher.add(parse_size("10GB"), "huge")
+        matcher.add(parse_size("1 GiB"), "large")
+        matcher.add(parse_size("1G"), "big")
+
+        assert len(matcher) == 2
+        assert matcher.match(0) is None
+        assert matcher.match(1024**3 - 1, -1) == -1
+        assert matcher.match(1024**3) == "big"
+        assert matcher.match(5 * 1024**3) == "big"
+        assert matcher.match(10 * 1024**3) == "huge"
+
+    def test_parse_size(self):
+        """Test the accepted size formats."""
+        assert parse_size(512) == 512
+        assert parse_size("512") == 512
+        assert parse_size("1.5kb") == 1536
+        assert parse_size("2 MB") == 2 * 1024**2
+        with pytest.raises(ValueError):
+            parse_size("large")
@@ -0,0 +1,84 @@
+""" Testing module rule_stats """
+
+import json
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.rule_stats import RuleStats
+from organize_it.bin.subroutines import categorize_and_generate_dest_tree
+from organize_it.bin.tree_structure import TreeStructure
+from organize_it.settings import FILES, TEST_FIXTURES_CONFIGS as CONFIG
+from organize_it.tests._fixtures.directory_structure_fixtures import (
+    UNCATEGORIZED_DIR_DICTIONARY,
+)
+
+
+class TestRuleStats:
+    """Main testing class for RuleStats Class"""
+
+    def test_collect_stats(self, tmp_path):
+        """Test that the instrumented categorization has the same result and counts every rule and category."""
+        names = UNCATEGORIZED_DIR_DICTIONARY[FILES] + ["./unknown.xyz"]
+        categorizer = Categorizer(CONFIG[1], collect_stats=True)
+        assert (
+            categorizer.classify_batch(names).tolist()
+            == Categorizer(CONFIG[1]).classify_batch(names).tolist()
+        )
+
+        report = categorizer.rule_stats.to_dict()
+        rules = {(row["kind"], row["rule"]): row for row in report["rules"]}
+        assert set(rules) == {
+            ("format", "extension trie"),
+            ("names", "photo_by_name"),
+            ("names", "project_by_name"),
+        }
+        assert rules[("format", "extension trie")]["evaluations"] == len(names)
+        assert rules[("names", "photo_by_name")]["matches"] == 1
+        assert sum(report["categories"].values()) == len(names)
+        assert report["categories"]["uncategorized"] == 1
+        assert "photo_by_name" in categorizer.rule_stats.format_table()
+
+        stats_path = tmp_path / "rule_stats.json"
+        categorizer.rule_stats.save(str(stats_path))
+        assert json.loads(stats_path.read_text(encoding="utf-8")) == report
+
+    def test_parallel_merge(self):
+        """Test that the counters of the worker processes are merged into the parent."""
+        serial = Categorizer(CONFIG[1], collect_stats=True)
+        serial.categorize_dict(UNCATEGORIZED_DIR_DICTIONARY, True)
+        parallel = Categorizer(CONFIG[1], collect_stats=True)
+        parallel.categorize_dict(UNCATEGORIZED_DIR_DICTIONARY, True, workers=2)
+
+        assert parallel.rule_stats.categories == serial.rule_stats.categories
+        assert {
+            rule: counters[:2] for rule, counters in parallel.rule_stats.rules.items()
+        } == {rule: counters[:2] for rule, counters in serial.rule_stats.rules.items()}
+
+        merged = RuleStats()
+        merged.merge(serial.rule_stats)
+        merged.merge(serial.rule_stats)
+        assert (
+            merged.categories
+            == serial.rule_stats.categories + serial.rule_stats.categories
+        )
+
+    def test_repeated_runs_report_every_rule(self, tmp_path):
+        """Test that a second run reports the same rule evaluations, nothing is served without evaluating the rules."""
+        reports = []
+        for run in range(2):
+            stats_path = tmp_path / f"rule_stats_{run}.json"
+            categorize_and_generate_dest_tree(
+                config=CONFIG[1],
+                source_tree_dict=UNCATEGORIZED_DIR_DICTIONARY,
+                tree_structure=TreeStructure(),
+                dest_tree_path=str(tmp_path / "dest.tree"),
+                rule_stats_path=str(stats_path),
+            )
+            reports.append(json.loads(stats_path.read_text(encoding="utf-8")))
+
+        evaluations = [
+            {(row["kind"], row["rule"]): row["evaluations"] for row in report["rules"]}
+            for report in reports
+        ]
+        assert evaluations[0]
+        assert evaluations[1] == evaluations[0]
+        assert reports[1]["categories"] == reports[0]["categories"]
@@ -0,0 +1,129 @@
+""" Testing module scan_index """
+
+import os
+import json
+
+from organize_it.bin.scan_index import ScanIndex
+from organize_it.bin.walker import DirectoryWalker
+from organize_it.bin.subroutines import process_source_and_generate_tree
+from organize_it.settings import FILES, DIR, get_or_update_current_state
+from organize_it.tests.test_utils import generate_samples_with_config
+
+
+# A small tree whose directory mtimes are moved out of the racy window.
+SAMPLE_STRUCTURE = {
+    DIR: {
+        "a": {FILES: ["f.jpg"]},
+        "b": {FILES: ["f.jpg"], DIR: {"c": {FILES: ["f.jpg"]}}},
+    }
+}
+SAMPLE_DIR_MTIME = 1_000_000_000
+
+
+class TestScanIndex:
+    """Main testing class for ScanIndex Class"""
+
+    def test_list_dir(self, tmp_path, monkeypatch):
+        """Test that a re-run only lists the directories that changed since the last walk."""
+        source_path = str(tmp_path / "source")
+        generate_samples_with_config(
+            source_path, SAMPLE_STRUCTURE, dir_mtime=SAMPLE_DIR_MTIME
+        )
+        index_dir = str(tmp_path / "index")
+
+        walker = DirectoryWalker(
+            source_path, scan_index=ScanIndex.for_source(source_path, index_dir)
+        )
+        expected_tree_dict = walker.walk()
+        walker.scan_index.save()
+        assert walker.scan_index.misses == 4
+
+        # Second run. Nothing changed, so nothing is listed again.
+        scanned_dirs = []
+        scan_dir = DirectoryWalker.scan_dir
+
+        def counting_scan_dir(self, dir_path):
+            scanned_dirs.append(os.path.relpath(dir_path, source_path))
+            return scan_dir(self, dir_path)
+
+        monkeypatch.setattr(DirectoryWalker, "scan_dir", counting_scan_dir)
+        scan_index = ScanIndex.for_source(source_path, index_dir)
+        tree_dict = DirectoryWalker(source_path, scan_index=scan_index).walk()
+        scan_index.save()
+
+        assert tree_dict == expected_tree_dict
+        assert scanned_dirs == []
+        assert scan_index.hits == 4
+
+        # Third run. Only the changed directory is listed again.
+        with open(os.path.join(source_path, "b", "new.pdf"), "w", encoding="utf-8"):
+            pass
+        scan_index = ScanIndex.for_source(source_path, index_dir)
+        tree_dict = DirectoryWalker(
+            source_path, workers=2, scan_index=scan_index
+        ).walk()
+
+        assert scanned_dirs == ["b"]
+        assert tree_dict[DIR]["b"][FILES] == ["b/f.jpg", "b/new.pdf"]
+
+    def test_save_drops_removed_directories(self, tmp_path):
+        """Test that the saved index only contains the directories visited in the last walk."""
+        source_path = str(tmp_path / "source")
+        generate_samples_with_config(
+            source_path, SAMPLE_STRUCTURE, dir_mtime=SAMPLE_DIR_MTIME
+        )
+        scan_index = ScanIndex(str(tmp_path / "index.json"))
+
+        DirectoryWalker(source_path, scan_index=scan_index).walk()
+        scan_index.save()
+
+        os.remove(os.path.join(source_path, "a", "f.jpg"))
+        os.rmdir(os.path.join(source_path, "a"))
+        DirectoryWalker(source_path, scan_index=scan_index).walk()
+        scan_index.save()
+
+        with open(tmp_path / "index.json", "r", encoding="utf-8") as index_file:
+            saved_dirs = json.load(index_file)["dirs"]
+        assert os.path.join(source_path, "a") not in saved_dirs
+        assert os.path.join(source_path, "b", "c") in saved_dirs
+
+    def test_walk_with_stats_uses_the_index(self, tmp_path):
+        """Test that a walk which records stats reuses the index and keeps fresh file stats."""
+        source_path = str(tmp_path / "source")
+        generate_samples_with_config(
+            source_path, SAMPLE_STRUCTURE, dir_mtime=SAMPLE_DIR_MTIME
+        )
+        scan_index_path = ScanIndex.for_source(source_path).index_path
+        current_state = get_or_update_current_state()
+
+        def run(record_stats=True):
+            get_or_update_current_state(False)
+            file_manager, _, source_tree = process_source_and_generate_tree(
+                source_directory=source_path,
+                destination_directory=str(tmp_path / "dest"),
+                generated_source_tree_path=str(tmp_path / "source.tree"),
+                generated_source_snapshot=str(tmp_path / "source.snapshot"),
+                use_scan_index=True,
+                record_stats=record_stats,
+            )
+            return file_manager.scan_index, source_tree
+
+        try:
+            first_index, first_tree = run()
+            assert first_index.misses == 4
+            with open(
+                os.path.join(source_path, "a", "f.jpg"), "w", encoding="utf-8"
+            ) as edited:
+                edited.write("edited")
+
+            second_index, second_tree = run()
+            assert second_index.hits == 4
+            assert second_index.misses == 0
+            assert second_tree.to_dict() == first_tree.to_dict()
+            # The file was edited without changing the mtime of its directory.
+            assert sorted(second_tree.stats.size) == [0, 0, len("edited")]
+            # Without a plan or size and age rules no stats are recorded.
+            assert run(record_stats=False)[1].stats is None
+        finally:
+            get_or_update_current_state(current_state)
+            os.remove(scan_index_path)
@@ -5,6 +5,7 @@ import os
 from organize_it.bin.subroutines import (
     process_source_and_generate_tree,
     categorize_and_generate_dest_tree,
+    categorize_and_sort_streaming,
 )
 from organize_it.tests._fixtures.directory_structure_fixtures import (
     UNCATEGORIZED_DIR_PATH,
@@ -25,6 +26,8 @@ from organize_it.settings import (
 from organize_it.tests.test_utils import dicts_are_equal
 from organize_it.bin.file_manager import FileManager
 from organize_it.bin.tree_structure import TreeStructure
+from organize_it.bin.tree_snapshot import TreeSnapshot
+from organize_it.bin.categorizer import Categorizer
 
 
 @pytest.mark.usefixtures("test_setup")
@@ -36,6 +39,9 @@ class TestSubroutines:
         generated_source_tree_path = (
             f"{TEST_FIXTURES_DIR}/{GENERATED_ROOT_DIR_NAME}/.generated_tests.tree"
         )
+        generated_source_snapshot = (
+            f"{TEST_FIXTURES_DIR}/{GENERATED_ROOT_DIR_NAME}/.generated_tests.snapshot"
+        )
 
         assert get_or_update_current_state() is False
 
@@ -44,10 +50,12 @@ class TestSubroutines:
             destination_directory=CATEGORIZED_DIR_PATH,
             generated_source_tree_path=generated_source_tree_path,
             generated_source_json=GENERATED_SOURCE_JSON,
+            generated_source_snapshot=generated_source_snapshot,
         )
-        # confirm both files are created.
+        # confirm all files are created.
         assert os.path.exists(generated_source_tree_path) is True
         assert os.path.exists(GENERATED_SOURCE_JSON) is True
+        assert os.path.exists(generated_source_snapshot) is True
 
         # test tool current state
         assert get_or_update_current_state() is True
@@ -55,15 +63,28 @@ class TestSubroutines:
         # Test with fresh run
         assert isinstance(file_manager, FileManager)
         assert isinstance(tree_structure, TreeStructure)
-        assert dicts_are_equal(UNCATEGORIZED_DIR_DICTIONARY, source_dict) is True
+        assert (
+            dicts_are_equal(UNCATEGORIZED_DIR_DICTIONARY, source_dict.to_dict()) is True
+        )
+
+        # A stale run maps the snapshot of the previous run instead of walking again.
+        _, _, snapshot = process_source_and_generate_tree(
+            source_directory=UNCATEGORIZED_DIR_PATH,
+            destination_directory=CATEGORIZED_DIR_PATH,
+            generated_source_tree_path=generated_source_tree_path,
+            generated_source_snapshot=generated_source_snapshot,
+        )
+        assert isinstance(snapshot, TreeSnapshot)
+        assert dicts_are_equal(UNCATEGORIZED_DIR_DICTIONARY, snapshot.to_dict()) is True
+        snapshot.close()
 
         # Test with stale run. One way to test this is to delete the generated json file from the previous run and call the method again.
         #  When it tried to read the file, instead of creating one(like in a fresh run), we can catch the error.
         # TODO: A better way would be to cache the instances and then compare equality
 
-        # Delete the generated GENERATED_SOURCE_JSON file from above.
-        os.remove(GENERATED_SOURCE_JSON)
-        assert os.path.exists(GENERATED_SOURCE_JSON) is False
+        # Delete the generated snapshot file from above.
+        os.remove(generated_source_snapshot)
+        assert os.path.exists(generated_source_snapshot) is False
 
         assert get_or_update_current_state() is True
 
@@ -72,7 +93,7 @@ class TestSubroutines:
                 source_directory=UNCATEGORIZED_DIR_PATH,
                 destination_directory=CATEGORIZED_DIR_PATH,
                 generated_source_tree_path=generated_source_tree_path,
-                generated_source_json=GENERATED_SOURCE_JSON,
+                generated_source_snapshot=generated_source_snapshot,
             )
         # In a stale run, we try to read from the previously generated configs.
         assert isinstance(exc_info.value, FileNotFoundError) is True
@@ -95,3 +116,71 @@ class TestSubroutines:
             dicts_are_equal(CATEGORIZED_DIR_DICTIONARY, categorized_tree_dict[DIR])
             is True
         )
+
+    def test_categorize_and_sort_streaming(self, tmp_path):
+        """Sanity test to walk, categorize and copy the source directory as a stream of batches"""
+        file_count = categorize_and_sort_streaming(
+            source_directory=UNCATEGORIZED_DIR_PATH,
+            destination_directory=str(tmp_path),
+            config=CONFIG[1],
+            batch_size=2,
+        )
+
+        assert file_count == 25
+        assert sorted(os.listdir(tmp_path / "subDir1" / "subSubDir1")) == [
+            "document",
+            "photo",
+            "photo_by_name",
+            "project_by_name",
+        ]
+        assert sorted(os.listdir(tmp_path / "document")) == ["dir.doc", "dir.pdf"]
+
+    def test_streaming_matches_the_tree_mode(self, tmp_path):
+        """Test that the stream sorts the same files as the tree mode and that a move keeps listing the source."""
+
+        def write_tree(base_path):
+            for file_path in [
+                "a.jpg",
+                "only_dirs/inner/b.jpg",
+                "sub/c.jpg",
+                "sub/d.pdf",
+                "sub/deep/e.jpg",
+            ]:
+                os.makedirs(
+                    os.path.join(base_path, os.path.dirname(file_path)), exist_ok=True
+                )
+                with open(os.path.join(base_path, file_path), "w", encoding="utf-8"):
+                    pass
+
+        def dest_files(dest_path):
+            return sorted(
+                os.path.relpath(os.path.join(dir_path, name), dest_path)
+                for dir_path, _, file_names in os.walk(dest_path)
+                for name in file_names
+            )
+
+        tree_source = str(tmp_path / "tree_source")
+        write_tree(tree_source)
+        file_manager = FileManager(tree_source, str(tmp_path / "tree_dest"))
+        file_manager.categorize_and_sort_file(
+            CONFIG[1],
+            Categorizer(CONFIG[1]).categorize_dict(file_manager.file_walk(), True)[DIR],
+        )
+
+        stream_source = str(tmp_path / "stream_source")
+        write_tree(stream_source)
+        file_count = categorize_and_sort_streaming(
+            source_directory=stream_source,
+            destination_directory=str(tmp_path / "stream_dest"),
+            config=CONFIG[1],
+            move_files=True,
+            batch_size=1,
+        )
+
+        # Directories without files of their own are skipped with their subtree in both modes.
+        assert dest_files(tmp_path / "stream_dest") == dest_files(
+            tmp_path / "tree_dest"
+        )
+        assert "only_dirs/inner/photo/b.jpg" not in dest_files(tmp_path / "stream_dest")
+        assert file_count == 4
+        assert dest_files(stream_source) == ["only_dirs/inner/b.jpg"]
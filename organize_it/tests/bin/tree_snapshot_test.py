@@ -0,0 +1,72 @@
+""" Testing module tree_snapshot """
+
+import pytest
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.compact_tree import CompactTree
+from organize_it.bin.tree_snapshot import TreeSnapshot, write_snapshot
+from organize_it.settings import (
+    FILES,
+    DIR,
+    SKIPPED,
+    TEST_FIXTURES_CONFIGS as CONFIG,
+)
+from organize_it.tests._fixtures.directory_structure_fixtures import (
+    UNCATEGORIZED_DIR_DICTIONARY,
+)
+
+
+class TestTreeSnapshot:
+    """Main testing class for TreeSnapshot Class"""
+
+    def test_write_and_open(self, tmp_path):
+        """Test that a snapshot maps back to the same tree."""
+        snapshot_path = str(tmp_path / "source.snapshot")
+        tree = CompactTree.from_dict(UNCATEGORIZED_DIR_DICTIONARY)
+        write_snapshot(tree, snapshot_path)
+
+        with TreeSnapshot(snapshot_path) as snapshot:
+            assert len(snapshot) == len(tree)
+            assert snapshot.node_count == tree.node_count
+            assert list(snapshot.names)[: len(tree.names)] == tree.names
+            assert snapshot.to_dict() == UNCATEGORIZED_DIR_DICTIONARY
+            assert (
+                snapshot.root()[DIR]["subDir1"][FILES][0] == "subDir1/subDir1-image.jpg"
+            )
+
+            # Snapshots can be categorized like any other CompactTree.
+            categorizer = Categorizer(CONFIG[1])
+            assert categorizer.categorize_dict(
+                snapshot, True
+            ) == categorizer.categorize_dict(UNCATEGORIZED_DIR_DICTIONARY, True)
+
+            with pytest.raises(TypeError):
+                snapshot.add_file(0, "new.jpg")
+
+    def test_skipped_and_names(self, tmp_path):
+        """Test skipped placeholders, sub tree roots and undecodable file names."""
+        snapshot_path = str(tmp_path / "source.snapshot")
+        tree_dict = {
+            FILES: ["sub/a.jpg", "sub/b\udcff.jpg"],
+            DIR: {},
+            SKIPPED: [".git"],
+        }
+        write_snapshot(CompactTree.from_dict(tree_dict, "sub"), snapshot_path)
+
+        with TreeSnapshot(snapshot_path) as snapshot:
+            assert snapshot.root_rel_dir == "sub"
+            assert snapshot.to_dict() == tree_dict
+
+    def test_invalid_snapshot(self, tmp_path):
+        """Test that files which are not snapshots are rejected."""
+        snapshot_path = tmp_path / "source.snapshot"
+        snapshot_path.write_bytes(b"{}" * 32)
+        with pytest.raises(ValueError):
+            TreeSnapshot(str(snapshot_path))
+
+        write_snapshot(
+            CompactTree.from_dict(UNCATEGORIZED_DIR_DICTIONARY), str(snapshot_path)
+        )
+        snapshot_path.write_bytes(snapshot_path.read_bytes()[:100])
+        with pytest.raises(ValueError):
+            TreeSnapshot(str(snapshot_path))
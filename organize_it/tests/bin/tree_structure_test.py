@@ -1,5 +1,6 @@
 """ Testing module tree_structure """
 
+import io
 import pytest
 import filecmp
 from organize_it.bin.tree_structure import TreeStructure
@@ -9,6 +10,9 @@ from organize_it.tests._fixtures.directory_structure_fixtures import (
 )
 from organize_it.settings import (
     TEST_FIXTURES_DIR,
+    FILES,
+    DIR,
+    SKIPPED,
 )
 
 
@@ -38,3 +42,24 @@ class TestTreeStructure:
             )
             is True
         )
+
+    def test_generate_tree_structure_skipped(self):
+        """Test that directories pruned by the skip rules are written as collapsed placeholders."""
+        tree_structure = TreeStructure()
+        generated_tree_file = io.StringIO()
+        tree_structure.generate_tree_structure(
+            {
+                FILES: ["./a.jpg"],
+                DIR: {"sub": {FILES: [], DIR: {}, SKIPPED: [".git"]}},
+                SKIPPED: ["node_modules"],
+            },
+            "",
+            generated_tree_file,
+        )
+
+        assert generated_tree_file.getvalue() == (
+            "\n│   ├── ./a.jpg"
+            "\n│   ├── sub/"
+            "\n│       │   ├── .git/ [skipped]"
+            "\n│   ├── node_modules/ [skipped]"
+        )
@@ -0,0 +1,175 @@
+""" Testing module walker """
+
+import os
+import json
+import pytest
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.walker import DirectoryWalker
+from organize_it.settings import FILES, DIR, SKIPPED
+from organize_it.tests._fixtures.directory_structure_fixtures import (
+    UNCATEGORIZED_DIR_DICTIONARY,
+    UNCATEGORIZED_DIR_PATH,
+)
+from organize_it.tests.test_utils import dicts_are_equal
+
+
+@pytest.mark.usefixtures("test_setup")
+class TestDirectoryWalker:
+    """Main testing class for DirectoryWalker Class"""
+
+    def test_walk(self):
+        """Test DirectoryWalker.walk with sample generated directories and files."""
+        tree_dict = DirectoryWalker(UNCATEGORIZED_DIR_PATH).walk()
+
+        assert dicts_are_equal(UNCATEGORIZED_DIR_DICTIONARY, tree_dict) is True
+        # Sub directories are sorted so the result is deterministic.
+        assert list(tree_dict[DIR].keys()) == ["subDir1", "subDir2"]
+
+    def test_walk_sub_directory(self):
+        """Test DirectoryWalker.walk from a sub directory keeps the paths relative to the walker root."""
+        walker = DirectoryWalker(UNCATEGORIZED_DIR_PATH)
+        tree_dict = walker.walk(os.path.join(UNCATEGORIZED_DIR_PATH, "subDir1"))
+
+        assert dicts_are_equal(UNCATEGORIZED_DIR_DICTIONARY[DIR]["subDir1"], tree_dict)
+
+    def test_walk_parallel(self, tmp_path):
+        """Test that a parallel DirectoryWalker.walk returns exactly the serial result, including the order."""
+        for i in range(4):
+            for j in range(3):
+                sub_path = tmp_path / f"dir{i}" / f"sub{j}"
+                sub_path.mkdir(parents=True)
+                for k in range(5):
+                    (sub_path / f"file{k}.jpg").write_text("")
+            (tmp_path / f"dir{i}" / "top.pdf").write_text("")
+
+        serial_tree_dict = DirectoryWalker(str(tmp_path)).walk()
+        parallel_tree_dict = DirectoryWalker(str(tmp_path), workers=4).walk()
+
+        assert json.dumps(parallel_tree_dict) == json.dumps(serial_tree_dict)
+        assert dicts_are_equal(
+            UNCATEGORIZED_DIR_DICTIONARY,
+            DirectoryWalker(UNCATEGORIZED_DIR_PATH, workers=3).walk(),
+        )
+
+    def test_walk_scans_every_directory_once(self, monkeypatch):
+        """Test that DirectoryWalker.walk lists every directory exactly once."""
+        walker = DirectoryWalker(UNCATEGORIZED_DIR_PATH)
+        scanned_dirs = []
+        scan_dir = walker.scan_dir
+
+        def counting_scan_dir(dir_path):
+            scanned_dirs.append(dir_path)
+            return scan_dir(dir_path)
+
+        monkeypatch.setattr(walker, "scan_dir", counting_scan_dir)
+        walker.walk()
+
+        assert len(scanned_dirs) == len(set(scanned_dirs)) == 5
+
+    def test_walk_does_not_follow_symlinks(self, tmp_path):
+        """Test that symlinked directories are not followed while symlinked files are listed."""
+        (tmp_path / "real").mkdir()
+        (tmp_path / "real" / "a.jpg").write_text("")
+        os.symlink(tmp_path / "real", tmp_path / "linked")
+        os.symlink(tmp_path / "real" / "a.jpg", tmp_path / "b.jpg")
+
+        tree_dict = DirectoryWalker(str(tmp_path)).walk()
+
+        assert tree_dict == {
+            FILES: ["./b.jpg"],
+            DIR: {"real": {FILES: ["real/a.jpg"], DIR: {}}},
+        }
+
+    def test_iter_batches(self):
+        """Test DirectoryWalker.iter_batches streams every file in bounded batches."""
+        walker = DirectoryWalker(UNCATEGORIZED_DIR_PATH)
+
+        streamed_files = []
+        for rel_dir, entries in walker.iter_batches(batch_size=2):
+            assert 0 < len(entries) <= 2
+            assert all(os.path.dirname(entry) == rel_dir for entry in entries)
+            streamed_files.extend(entries)
+
+        def all_files(tree_dict):
+            files = list(tree_dict[FILES])
+            for sub_tree in tree_dict[DIR].values():
+                files.extend(all_files(sub_tree))
+            return files
+
+        assert sorted(streamed_files) == sorted(all_files(UNCATEGORIZED_DIR_DICTIONARY))
+
+    def test_walk_prunes_excluded_directories(self, tmp_path, monkeypatch):
+        """Test that excluded directories are never walked and can be kept as placeholders."""
+        for dir_name in ["node_modules/pkg", "src/.git", "src/lib"]:
+            (tmp_path / dir_name).mkdir(parents=True)
+            (tmp_path / dir_name / "a.js").write_text("")
+        (tmp_path / "src" / "b.pga").write_text("")
+
+        categorizer = Categorizer(
+            {"rules": [{"skip": {DIR: r"^node_modules$|^\.git$", FILES: r"\.pga$"}}]}
+        )
+        walker = DirectoryWalker(
+            str(tmp_path), exclude=categorizer.is_excluded, show_pruned=True
+        )
+        scanned_dirs = []
+        scan_dir = walker.scan_dir
+
+        def counting_scan_dir(dir_path):
+            scanned_dirs.append(os.path.relpath(dir_path, tmp_path))
+            return scan_dir(dir_path)
+
+        monkeypatch.setattr(walker, "scan_dir", counting_scan_dir)
+        tree_dict = walker.walk()
+
+        assert sorted(scanned_dirs) == [".", "src", "src/lib"]
+        assert tree_dict == {
+            FILES: [],
+            SKIPPED: ["node_modules"],
+            DIR: {
+                "src": {
+                    # Files are filtered by the Categorizer, not by the walker.
+                    FILES: ["src/b.pga"],
+                    SKIPPED: [".git"],
+                    DIR: {"lib": {FILES: ["src/lib/a.js"], DIR: {}}},
+                }
+            },
+        }
+
+        streamed_files = [
+            entry
+            for _, entries in DirectoryWalker(
+                str(tmp_path), exclude=categorizer.is_excluded
+            ).iter_batches()
+            for entry in entries
+        ]
+        assert sorted(streamed_files) == ["src/b.pga", "src/lib/a.js"]
+
+    def test_excluded_files_keep_their_subtree(self, tmp_path):
+        """Test that a directory whose only files are skipped is still categorized with everything below it."""
+        (tmp_path / "sub" / "deep").mkdir(parents=True)
+        (tmp_path / "sub" / "notes.txt").write_text("")
+        (tmp_path / "sub" / "deep" / "a.jpg").write_text("")
+        categorizer = Categorizer(
+            {
+                "rules": [
+                    {"format": {"photo": {"types": ["jpg"]}}},
+                    {"skip": {FILES: "notes"}},
+                ]
+            }
+        )
+        walker = DirectoryWalker(str(tmp_path), exclude=categorizer.is_excluded)
+
+        expected = {
+            "sub": {
+                DIR: {
+                    "deep": {
+                        DIR: {"photo": {DIR: {}, FILES: ["sub/deep/a.jpg"]}},
+                        FILES: [],
+                    }
+                },
+                FILES: [],
+            }
+        }
+        assert categorizer.categorize_dict(walker.walk_compact(), True)[DIR] == expected
+        assert categorizer.categorize_dict(walker.walk(), True)[DIR] == expected
@@ -0,0 +1,110 @@
+""" Testing module watcher """
+
+import os
+import sys
+import pytest
+
+from organize_it.bin.categorizer import Categorizer
+from organize_it.bin.file_manager import FileManager
+from organize_it.bin.watcher import FolderWatcher, InotifyWatcher, PollingWatcher
+from organize_it.settings import TEST_FIXTURES_CONFIGS as CONFIG
+
+
+def create_file(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as new_file:
+        new_file.write("content")
+
+
+class TestFolderWatcher:
+    """Main testing class for FolderWatcher Class"""
+
+    def organize_new_files(self, tmp_path, create_watcher):
+        source_path = str(tmp_path / "source")
+        destination_path = str(tmp_path / "destination")
+        create_file(os.path.join(source_path, "existing.jpg"))
+
+        file_manager = FileManager(source_path, destination_path)
+        folder_watcher = FolderWatcher(
+            file_manager=file_manager,
+            categorizer=Categorizer(CONFIG[1]),
+            debounce=0,
+            watcher=create_watcher(source_path, destination_path),
+        )
+
+        create_file(os.path.join(source_path, "new.jpg"))
+        create_file(os.path.join(source_path, "sub", "new-project.doc"))
+        create_file(os.path.join(source_path, "unknown.xyz"))
+
+        organized = 0
+        for _ in range(10):
+            organized += folder_watcher.process_events(timeout=0.1)
+            if organized == 2:
+                break
+        folder_watcher.watcher.close()
+
+        assert organized == 2
+        assert os.listdir(os.path.join(destination_path, "photo")) == ["new.jpg"]
+        assert os.listdir(os.path.join(destination_path, "sub", "project_by_name")) == [
+            "new-project.doc"
+        ]
+        # Files that existed before the watcher started are left alone.
+        assert sorted(os.listdir(destination_path)) == ["photo", "sub"]
+
+    def test_polling_watcher(self, tmp_path):
+        """Test FolderWatcher with the polling fallback"""
+        self.organize_new_files(
+            tmp_path,
+            lambda source, destination: PollingWatcher(source, destination, interval=0),
+        )
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify only")
+    def test_inotify_watcher(self, tmp_path):
+        """Test FolderWatcher with Linux inotify"""
+        self.organize_new_files(tmp_path, InotifyWatcher)
+
+    def test_debounce(self, tmp_path):
+        """Test that files are only organized after no new files arrived for the debounce time"""
+        source_path = str(tmp_path / "source")
+        os.makedirs(source_path)
+        folder_watcher = FolderWatcher(
+            file_manager=FileManager(source_path, str(tmp_path / "destination")),
+            categorizer=Categorizer(CONFIG[1]),
+            debounce=60,
+            watcher=PollingWatcher(source_path, interval=0),
+        )
+        create_file(os.path.join(source_path, "new.jpg"))
+
+        assert folder_watcher.process_events(timeout=0) == 0
+        assert folder_watcher.flush() == 1
+
+    def test_failed_files_do_not_stop_the_watcher(self, tmp_path):
+        """Test that a name collision of a move is logged and skipped while the other files are organized"""
+        source_path = str(tmp_path / "source")
+        destination_path = str(tmp_path / "destination")
+        os.makedirs(source_path)
+        create_file(os.path.join(destination_path, "photo", "taken.jpg"))
+        folder_watcher = FolderWatcher(
+            file_manager=FileManager(source_path, destination_path),
+            categorizer=Categorizer(CONFIG[1]),
+            move_files=True,
+            debounce=0,
+            watcher=PollingWatcher(source_path, interval=0),
+        )
+        with open(
+            os.path.join(source_path, "taken.jpg"), "w", encoding="utf-8"
+        ) as new_file:
+            new_file.write("new")
+        create_file(os.path.join(source_path, "free.jpg"))
+
+        assert folder_watcher.process_events(timeout=0) == 1
+        assert sorted(os.listdir(os.path.join(destination_path, "photo"))) == [
+            "free.jpg",
+            "taken.jpg",
+        ]
+        # The colliding file stays in the source and the existing file is not replaced.
+        assert os.listdir(source_path) == ["taken.jpg"]
+        with open(
+            os.path.join(destination_path, "photo", "taken.jpg"), encoding="utf-8"
+        ) as kept:
+            assert kept.read() == "content"
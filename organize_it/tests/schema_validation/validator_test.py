@@ -41,3 +41,18 @@ class TestValidator:
             v.validate_config()
 
         assert " - Exiting due to an error: list_type" in caplog.text
+
+    def test_size_and_age_rules_schema(self):
+        """Test that the size and age rules are accepted by the json-schema and the pydantic schema"""
+        config = {
+            "source": "",
+            "destination": "",
+            "rules": [
+                {"size": {"large": {"min_size": "1GB"}, "huge": {"min_size": 10**10}}},
+                {"age": {"archive": {"min_days": 180}}},
+            ],
+        }
+        assert JSONSchemaValidator(config_data=config, schema=SCHEMA).validate_config()
+        assert PydanticSchemaValidator(
+            config_data=config, schema=ConfigSchema
+        ).validate_config()
@@ -5,17 +5,24 @@ import os
 from organize_it.bin.file_manager import FILES, DIR
 
 
-def generate_samples_with_config(base_path: str, structure: dict):
+def generate_samples_with_config(
+    base_path: str, structure: dict, file_sizes: dict = None, dir_mtime: int = None
+):
     """
     Created sample files and directories as per the directory structure provided.
+    Files named in `file_sizes` are filled with that many bytes, all others are empty. If `dir_mtime` is given,
+    the mtime of every created directory is set to it, e.g. to move it out of the racy window of the scan index.
     """
+    os.makedirs(base_path, exist_ok=True)
+    file_sizes = file_sizes or {}
+
     # Create files at the current level
     if FILES in structure:
         for file_name in structure[FILES]:
             file_path = os.path.join(base_path, file_name)
-            # Create an empty file
-            with open(file_path, "w", encoding="utf-8") as _:
-                pass  # Just create an empty file
+            # Create an empty file unless a size is given
+            with open(file_path, "w", encoding="utf-8") as sample_file:
+                sample_file.write("x" * file_sizes.get(file_name, 0))
 
     # Recursively create subdirectories and files
     if DIR in structure:
@@ -25,7 +32,22 @@ def generate_samples_with_config(base_path: str, structure: dict):
             os.makedirs(subdir_path, exist_ok=True)
 
             # Recursively call the function to create files and subdirectories in the subdir
-            generate_samples_with_config(subdir_path, subdir_structure)
+            generate_samples_with_config(
+                subdir_path, subdir_structure, file_sizes, dir_mtime
+            )
+
+    # Set last, creating the entries above updates the mtime of the directory.
+    if dir_mtime is not None:
+        os.utime(base_path, (dir_mtime, dir_mtime))
+
+
+def relative_files(base_path) -> set:
+    """Returns the paths of all files below `base_path` relative to it."""
+    return {
+        os.path.relpath(os.path.join(dir_path, file_name), base_path)
+        for dir_path, _, file_names in os.walk(base_path)
+        for file_name in file_names
+    }
 
 
 def dicts_are_equal(dict1: dict, dict2: dict) -> bool: